@@ -1,10 +1,7 @@
-import os
 from logging.config import fileConfig
-from dotenv import load_dotenv
 from sqlalchemy import engine_from_config, pool
 from alembic import context
 
-
 from database import Base
 from models.user import User
 from models.car import Car
@@ -12,15 +9,17 @@ from models.document import Document
 from models.mechanic import Mechanic
 from models.services import Service
 from models.appoinment import Appointment
+from models.email_outbox import EmailOutbox
+from models.document_blob import DocumentBlob
+from models.document_preview import DocumentPreview
+from settings import settings
 
 
-load_dotenv()
-
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-DB_NAME = os.getenv("DB_NAME")
+DB_USER = settings.get("DB_USER")
+DB_PASSWORD = settings.get("DB_PASSWORD")
+DB_HOST = settings.get("DB_HOST")
+DB_PORT = settings.get("DB_PORT")
+DB_NAME = settings.get("DB_NAME")
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
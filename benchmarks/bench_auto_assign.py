@@ -0,0 +1,76 @@
+"""
+Time one auto-assignment planning run and report how evenly load is spread.
+
+Generates ``--pending`` unassigned appointments over ``--days`` working days
+and ``--mechanics`` mechanics that already hold ``--booked`` appointments
+each, then times crud.scheduling.plan_assignments (no database).
+
+    python -m benchmarks.bench_auto_assign --pending 5000 --mechanics 200
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from crud.scheduling import MechanicCalendar, plan_assignments
+
+FIRST_DAY = date(2030, 1, 7)
+
+
+def random_start(rng: random.Random, days: int) -> datetime:
+    day = FIRST_DAY + timedelta(days=rng.randrange(days))
+    return datetime(
+        day.year, day.month, day.day, rng.randint(8, 16), rng.choice([0, 30])
+    )
+
+
+def build(pending: int, mechanics: int, booked: int, days: int):
+    rng = random.Random(42)
+    calendars = defaultdict(MechanicCalendar)
+    loads = defaultdict(int)
+    appointment_id = 0
+    for mechanic_id in range(1, mechanics + 1):
+        for _ in range(booked):
+            appointment_id += 1
+            start = random_start(rng, days)
+            duration = rng.choice([30, 60, 90])
+            calendars[mechanic_id].add(
+                start, start + timedelta(minutes=duration), appointment_id
+            )
+            loads[mechanic_id] += duration
+
+    work = []
+    for _ in range(pending):
+        appointment_id += 1
+        work.append((appointment_id, random_start(rng, days), rng.choice([30, 60, 90])))
+    return work, calendars, loads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pending", type=int, default=5000)
+    parser.add_argument("--mechanics", type=int, default=200)
+    parser.add_argument("--booked", type=int, default=5)
+    parser.add_argument("--days", type=int, default=5)
+    args = parser.parse_args()
+
+    work, calendars, loads = build(args.pending, args.mechanics, args.booked, args.days)
+    mechanic_ids = range(1, args.mechanics + 1)
+
+    start = time.perf_counter()
+    assignments, unassigned = plan_assignments(work, mechanic_ids, calendars, loads)
+    elapsed = time.perf_counter() - start
+
+    final = [loads[mechanic_id] for mechanic_id in mechanic_ids]
+    print(
+        f"{args.pending} pending, {args.mechanics} mechanics: "
+        f"{len(assignments)} assigned, {len(unassigned)} unassigned "
+        f"in {elapsed * 1000:.1f}ms; load min={min(final)} max={max(final)} "
+        f"mean={sum(final) / len(final):.0f} minutes"
+    )
+
+
+if __name__ == "__main__":
+    main()
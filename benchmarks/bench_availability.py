@@ -0,0 +1,66 @@
+"""
+Time to compute one day's availability for many mechanics.
+
+Builds an AvailabilityIndex in memory (no database) with ``--mechanics``
+mechanics holding ``--bookings`` appointments each on the benchmarked day,
+plus a week of bookings around it, and times AvailabilityIndex.free_slots.
+
+    python -m benchmarks.bench_availability --mechanics 200 --bookings 6
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import percentile
+from crud.scheduling import AvailabilityIndex
+
+DAY = date(2030, 1, 7)
+
+
+def build_index(mechanics: int, bookings: int) -> AvailabilityIndex:
+    rng = random.Random(42)
+    index = AvailabilityIndex()
+    index.loaded_at = time.monotonic()
+    index.mechanic_ids = set(range(1, mechanics + 1))
+
+    appointment_id = 0
+    for day_offset in range(-3, 4):
+        day = DAY + timedelta(days=day_offset)
+        for mechanic_id in index.mechanic_ids:
+            for _ in range(bookings):
+                appointment_id += 1
+                start = datetime(day.year, day.month, day.day, rng.randint(8, 16))
+                index.book(appointment_id, mechanic_id, start, rng.choice([30, 60, 90]))
+        for _ in range(mechanics // 10):
+            appointment_id += 1
+            start = datetime(day.year, day.month, day.day, rng.randint(8, 16))
+            index.book(appointment_id, None, start, 60)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mechanics", type=int, default=200)
+    parser.add_argument("--bookings", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    index = build_index(args.mechanics, args.bookings)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        slots = index.free_slots(DAY, 60)
+        timings.append(time.perf_counter() - start)
+
+    print(
+        f"{args.mechanics} mechanics, {len(index.bookings)} bookings indexed: "
+        f"{len(slots)} slots, p50={percentile(timings, 50) * 1000:.2f}ms "
+        f"p99={percentile(timings, 99) * 1000:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Booking ``--items`` appointments with one POST /appointments/bulk request
+versus one POST /appointments/ per appointment.
+
+Each round books a fresh day for a fleet customer with ``--items`` cars, so
+neither variant runs out of mechanics.
+
+    python -m benchmarks.bench_bulk_booking --items 100 --rounds 5
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import bench_client, reset_schema, session_factory
+from crud.scheduling import availability_index
+from database import build_engine
+from models.car import Car
+from models.mechanic import Mechanic, MechanicRole
+from models.services import Service
+from models.user import User, UserRole
+
+FLEET_OWNER = User(
+    user_id=1, name="Fleet", email="fleet@example.com", role=UserRole.CUSTOMER
+)
+
+
+async def seed(engine, items: int):
+    async with session_factory(engine)() as db:
+        db.add(
+            User(
+                user_id=1,
+                name="Fleet",
+                email="fleet@example.com",
+                password="x",
+                role=UserRole.CUSTOMER,
+            )
+        )
+        db.add(Service(service_id=1, name="Inspection", price=50, duration=30))
+        db.add_all(
+            Mechanic(
+                name=f"Mechanic {i}",
+                birth_date=date(1990, 1, 1),
+                login=f"mechanic{i}",
+                password="x",
+                role=MechanicRole.MECHANIC,
+                position="Mechanic",
+            )
+            for i in range(items)
+        )
+        db.add_all(
+            Car(
+                car_id=car_id,
+                user_id=1,
+                brand="Ford",
+                model="Transit",
+                year=2022,
+                plate_number=f"FL{car_id:06d}",
+                vin=f"FLEET{car_id:012d}",
+            )
+            for car_id in range(1, items + 1)
+        )
+        await db.commit()
+
+
+def payloads(items: int, day: datetime) -> list:
+    return [
+        {
+            "user_id": 1,
+            "car_id": car_id,
+            "service_id": 1,
+            "appointment_date": (day + timedelta(hours=9)).isoformat(),
+        }
+        for car_id in range(1, items + 1)
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine("test", f"sqlite+aiosqlite:///{tmp}/bench.db")
+        await reset_schema(engine)
+        await seed(engine, args.items)
+        availability_index.invalidate()
+
+        timings = {"single": [], "bulk": []}
+        first_day = datetime(2030, 1, 1)
+        async with bench_client(engine, user=FLEET_OWNER) as client:
+            for round_ in range(args.rounds):
+                day = first_day + timedelta(days=2 * round_)
+                start = time.perf_counter()
+                for payload in payloads(args.items, day):
+                    response = await client.post("/api/v1/appointments/", json=payload)
+                    assert response.status_code == 200, response.text
+                timings["single"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/appointments/bulk",
+                    json=payloads(args.items, day + timedelta(days=1)),
+                )
+                timings["bulk"].append(time.perf_counter() - start)
+                assert response.json()["errors"] == [], response.text
+        await engine.dispose()
+
+    single, bulk = min(timings["single"]), min(timings["bulk"])
+    print(
+        f"{args.items} appointments: single={single * 1000:.1f}ms  "
+        f"bulk={bulk * 1000:.1f}ms  speedup={single / bulk:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
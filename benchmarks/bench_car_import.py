@@ -0,0 +1,81 @@
+"""
+Onboarding a fleet: ``--cars`` POST /cars/ calls versus one streamed CSV
+POST /cars/bulk, with the peak memory allocated during the import.
+
+    python -m benchmarks.bench_car_import --cars 5000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import bench_client, reset_schema, session_factory
+from database import build_engine
+from models.user import User, UserRole
+
+ADMIN = User(user_id=1, name="Admin", role=UserRole.ADMIN)
+COLUMNS = ("user_id", "brand", "model", "year", "plate_number", "vin")
+
+
+def car(prefix: str, n: int) -> dict:
+    return {
+        "user_id": 1,
+        "brand": "Ford",
+        "model": "Transit",
+        "year": 2020,
+        "plate_number": f"{prefix}{n:07d}",
+        "vin": f"{prefix}XXXTTGX{n:08d}",
+    }
+
+
+async def csv_body(cars: int, chunk_rows: int = 500):
+    yield (",".join(COLUMNS) + "\n").encode()
+    for start in range(0, cars, chunk_rows):
+        yield "".join(
+            ",".join(str(value) for value in car("BU", n).values()) + "\n"
+            for n in range(start, min(start + chunk_rows, cars))
+        ).encode()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cars", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine("test", f"sqlite+aiosqlite:///{tmp}/bench.db")
+        await reset_schema(engine)
+        async with session_factory(engine)() as db:
+            db.add(User(user_id=1, name="Admin", email="a@x.com", password="x"))
+            await db.commit()
+
+        async with bench_client(engine, user=ADMIN) as client:
+            start = time.perf_counter()
+            for n in range(args.cars):
+                response = await client.post("/api/v1/cars/", json=car("SI", n))
+                assert response.status_code == 200, response.text
+            single = time.perf_counter() - start
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/cars/bulk",
+                content=csv_body(args.cars),
+                headers={"Content-Type": "text/csv"},
+            )
+            bulk = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert response.json()["created"] == args.cars, response.text[:500]
+        await engine.dispose()
+
+    print(
+        f"{args.cars} cars: single={single:.2f}s  bulk={bulk:.2f}s  "
+        f"speedup={single / bulk:.1f}x  bulk peak={peak / 2**20:.1f}MiB"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Requests per second under concurrent load for each engine profile.
+
+Runs the app in-process through httpx.ASGITransport against a local SQLite
+file (or the database given by DATABASE_URL) and prints pool statistics.
+The load is a customer's car list, which reads the database on every
+request; the service list is served from the in-memory catalog and would
+barely touch the pool.
+
+    python -m benchmarks.bench_db_pool --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.common import bench_client, reset_schema, session_factory
+from database import ENGINE_PROFILES, build_engine, get_pool_stats
+from models.car import Car
+from models.user import User, UserRole
+
+OWNER = User(user_id=1, name="Owner", email="owner@example.com", role=UserRole.CUSTOMER)
+
+
+async def seed(engine, cars: int):
+    await reset_schema(engine)
+    async with session_factory(engine)() as session:
+        session.add(
+            User(user_id=1, name="Owner", email="owner@example.com", password="x")
+        )
+        session.add_all(
+            Car(
+                user_id=1,
+                brand="Ford",
+                model="Transit",
+                year=2020,
+                plate_number=f"PL{i:06d}",
+                vin=f"VINXXXXXXX{i:07d}",
+            )
+            for i in range(cars)
+        )
+        await session.commit()
+
+
+async def run_profile(profile: str, url: str, requests: int, concurrency: int):
+    engine = build_engine(profile, url)
+    await seed(engine, cars=50)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with bench_client(engine, user=OWNER) as client:
+
+        async def one_request():
+            async with semaphore:
+                response = await client.get("/api/v1/cars/")
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    stats = get_pool_stats(engine)
+    await engine.dispose()
+
+    print(
+        f"{profile:>5}: {requests / elapsed:8.1f} req/s  "
+        f"checkouts={stats['checkouts']} connects={stats['connects']} "
+        f"waits={stats['wait_count']} "
+        f"wait_avg={stats['wait_avg_ms']:.2f}ms wait_max={stats['wait_max_ms']:.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--profiles", nargs="+", default=list(ENGINE_PROFILES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        url = os.getenv("DATABASE_URL") or f"sqlite+aiosqlite:///{tmp_dir}/bench.db"
+        for profile in args.profiles:
+            await run_profile(profile, url, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+"""
+Peak RSS while exporting synthetic appointments through /export/appointments.
+
+Seeds a SQLite file with ``--rows`` appointments (1M by default), streams the
+export and reports the process peak RSS before and after. ``--materialize``
+additionally loads every row into a list first, like the old list endpoints.
+
+    python -m benchmarks.bench_export_rss --rows 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.future import select
+
+from benchmarks.common import app_overrides, reset_schema, session_factory
+from database import build_engine
+from models.appoinment import Appointment, AppointmentStatus
+from models.car import Car
+from models.services import Service
+from models.user import User, UserRole
+
+CHUNK = 20_000
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed(engine, rows: int):
+    await reset_schema(engine)
+    start = datetime(2024, 1, 1, 8, 0)
+    statuses = list(AppointmentStatus)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "user_id": 1,
+                    "name": "Admin",
+                    "email": "admin@example.com",
+                    "password": "x",
+                    "role": UserRole.ADMIN,
+                }
+            ],
+        )
+        await conn.execute(
+            insert(Car),
+            [
+                {
+                    "car_id": 1,
+                    "user_id": 1,
+                    "brand": "Skoda",
+                    "model": "Octavia",
+                    "year": 2020,
+                    "plate_number": "AA0001BB",
+                    "vin": "TMBJJ7NE0L0000001",
+                }
+            ],
+        )
+        await conn.execute(
+            insert(Service),
+            [{"service_id": 1, "name": "Diagnostics", "price": 20, "duration": 30}],
+        )
+
+        for offset in range(0, rows, CHUNK):
+            await conn.execute(
+                insert(Appointment),
+                [
+                    {
+                        "user_id": 1,
+                        "car_id": 1,
+                        "service_id": 1,
+                        "appointment_date": start + timedelta(minutes=30 * i),
+                        "status": statuses[i % len(statuses)],
+                    }
+                    for i in range(offset, min(offset + CHUNK, rows))
+                ],
+            )
+
+
+async def export(engine) -> tuple:
+    """
+    Call the ASGI app directly and discard body chunks as they arrive;
+    httpx.ASGITransport would buffer the whole body in memory.
+    """
+    admin = User(user_id=1, name="Admin", role=UserRole.ADMIN)
+    counters = {"bytes": 0, "lines": 0}
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/export/appointments",
+        "raw_path": b"/api/v1/export/appointments",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            counters["bytes"] += len(chunk)
+            counters["lines"] += chunk.count(b"\n")
+            if not message.get("more_body", False):
+                response_done.set()
+
+    with app_overrides(engine, user=admin) as asgi_app:
+        await asgi_app(scope, receive, send)
+    return counters["bytes"], counters["lines"]
+
+
+async def materialize(engine) -> int:
+    async with session_factory(engine)() as session:
+        result = await session.execute(select(Appointment))
+        appointments = result.scalars().all()
+        body = json.dumps(
+            [
+                {
+                    "appointment_id": a.appointment_id,
+                    "appointment_date": a.appointment_date.isoformat(),
+                    "status": a.status.value,
+                }
+                for a in appointments
+            ]
+        )
+    return len(body)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--materialize", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = build_engine("test", f"sqlite+aiosqlite:///{tmp_dir}/export.db")
+
+        start = time.perf_counter()
+        await seed(engine, args.rows)
+        print(f"seeded {args.rows} appointments in {time.perf_counter() - start:.1f}s")
+
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        received, lines = await export(engine)
+        elapsed = time.perf_counter() - start
+        print(
+            f"stream: {lines} rows, {received / 1e6:.1f} MB in {elapsed:.1f}s, "
+            f"peak RSS {baseline:.0f} MB -> {peak_rss_mb():.0f} MB"
+        )
+
+        if args.materialize:
+            baseline = peak_rss_mb()
+            size = await materialize(engine)
+            print(
+                f"materialized: {size / 1e6:.1f} MB body, "
+                f"peak RSS {baseline:.0f} MB -> {peak_rss_mb():.0f} MB"
+            )
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
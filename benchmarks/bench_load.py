@@ -0,0 +1,187 @@
+"""
+Throughput and latency percentiles of the load-test scenarios.
+
+Without ``--target`` the app runs in-process over ``httpx.ASGITransport``:
+a dataset of the requested size is generated first into a temporary SQLite
+file (or ``DATABASE_URL``). With ``--target`` the scenarios are sent to a
+running server, whose database must have been filled by
+``benchmarks.datagen`` with the same sizes and bcrypt rounds.
+
+Each scenario sends ``--requests`` requests from ``--concurrency`` workers.
+``--output`` writes the results as JSON; ``--compare`` checks them against
+such a file and exits with status 1 if any scenario lost more than
+``--tolerance`` of its throughput or p95.
+
+    python -m benchmarks.bench_load --appointments 1000000 --output base.json
+    python -m benchmarks.bench_load --target http://127.0.0.1:8000 \\
+        --compare base.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import httpx
+
+import crud.password_hashing as password_hashing
+from benchmarks.common import bench_client, percentile
+from benchmarks.datagen import DatasetSize, generate
+from benchmarks.scenarios import SCENARIOS
+from crud.password_hashing import BCRYPT_ROUNDS
+from database import ENGINE_PROFILES, build_engine
+
+
+async def run_scenario(client, scenario, requests: int, concurrency: int) -> dict:
+    await scenario.setup(client)
+    latencies = []
+    statuses = Counter()
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in pending:
+            start = time.perf_counter()
+            try:
+                response = await scenario.request(client, i)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+            if response.status_code not in scenario.expected:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    found = []
+    for name, current in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        if current["throughput"] < before["throughput"] * (1 - tolerance):
+            found.append(
+                f"{name}: throughput {current['throughput']}/s "
+                f"(was {before['throughput']}/s)"
+            )
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            found.append(
+                f"{name}: p95 {current['p95_ms']}ms (was {before['p95_ms']}ms)"
+            )
+    return found
+
+
+async def run_all(client, names, size, args) -> dict:
+    scenarios = {}
+    for name in names:
+        scenario = SCENARIOS[name](size, args.seed)
+        stats = await run_scenario(client, scenario, args.requests, args.concurrency)
+        scenarios[name] = stats
+        print(
+            f"{name:>15}: {stats['throughput']:8.1f} req/s  "
+            f"p50={stats['p50_ms']:7.1f}ms  p95={stats['p95_ms']:7.1f}ms  "
+            f"p99={stats['p99_ms']:7.1f}ms  errors={stats['errors']}  "
+            f"{stats['statuses']}"
+        )
+    return scenarios
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--target", help="Base URL of a running server (default: in-process)"
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run; repeatable (default: all)",
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    defaults = DatasetSize()
+    for field in DatasetSize._fields:
+        parser.add_argument(
+            f"--{field.replace('_', '-')}", type=int, default=getattr(defaults, field)
+        )
+    parser.add_argument(
+        "--profile", choices=list(ENGINE_PROFILES), default="prod", help="In-process"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bcrypt-rounds", type=int, default=BCRYPT_ROUNDS)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file from --output")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    size = DatasetSize(*(getattr(args, field) for field in DatasetSize._fields))
+    names = args.scenario or list(SCENARIOS)
+
+    if args.target:
+        async with httpx.AsyncClient(base_url=args.target, timeout=None) as client:
+            scenarios = await run_all(client, names, size, args)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = os.getenv("DATABASE_URL") or f"sqlite+aiosqlite:///{tmp}/load.db"
+            engine = build_engine(args.profile, url)
+            written = await generate(engine, size, args.seed, args.bcrypt_rounds)
+            print(", ".join(f"{table}={count}" for table, count in written.items()))
+            # Match the dataset's hashes so logins do not rehash them.
+            password_hashing.password_hasher = password_hashing.PasswordHasher(
+                rounds=args.bcrypt_rounds
+            )
+            async with bench_client(engine) as client:
+                scenarios = await run_all(client, names, size, args)
+            password_hashing.password_hasher.shutdown()
+            await engine.dispose()
+
+    results = {
+        "meta": {
+            "target": args.target or "in-process",
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "dataset": size._asdict(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "profile": None if args.target else args.profile,
+            "bcrypt_rounds": args.bcrypt_rounds,
+        },
+        "scenarios": scenarios,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
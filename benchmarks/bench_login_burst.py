@@ -0,0 +1,91 @@
+"""
+Latency of an unrelated endpoint while a burst of logins is being processed.
+
+Compares bcrypt running inline on the event loop (the old behaviour) with the
+bounded worker pool in crud.password_hashing.
+
+    python -m benchmarks.bench_login_burst --logins 40 --rounds 12
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from fastapi import HTTPException
+
+import crud.password_hashing as password_hashing
+from benchmarks.common import bench_client, percentile, reset_schema
+from database import build_engine
+
+
+class InlineHasher(password_hashing.PasswordHasher):
+    """Blocks the event loop exactly like calling bcrypt in the handler."""
+
+    async def _run(self, func, *args):
+        return func(*args)
+
+
+async def run(mode: str, url: str, logins: int, rounds: int):
+    engine = build_engine("test", url)
+    await reset_schema(engine)
+
+    hasher_cls = InlineHasher if mode == "inline" else password_hashing.PasswordHasher
+    password_hashing.password_hasher = hasher_cls(rounds=rounds, queue_limit=logins * 2)
+
+    async with bench_client(engine) as client:
+        credentials = {"email": "burst@example.com", "password": "burst-password"}
+        await client.post(
+            "/api/v1/users/register",
+            json={"name": "Burst User", "role": "CUSTOMER", **credentials},
+        )
+
+        probe_latencies = []
+        burst_done = asyncio.Event()
+
+        async def probe():
+            # A probe is "issued" when its 5 ms pause ends, so time spent
+            # waiting for a blocked event loop counts towards its latency.
+            while not burst_done.is_set():
+                issued_at = time.perf_counter() + 0.005
+                await asyncio.sleep(0.005)
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - issued_at)
+
+        async def login():
+            try:
+                await client.post("/api/v1/users/login", json=credentials)
+            except HTTPException:
+                pass
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        burst_done.set()
+        await probe_task
+
+    password_hashing.password_hasher.shutdown()
+    await engine.dispose()
+
+    print(
+        f"{mode:>6}: burst {elapsed:6.2f}s  probes={len(probe_latencies):4d}  "
+        f"p50={percentile(probe_latencies, 50) * 1000:7.1f}ms  "
+        f"p99={percentile(probe_latencies, 99) * 1000:7.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        url = f"sqlite+aiosqlite:///{tmp_dir}/bench.db"
+        for mode in ("inline", "pool"):
+            await run(mode, url, args.logins, args.rounds)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Per-request cost of MetricsMiddleware.
+
+Calls a minimal ASGI app ``--requests`` times directly (no HTTP client, no
+sockets), bare and wrapped in MetricsMiddleware, spread over ``--routes``
+route labels, and reports the difference per request. Rendering /metrics
+is timed as well.
+
+    python -m benchmarks.bench_metrics --requests 200000
+"""
+
+import argparse
+import asyncio
+import time
+
+from crud.metrics import Metrics, MetricsMiddleware
+
+
+class FakeRoute:
+    def __init__(self, path_format: str):
+        self.path_format = path_format
+
+
+async def minimal_app(scope, receive, send):
+    scope["route"] = scope["bench.route"]
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def run(app, scopes: list, requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        await app(dict(scopes[i % len(scopes)]), receive, send)
+    return time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--routes", type=int, default=50)
+    args = parser.parse_args()
+
+    scopes = [
+        {
+            "type": "http",
+            "method": "GET",
+            "path": f"/api/v1/items{i}/1",
+            "bench.route": FakeRoute(f"/api/v1/items{i}/{{item_id}}"),
+        }
+        for i in range(args.routes)
+    ]
+    registry = Metrics()
+    wrapped = MetricsMiddleware(minimal_app, registry)
+
+    # Warm up both paths before measuring.
+    await run(minimal_app, scopes, 10_000)
+    await run(wrapped, scopes, 10_000)
+
+    bare = await run(minimal_app, scopes, args.requests)
+    instrumented = await run(wrapped, scopes, args.requests)
+    overhead_us = (instrumented - bare) / args.requests * 1e6
+    print(
+        f"{args.requests} requests over {args.routes} routes: "
+        f"bare {bare / args.requests * 1e6:.2f}us, "
+        f"with metrics {instrumented / args.requests * 1e6:.2f}us, "
+        f"overhead {overhead_us:.2f}us per request"
+    )
+
+    started = time.perf_counter()
+    body = registry.render()
+    print(
+        f"render: {len(body.splitlines())} lines in "
+        f"{(time.perf_counter() - started) * 1000:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
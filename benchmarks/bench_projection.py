@@ -0,0 +1,104 @@
+"""
+List reads loading whole ORM entities versus selecting only the response
+columns, for ``--rows`` rows of mechanics, cars and appointments.
+
+Each variant runs the query and builds the response models, as the list
+endpoints do. Time is the best of ``--repeat`` runs; memory is the peak
+allocated during one run, with the session (and its identity map) still
+open.
+
+    python -m benchmarks.bench_projection --rows 100000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy.future import select
+
+from benchmarks.common import session_factory
+from benchmarks.datagen import DatasetSize, generate
+from crud.serialization import response_columns, response_models
+from database import build_engine
+from models.appoinment import Appointment
+from models.car import Car
+from models.mechanic import Mechanic
+from schemas.appoinment import AppointmentResponse
+from schemas.car import CarResponse
+from schemas.mechanic import MechanicResponse
+
+CASES = (
+    (Mechanic, MechanicResponse),
+    (Car, CarResponse),
+    (Appointment, AppointmentResponse),
+)
+
+
+async def load(factory, entity, model, rows: int, entities: bool) -> int:
+    order = entity.__mapper__.primary_key[0]
+    if entities:
+        query = select(entity)
+    else:
+        query = select(*response_columns(entity, model))
+    async with factory() as db:
+        result = await db.execute(query.order_by(order).limit(rows))
+        found = result.scalars().all() if entities else result.all()
+        return len(response_models(model, found))
+
+
+async def measure(factory, entity, model, args, entities: bool) -> tuple:
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        count = await load(factory, entity, model, args.rows, entities)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    await load(factory, entity, model, args.rows, entities)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, best, peak
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine("test", f"sqlite+aiosqlite:///{tmp}/bench.db")
+        await generate(
+            engine,
+            DatasetSize(
+                users=args.rows,
+                cars_per_user=1,
+                mechanics=args.rows,
+                services=20,
+                appointments=args.rows,
+            ),
+            rounds=4,
+        )
+        factory = session_factory(engine)
+
+        for entity, model in CASES:
+            count, full_time, full_peak = await measure(
+                factory, entity, model, args, entities=True
+            )
+            _, cols_time, cols_peak = await measure(
+                factory, entity, model, args, entities=False
+            )
+            print(
+                f"{entity.__tablename__:>12} x{count}: "
+                f"entities={full_time:6.2f}s {full_peak / 2**20:6.1f}MiB  "
+                f"columns={cols_time:6.2f}s {cols_peak / 2**20:6.1f}MiB  "
+                f"speedup={full_time / cols_time:4.1f}x  "
+                f"memory={cols_peak / full_peak:4.0%}"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
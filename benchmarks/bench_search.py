@@ -0,0 +1,157 @@
+"""
+Service search latency: ``ILIKE '%name%'`` against the search index.
+
+Seeds ``--services`` synthetic services and runs the same ``--queries``
+queries (whole words, prefixes and misspellings) through the former
+``Service.name.ilike`` query and through the trigram index. When
+``DATABASE_URL`` points at MySQL, the FULLTEXT index is timed as well.
+
+    python -m benchmarks.bench_search --services 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from decimal import Decimal
+
+from sqlalchemy.future import select
+
+from benchmarks.common import percentile, reset_schema, session_factory
+from crud.search import TrigramIndex, fulltext_search
+from database import build_engine
+from models.services import Service
+
+PARTS = (
+    "brake oil engine transmission suspension exhaust tyre battery clutch "
+    "coolant alignment diagnostics filter gearbox steering wiper headlight "
+    "radiator timing belt"
+).split()
+ACTIONS = (
+    "replacement inspection repair flush check service adjustment cleaning "
+    "upgrade diagnosis"
+).split()
+GRADES = "basic premium express full eco sport fleet".split()
+
+
+def misspell(rng: random.Random, word: str) -> str:
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1 :]
+
+
+def make_queries(rng: random.Random, count: int) -> list:
+    queries = []
+    for i in range(count):
+        part, action = rng.choice(PARTS), rng.choice(ACTIONS)
+        kind = i % 3
+        if kind == 0:
+            queries.append(f"{part} {action}")
+        elif kind == 1:
+            queries.append(f"{part} {action[:3]}")
+        else:
+            queries.append(f"{misspell(rng, part)} {action}")
+    return queries
+
+
+async def seed(engine, count: int, rng: random.Random):
+    factory = session_factory(engine)
+    batch = 5000
+    for offset in range(0, count, batch):
+        async with factory() as db:
+            db.add_all(
+                Service(
+                    name=(
+                        f"{rng.choice(GRADES).title()} {rng.choice(PARTS).title()} "
+                        f"{rng.choice(ACTIONS).title()}"
+                    ),
+                    description=(
+                        f"{rng.choice(ACTIONS)} of the {rng.choice(PARTS)} "
+                        f"and {rng.choice(PARTS)}, package {i}"
+                    ),
+                    price=Decimal(rng.randint(1000, 50000)) / 100,
+                    duration=rng.choice([30, 45, 60, 90, 120]),
+                )
+                for i in range(offset, min(offset + batch, count))
+            )
+            await db.commit()
+
+
+async def time_ilike(engine, queries: list) -> tuple:
+    timings, hits = [], 0
+    async with session_factory(engine)() as db:
+        for query in queries:
+            start = time.perf_counter()
+            result = await db.execute(
+                select(Service).where(Service.name.ilike(f"%{query}%"))
+            )
+            hits += len(result.scalars().all())
+            timings.append(time.perf_counter() - start)
+    return timings, hits
+
+
+def time_index(index: TrigramIndex, queries: list, prefix: bool) -> tuple:
+    timings, hits = [], 0
+    for query in queries:
+        start = time.perf_counter()
+        hits += len(index.search(query, prefix=prefix))
+        timings.append(time.perf_counter() - start)
+    return timings, hits
+
+
+async def time_fulltext(engine, queries: list) -> tuple:
+    timings, hits = [], 0
+    async with session_factory(engine)() as db:
+        for query in queries:
+            start = time.perf_counter()
+            hits += len(await fulltext_search(db, query, prefix=True))
+            timings.append(time.perf_counter() - start)
+    return timings, hits
+
+
+def report(name: str, timings: list, hits: int):
+    print(
+        f"{name}: p50={percentile(timings, 50) * 1000:.2f}ms "
+        f"p99={percentile(timings, 99) * 1000:.2f}ms, {hits} results"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        url = os.getenv("DATABASE_URL", f"sqlite+aiosqlite:///{tmp_dir}/search.db")
+        engine = build_engine("test", url)
+        await reset_schema(engine)
+        await seed(engine, args.services, rng)
+        queries = make_queries(rng, args.queries)
+
+        report("ilike", *await time_ilike(engine, queries))
+
+        async with session_factory(engine)() as db:
+            result = await db.execute(
+                select(Service.service_id, Service.name, Service.description)
+            )
+            rows = result.all()
+        start = time.perf_counter()
+        index = TrigramIndex(rows)
+        print(
+            f"trigram index: built over {len(rows)} services "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        report("trigram", *time_index(index, queries, prefix=False))
+        report("trigram prefix", *time_index(index, queries, prefix=True))
+
+        if engine.dialect.name == "mysql":
+            report("fulltext", *await time_fulltext(engine, queries))
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
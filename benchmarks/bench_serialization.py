@@ -0,0 +1,160 @@
+"""
+Serialization cost of a list response per ``--rows`` rows, before and
+after the fast path in crud.serialization.
+
+"before" copies each ORM object into its response model field by field,
+then runs FastAPI's response_model pass (dump, validate, serialize) and
+encodes with the stdlib JSONResponse, as the handlers used to. "after"
+builds the models with ``response_models`` and encodes them once with
+``json_response``. The services case starts from already-built models, as
+the catalog snapshot holds them, so it measures encoding alone. No database
+is involved; the rows are objects in memory.
+
+    python -m benchmarks.bench_serialization --rows 10000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List, Union
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from crud.pagination import Page
+from crud.serialization import json_response, response_models
+from models.appoinment import Appointment, AppointmentStatus
+from models.car import Car
+from schemas.appoinment import AppointmentResponse
+from schemas.car import CarResponse
+from schemas.services import ServiceResponse
+
+
+def cars(rows: int) -> list:
+    return [
+        Car(
+            car_id=n,
+            user_id=1 + n % 100,
+            brand="Ford",
+            model="Transit",
+            year=2020,
+            plate_number=f"PL{n:07d}",
+            vin=f"VINXXXXXX{n:08d}",
+        )
+        for n in range(rows)
+    ]
+
+
+def appointments(rows: int) -> list:
+    start = datetime(2030, 1, 7, 8)
+    return [
+        Appointment(
+            appointment_id=n,
+            user_id=1 + n % 100,
+            car_id=n,
+            service_id=1 + n % 20,
+            mechanic_id=None,
+            appointment_date=start + timedelta(minutes=30 * n),
+            status=AppointmentStatus.PENDING,
+        )
+        for n in range(rows)
+    ]
+
+
+def services(rows: int) -> list:
+    return [
+        ServiceResponse(
+            service_id=n,
+            name=f"Service {n}",
+            description=f"Description of service {n}",
+            price=Decimal("10.00") + n,
+            duration=30,
+        )
+        for n in range(rows)
+    ]
+
+
+def car_response(car) -> CarResponse:
+    return CarResponse(
+        car_id=car.car_id,
+        user_id=car.user_id,
+        brand=car.brand,
+        model=car.model,
+        year=car.year,
+        plate_number=car.plate_number,
+        vin=car.vin,
+    )
+
+
+def appointment_response(appt) -> AppointmentResponse:
+    return AppointmentResponse(
+        appointment_id=appt.appointment_id,
+        user_id=appt.user_id,
+        car_id=appt.car_id,
+        service_id=appt.service_id,
+        mechanic_id=appt.mechanic_id,
+        appointment_date=appt.appointment_date,
+        status=appt.status,
+    )
+
+
+async def before(field, build, objects) -> bytes:
+    page = Page(items=[build(obj) for obj in objects], next_cursor=None)
+    content = await serialize_response(
+        field=field, response_content=page, is_coroutine=True
+    )
+    return JSONResponse(content).body
+
+
+def after(model, objects) -> bytes:
+    items = response_models(model, objects) if model else objects
+    return json_response({"items": items, "next_cursor": None}).body
+
+
+async def best_of(repeat: int, run) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        if asyncio.iscoroutine(result):
+            await result
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("cars", CarResponse, car_response, cars(args.rows)),
+        (
+            "appointments",
+            AppointmentResponse,
+            appointment_response,
+            appointments(args.rows),
+        ),
+        ("services", None, lambda service: service, services(args.rows)),
+    ]
+    for name, model, build, objects in cases:
+        item_type = model or ServiceResponse
+        field = create_model_field(
+            name=f"Response_{name}",
+            type_=Union[Page[item_type], List[item_type]],
+            mode="serialization",
+        )
+        slow = await best_of(args.repeat, lambda: before(field, build, objects))
+        fast = await best_of(args.repeat, lambda: after(model, objects))
+        print(
+            f"{name:>12} x{args.rows}: before={slow * 1000:7.1f}ms  "
+            f"after={fast * 1000:7.1f}ms  speedup={slow / fast:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Latency of the service catalog endpoints with and without the in-memory
+snapshot.
+
+Seeds ``--services`` services, then times ``--requests`` GET /services/
+calls (plus a conditional request with If-None-Match) with the snapshot
+warm, and again invalidating it before every request so each one loads the
+catalog from the database.
+
+    python -m benchmarks.bench_service_catalog --services 500 --requests 500
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from decimal import Decimal
+
+from benchmarks.common import bench_client, percentile, reset_schema, session_factory
+from crud.service_catalog import service_catalog
+from database import build_engine
+from models.services import Service
+
+
+async def seed(engine, count: int):
+    async with session_factory(engine)() as db:
+        db.add_all(
+            Service(
+                name=f"Service {i}",
+                description=f"Description of service {i}",
+                price=Decimal("10.00") + i,
+                duration=30 + i % 4 * 15,
+            )
+            for i in range(count)
+        )
+        await db.commit()
+
+
+async def run(client, requests: int, invalidate: bool, headers=None) -> list:
+    timings = []
+    for _ in range(requests):
+        if invalidate:
+            await service_catalog.invalidate()
+        start = time.perf_counter()
+        response = await client.get("/api/v1/services/", headers=headers)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code in (200, 304), response.status_code
+    return timings
+
+
+def report(name: str, timings: list):
+    print(
+        f"{name}: p50={percentile(timings, 50) * 1000:.2f}ms "
+        f"p99={percentile(timings, 99) * 1000:.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = build_engine("test", f"sqlite+aiosqlite:///{tmp_dir}/catalog.db")
+        await reset_schema(engine)
+        await seed(engine, args.services)
+
+        async with bench_client(engine) as client:
+            report("uncached", await run(client, args.requests, invalidate=True))
+            etag = (await client.get("/api/v1/services/")).headers["ETag"]
+            report("cached", await run(client, args.requests, invalidate=False))
+            report(
+                "cached 304",
+                await run(
+                    client,
+                    args.requests,
+                    invalidate=False,
+                    headers={"If-None-Match": etag},
+                ),
+            )
+        print(f"catalog stats: {service_catalog.stats()}")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+"""
+Peak RSS and event-loop stalls while uploading a large document.
+
+Sends a ``--size-mb`` multipart upload (500 MB by default) to
+/documents/upload in 1 MB body chunks, while a ticker task measures how late
+the event loop wakes it up. ``--legacy`` repeats the upload with the old
+handler behaviour (``await file.read()`` plus a blocking write).
+
+    python -m benchmarks.bench_upload --size-mb 500 --legacy
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import resource
+import tempfile
+import time
+from datetime import date
+
+import crud.document
+import crud.storage
+from benchmarks.common import app_overrides, reset_schema
+from crud.mechanic import get_current_mechanic
+from crud.storage import ContentStore, StoredFile
+from database import build_engine
+from main import app
+from models.mechanic import Mechanic, MechanicRole
+
+BOUNDARY = "benchboundary"
+BODY_CHUNK = 1024 * 1024
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def legacy_save_upload(file, directory: str, filename: str) -> StoredFile:
+    path = os.path.join(directory, filename)
+    content = await file.read()
+    with open(path, "wb") as buffer:
+        buffer.write(content)
+    return StoredFile(
+        path=path, size=len(content), sha256=hashlib.sha256(content).hexdigest()
+    )
+
+
+async def upload(engine, size: int) -> int:
+    """Call the ASGI app directly, feeding the request body chunk by chunk."""
+    head = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="scan.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    block = os.urandom(BODY_CHUNK)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/v1/documents/upload",
+        "raw_path": b"/api/v1/documents/upload",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+            (b"content-length", str(len(head) + size + len(tail)).encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+
+    parts = [head]
+    remaining = size
+    sent = 0
+    done = asyncio.Event()
+    status_code = 0
+
+    async def receive():
+        nonlocal remaining, sent
+        if done.is_set():
+            return {"type": "http.disconnect"}
+        if parts:
+            return {"type": "http.request", "body": parts.pop(), "more_body": True}
+        if remaining > 0:
+            chunk = block[: min(BODY_CHUNK, remaining)]
+            remaining -= len(chunk)
+            return {"type": "http.request", "body": chunk, "more_body": True}
+        if sent == 0:
+            sent = 1
+            return {"type": "http.request", "body": tail, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif not message.get("more_body", False):
+            done.set()
+
+    with app_overrides(engine) as asgi_app:
+        await asgi_app(scope, receive, send)
+    return status_code
+
+
+async def measure(engine, size: int) -> tuple:
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        interval = 0.005
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - started - interval)
+
+    tick = asyncio.create_task(ticker())
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    status_code = await upload(engine, size)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+    return status_code, elapsed, baseline, peak_rss_mb(), max(lags)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=500)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = build_engine("test", f"sqlite+aiosqlite:///{tmp_dir}/upload.db")
+        await reset_schema(engine)
+        crud.document.document_store = ContentStore(tmp_dir)
+        crud.storage.MAX_UPLOAD_SIZE = size * 2
+        app.dependency_overrides[get_current_mechanic] = lambda: Mechanic(
+            mechanic_id=1,
+            name="Bench",
+            birth_date=date(1990, 1, 1),
+            login="bench",
+            role=MechanicRole.ADMIN,
+            position="Mechanic",
+        )
+
+        modes = [("streaming", crud.storage.save_upload)]
+        if args.legacy:
+            modes.append(("legacy", legacy_save_upload))
+
+        for name, save in modes:
+            crud.storage.save_upload = save
+            status_code, elapsed, before, after, max_lag = await measure(engine, size)
+            print(
+                f"{name}: {args.size_mb} MB -> HTTP {status_code} in {elapsed:.1f}s, "
+                f"peak RSS {before:.0f} MB -> {after:.0f} MB, "
+                f"max event-loop lag {max_lag * 1000:.1f}ms"
+            )
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Requests per second of ``serve.py`` by worker count.
+
+Generates a small dataset into a SQLite file (or uses ``DATABASE_URL``),
+then for each ``--workers`` value starts the launcher, loads it for
+``--duration`` seconds from ``--clients`` client processes and stops it with
+SIGTERM. The requests mix the catalog endpoints and the root endpoint, so
+they measure the app's CPU cost rather than the database. Scaling can only
+be near-linear while there are free cores for both workers and clients.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 8 --clients 8
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.datagen import DatasetSize, generate
+from database import build_engine
+
+PATHS = ("/", "/api/v1/services/?limit=20", "/api/v1/services/{id}")
+
+
+async def _client(url: str, duration: float, concurrency: int, services: int) -> int:
+    done = 0
+    deadline = time.monotonic() + duration
+
+    async def worker(offset: int):
+        nonlocal done
+        i = offset
+        while time.monotonic() < deadline:
+            path = PATHS[i % len(PATHS)].format(id=1 + i % services)
+            response = await client.get(path)
+            assert response.status_code == 200, response.status_code
+            done += 1
+            i += concurrency
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return done
+
+
+def client_process(args) -> int:
+    return asyncio.run(_client(*args))
+
+
+def wait_until_up(url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def run(workers: int, env: dict, args) -> float:
+    url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "serve.py",
+            "--workers",
+            str(workers),
+            "--port",
+            str(args.port),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up(url)
+        with multiprocessing.Pool(args.clients) as pool:
+            counts = pool.map(
+                client_process,
+                [(url, args.duration, args.concurrency, args.services)] * args.clients,
+            )
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    return sum(counts) / args.duration
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=16, help="Per client")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.getenv("DATABASE_URL") or f"sqlite+aiosqlite:///{tmp}/workers.db"
+        engine = build_engine("test", url)
+        await generate(
+            engine, DatasetSize(users=10, services=args.services, appointments=100)
+        )
+        await engine.dispose()
+
+        env = dict(
+            os.environ,
+            DATABASE_URL=url,
+            DB_PROFILE="prod",
+            EMAIL_WORKER_ENABLED="false",
+            SLOW_REQUEST_MS="60000",
+        )
+        baseline = None
+        for workers in args.workers:
+            rate = run(workers, env, args)
+            baseline = baseline or rate / workers
+            print(
+                f"{workers:>2} workers: {rate:8.1f} req/s  "
+                f"scaling={rate / baseline / workers:5.0%} of linear"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
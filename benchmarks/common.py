@@ -0,0 +1,64 @@
+"""Helpers shared by the benchmark scripts."""
+
+import math
+from contextlib import asynccontextmanager, contextmanager
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from crud.user import get_current_user
+from database import Base, get_async_db, get_session_factory
+from main import app
+
+
+async def reset_schema(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def session_factory(engine):
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@contextmanager
+def app_overrides(engine, user=None):
+    """
+    Bind the app to ``engine``; when ``user`` is given, it is used as the
+    authenticated user.
+    """
+    factory = session_factory(engine)
+
+    async def get_db_override():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = get_db_override
+    app.dependency_overrides[get_session_factory] = lambda: factory
+    if user is not None:
+        app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        yield app
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        app.dependency_overrides.pop(get_session_factory, None)
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@asynccontextmanager
+async def bench_client(engine, user=None):
+    """An httpx client talking to the app in-process, bound to ``engine``."""
+    with app_overrides(engine, user):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            yield client
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
@@ -0,0 +1,259 @@
+"""
+Bulk synthetic data for load tests: users, cars, services, mechanics and
+appointments.
+
+Rows are built as plain dicts and written with executemany Core inserts in
+batches, one transaction per table; every user shares one precomputed
+bcrypt hash. Output is deterministic for a given ``--seed``, so runs
+against the same sizes are comparable.
+
+User 1 is an admin (``admin@bench.example``) and mechanic 1 an admin
+mechanic (``bench-admin``); every account's password is ``PASSWORD``.
+
+    python -m benchmarks.datagen --url sqlite+aiosqlite:///bench.db \\
+        --users 100000 --appointments 1000000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+import bcrypt
+from sqlalchemy import insert
+
+from benchmarks.common import reset_schema
+from crud.password_hashing import BCRYPT_ROUNDS
+from database import build_engine
+from models.appoinment import Appointment, AppointmentStatus
+from models.car import Car
+from models.mechanic import Mechanic, MechanicRole
+from models.services import Service
+from models.user import User, UserRole
+
+PASSWORD = "benchmark-password"
+ADMIN_EMAIL = "admin@bench.example"
+ADMIN_MECHANIC_LOGIN = "bench-admin"
+BATCH_SIZE = 10_000
+# Appointments are spread over this many days before and after today.
+SPREAD_DAYS = 180
+
+BRANDS = {
+    "Skoda": ["Octavia", "Fabia", "Superb"],
+    "Toyota": ["Corolla", "RAV4", "Camry"],
+    "Volkswagen": ["Golf", "Passat", "Tiguan"],
+    "Renault": ["Clio", "Megane", "Duster"],
+    "Ford": ["Focus", "Fiesta", "Kuga"],
+}
+PARTS = (
+    "brake oil engine transmission suspension exhaust tyre battery clutch "
+    "coolant alignment diagnostics filter gearbox steering wiper headlight"
+).split()
+ACTIONS = "replacement inspection repair flush check service adjustment".split()
+DURATIONS = (30, 45, 60, 90, 120)
+
+
+class DatasetSize(NamedTuple):
+    users: int = 1_000
+    cars_per_user: int = 2
+    mechanics: int = 50
+    services: int = 200
+    appointments: int = 10_000
+
+
+def user_email(user_id: int) -> str:
+    return ADMIN_EMAIL if user_id == 1 else f"user{user_id}@bench.example"
+
+
+def user_car_ids(user_id: int, size: DatasetSize) -> range:
+    """Cars are numbered per owner, so appointments need no lookups."""
+    first = (user_id - 1) * size.cars_per_user + 1
+    return range(first, first + size.cars_per_user)
+
+
+def base_date() -> datetime:
+    today = date.today()
+    return datetime(today.year, today.month, today.day)
+
+
+def _batches(rows, batch_size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def users(size: DatasetSize, password_hash: str):
+    for user_id in range(1, size.users + 1):
+        yield {
+            "user_id": user_id,
+            "name": f"Bench User {user_id}",
+            "email": user_email(user_id),
+            "password": password_hash,
+            "role": UserRole.ADMIN if user_id == 1 else UserRole.CUSTOMER,
+        }
+
+
+def cars(size: DatasetSize, rng: random.Random):
+    brands = list(BRANDS)
+    for user_id in range(1, size.users + 1):
+        for car_id in user_car_ids(user_id, size):
+            brand = rng.choice(brands)
+            yield {
+                "car_id": car_id,
+                "user_id": user_id,
+                "brand": brand,
+                "model": rng.choice(BRANDS[brand]),
+                "year": rng.randint(2005, 2024),
+                "plate_number": f"BN{car_id:07d}",
+                "vin": f"BENCH{car_id:012d}",
+            }
+
+
+def mechanics(size: DatasetSize, password_hash: str):
+    for mechanic_id in range(1, size.mechanics + 1):
+        yield {
+            "mechanic_id": mechanic_id,
+            "name": f"Bench Mechanic {mechanic_id}",
+            "birth_date": date(1980 + mechanic_id % 20, 1 + mechanic_id % 12, 1),
+            "login": (
+                ADMIN_MECHANIC_LOGIN if mechanic_id == 1 else f"mechanic{mechanic_id}"
+            ),
+            "password": password_hash,
+            "role": MechanicRole.ADMIN if mechanic_id == 1 else MechanicRole.MECHANIC,
+            "position": "Mechanic",
+        }
+
+
+def services(size: DatasetSize, rng: random.Random):
+    for service_id in range(1, size.services + 1):
+        part, action = rng.choice(PARTS), rng.choice(ACTIONS)
+        yield {
+            "service_id": service_id,
+            "name": f"{part.title()} {action} {service_id}",
+            "description": f"{action.title()} of the {part}",
+            "price": rng.randint(1_000, 50_000) / 100,
+            "duration": rng.choice(DURATIONS),
+        }
+
+
+def appointments(size: DatasetSize, rng: random.Random):
+    start = base_date() - timedelta(days=SPREAD_DAYS)
+    # 20 half-hour slots per working day, from 8:00.
+    slot_times = [
+        start + timedelta(days=slot // 20, hours=8, minutes=30 * (slot % 20))
+        for slot in range(2 * SPREAD_DAYS * 20)
+    ]
+    half = len(slot_times) // 2
+    random_ = rng.random
+    for _ in range(size.appointments):
+        slot = int(random_() * len(slot_times))
+        draw = random_()
+        if slot < half:
+            status = (
+                AppointmentStatus.CANCELLED
+                if draw < 0.1
+                else AppointmentStatus.COMPLETED
+            )
+        else:
+            status = (
+                AppointmentStatus.PENDING
+                if draw < 0.25
+                else AppointmentStatus.CONFIRMED
+            )
+        user_id = 1 + int(random_() * size.users)
+        yield {
+            "user_id": user_id,
+            "car_id": (user_id - 1) * size.cars_per_user
+            + 1
+            + int(random_() * size.cars_per_user),
+            "service_id": 1 + int(random_() * size.services),
+            "mechanic_id": (
+                None
+                if status is AppointmentStatus.PENDING
+                else 1 + int(random_() * size.mechanics)
+            ),
+            "appointment_date": slot_times[slot],
+            "status": status,
+        }
+
+
+async def generate(
+    engine,
+    size: DatasetSize = DatasetSize(),
+    seed: int = 42,
+    rounds: int = BCRYPT_ROUNDS,
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    """Recreate the schema and fill it; returns rows written per table."""
+    rng = random.Random(seed)
+    password_hash = bcrypt.hashpw(
+        PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=rounds)
+    ).decode("utf-8")
+
+    await reset_schema(engine)
+    tables = [
+        (User, users(size, password_hash)),
+        (Mechanic, mechanics(size, password_hash)),
+        (Service, services(size, rng)),
+        (Car, cars(size, rng)),
+        (Appointment, appointments(size, rng)),
+    ]
+    written = {}
+    for model, rows in tables:
+        # On SQLite, building secondary indexes once after the load is
+        # cheaper than updating them row by row. MySQL will not drop indexes
+        # backing foreign keys, so it skips the per-row checks instead.
+        indexes = []
+        if engine.dialect.name == "sqlite":
+            indexes = list(model.__table__.indexes)
+        count = 0
+        async with engine.begin() as conn:
+            if engine.dialect.name == "mysql":
+                await conn.exec_driver_sql("SET foreign_key_checks = 0")
+                await conn.exec_driver_sql("SET unique_checks = 0")
+            for index in indexes:
+                await conn.run_sync(index.drop)
+            for batch in _batches(rows, batch_size):
+                await conn.execute(insert(model), batch)
+                count += len(batch)
+            for index in indexes:
+                await conn.run_sync(index.create)
+        written[model.__tablename__] = count
+    return written
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", required=True, help="Database URL to (re)create")
+    defaults = DatasetSize()
+    for field in DatasetSize._fields:
+        parser.add_argument(
+            f"--{field.replace('_', '-')}", type=int, default=getattr(defaults, field)
+        )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bcrypt-rounds", type=int, default=BCRYPT_ROUNDS)
+    args = parser.parse_args()
+
+    size = DatasetSize(*(getattr(args, field) for field in DatasetSize._fields))
+    engine = build_engine("test", args.url)
+    started = time.perf_counter()
+    written = await generate(engine, size, args.seed, args.bcrypt_rounds)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    total = sum(written.values())
+    print(
+        ", ".join(f"{table}={count}" for table, count in written.items())
+        + f" in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""
+Load-test scenarios over a dataset written by ``benchmarks.datagen``.
+
+A scenario logs in what it needs once in ``setup`` and then issues one
+request per call; the runner in ``benchmarks.bench_load`` drives the calls
+from concurrent workers and times them.
+"""
+
+import random
+from datetime import timedelta
+from typing import Dict
+
+from benchmarks.datagen import (
+    ADMIN_EMAIL,
+    PASSWORD,
+    SPREAD_DAYS,
+    DatasetSize,
+    base_date,
+    user_car_ids,
+    user_email,
+)
+
+API = "/api/v1"
+# Customers logged in up front by the booking burst.
+BOOKING_CUSTOMERS = 50
+# Days of appointments read by each admin export.
+EXPORT_WINDOW_DAYS = 7
+
+
+async def login(client, email: str) -> Dict[str, str]:
+    response = await client.post(
+        f"{API}/users/login", json={"email": email, "password": PASSWORD}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class Scenario:
+    """A named stream of requests; ``expected`` statuses are not errors."""
+
+    name = ""
+    expected = frozenset({200})
+
+    def __init__(self, size: DatasetSize, seed: int = 42):
+        self.size = size
+        self.rng = random.Random(seed)
+
+    async def setup(self, client):
+        pass
+
+    async def request(self, client, i: int):
+        raise NotImplementedError
+
+
+class LoginStorm(Scenario):
+    """Password logins of distinct customers; bcrypt dominates."""
+
+    name = "login_storm"
+
+    async def request(self, client, i: int):
+        email = user_email(2 + i % max(self.size.users - 1, 1))
+        return await client.post(
+            f"{API}/users/login", json={"email": email, "password": PASSWORD}
+        )
+
+
+class BookingBurst(Scenario):
+    """
+    Customers booking their own cars into the same few days, past the end of
+    the generated schedule. A full slot answers 409, which is not an error.
+    """
+
+    name = "booking_burst"
+    expected = frozenset({200, 409})
+
+    async def setup(self, client):
+        customers = range(2, min(self.size.users, BOOKING_CUSTOMERS + 1) + 1)
+        self.customers = [
+            (user_id, await login(client, user_email(user_id))) for user_id in customers
+        ]
+        self.first_day = base_date() + timedelta(days=SPREAD_DAYS + 1)
+
+    async def request(self, client, i: int):
+        user_id, headers = self.customers[i % len(self.customers)]
+        rng = self.rng
+        slot = rng.randrange(3 * 20)
+        appointment_date = self.first_day + timedelta(
+            days=slot // 20, hours=8, minutes=30 * (slot % 20)
+        )
+        return await client.post(
+            f"{API}/appointments/",
+            headers=headers,
+            json={
+                "user_id": user_id,
+                "car_id": user_car_ids(user_id, self.size)[0],
+                "service_id": rng.randint(1, self.size.services),
+                "appointment_date": appointment_date.isoformat(),
+            },
+        )
+
+
+class AdminExport(Scenario):
+    """NDJSON exports of a week of appointments, read to the end."""
+
+    name = "admin_export"
+
+    async def setup(self, client):
+        self.headers = await login(client, ADMIN_EMAIL)
+        self.start = base_date() - timedelta(days=SPREAD_DAYS)
+
+    async def request(self, client, i: int):
+        date_from = self.start + timedelta(
+            days=self.rng.randrange(2 * SPREAD_DAYS - EXPORT_WINDOW_DAYS)
+        )
+        return await client.get(
+            f"{API}/export/appointments",
+            headers=self.headers,
+            params={
+                "date_from": date_from.isoformat(),
+                "date_to": (date_from + timedelta(days=EXPORT_WINDOW_DAYS)).isoformat(),
+            },
+        )
+
+
+class CatalogBrowse(Scenario):
+    """Anonymous catalog traffic: list pages, details, search, autocomplete."""
+
+    name = "catalog_browse"
+    terms = "brake oil engine tyre clutch filter".split()
+
+    async def request(self, client, i: int):
+        kind = i % 4
+        if kind == 0:
+            return await client.get(f"{API}/services/", params={"limit": 50})
+        if kind == 1:
+            service_id = self.rng.randint(1, self.size.services)
+            return await client.get(f"{API}/services/{service_id}")
+        term = self.rng.choice(self.terms)
+        if kind == 2:
+            return await client.get(f"{API}/services/search", params={"name": term})
+        return await client.get(
+            f"{API}/services/autocomplete", params={"q": term[:3], "limit": 10}
+        )
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (LoginStorm, BookingBurst, AdminExport, CatalogBrowse)
+}
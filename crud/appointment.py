@@ -1,69 +1,78 @@
-import asyncio
-import os
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from dotenv import load_dotenv
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from pydantic import EmailStr
 
 from database import get_async_db
+from settings import settings
 from models import Mechanic
 from models.mechanic import MechanicRole
 from models.services import Service
-from models.appoinment import Appointment
+from models.appoinment import Appointment, AppointmentStatus
 from models.car import Car
 from schemas.appoinment import (
     AppointmentCreate,
+    AppointmentDetail,
     AppointmentResponse,
     AppointmentUpdate,
-    AppointmentStatus,
+    AutoAssignResponse,
+    AvailabilityResponse,
+    BulkAppointmentError,
+    BulkAppointmentResponse,
 )
 from models.user import User
 from crud.user import get_current_user
 from crud.mechanic import get_current_mechanic
-
-
-load_dotenv()
-
-conf = ConnectionConfig(
-    MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
-    MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
-    MAIL_FROM=os.getenv("MAIL_FROM"),
-    MAIL_PORT=587,
-    MAIL_SERVER="smtp.gmail.com",
-    MAIL_FROM_NAME="Car Service",
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
+from crud.appointment_details import ExpandParams
+from crud.email_outbox import email_outbox, enqueue_email
+from crud.pagination import Page, PageParams, page_response, paginate
+from crud.serialization import response_columns, response_models
+from crud.scheduling import (
+    INACTIVE_STATUSES,
+    auto_assign,
+    availability_index,
+    ensure_mechanic_free,
 )
 
 
-async def send_appointment_confirmation_email(
-    email: EmailStr, appointment_details: dict
-):
+def appointment_confirmation_email(appointment_details: dict) -> tuple:
     """
-    Sends confirmation email with appointment details
+    Subject and body of the appointment confirmation email
     """
-    message = MessageSchema(
-        subject="Appointment Confirmation",
-        recipients=[email],
-        body=f"""
+    body = f"""
         Appointment Details:
         - Date: {appointment_details['appointment_date']}
         - Service: {appointment_details.get('service_name', 'N/A')}
         - Status: {appointment_details['status']}
 
         Thank you for choosing our service!
-        """,
-        subtype="plain",
+        """
+    return "Appointment Confirmation", body
+
+
+def appointment_digest_email(appointments_details: List[dict]) -> tuple:
+    """
+    Subject and body of one confirmation email for several appointments
+    """
+    lines = "\n".join(
+        f"        - {details['appointment_date']}: "
+        f"{details.get('service_name', 'N/A')} ({details['status']})"
+        for details in appointments_details
     )
+    body = f"""
+        Your appointments:
+{lines}
+
+        Thank you for choosing our service!
+        """
+    return f"Appointment Confirmation ({len(appointments_details)} bookings)", body
 
-    fm = FastMail(conf)
-    await fm.send_message(message)
 
+# Most appointments accepted by one POST /appointments/bulk request.
+BULK_APPOINTMENTS_MAX = settings.get_int("BULK_APPOINTMENTS_MAX", 500)
 
 router = APIRouter(prefix="/appointments", tags=["appointments"])
 
@@ -95,28 +104,47 @@ async def create_appointment(
             status_code=status.HTTP_404_NOT_FOUND, detail="Service not found"
         )
 
-    new_appointment = Appointment(
-        user_id=current_user.user_id,
-        car_id=appointment.car_id,
-        service_id=appointment.service_id,
-        appointment_date=appointment.appointment_date,
-        status=appointment.status or AppointmentStatus.PENDING,
-    )
+    start = appointment.appointment_date
+    end = start + timedelta(minutes=service.duration)
+
+    async with availability_index.booking_lock(None):
+        await availability_index.ensure_loaded(db)
+        if not availability_index.has_capacity(start, end):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="No mechanic is available at this time",
+            )
+
+        new_appointment = Appointment(
+            user_id=current_user.user_id,
+            car_id=appointment.car_id,
+            service_id=appointment.service_id,
+            appointment_date=appointment.appointment_date,
+            status=AppointmentStatus(
+                (appointment.status or AppointmentStatus.PENDING).value
+            ),
+        )
 
-    db.add(new_appointment)
-    await db.commit()
-    await db.refresh(new_appointment)
-
-    asyncio.create_task(
-        send_appointment_confirmation_email(
-            current_user.email,
-            {
-                "appointment_date": new_appointment.appointment_date,
-                "service_name": service.name if service else "Unknown Service",
-                "status": new_appointment.status,
-            },
+        db.add(new_appointment)
+        if current_user.email:
+            enqueue_email(
+                db,
+                current_user.email,
+                *appointment_confirmation_email(
+                    {
+                        "appointment_date": new_appointment.appointment_date,
+                        "service_name": service.name,
+                        "status": new_appointment.status.value,
+                    }
+                ),
+            )
+        await db.commit()
+        await db.refresh(new_appointment)
+        availability_index.book(
+            new_appointment.appointment_id, None, start, service.duration
         )
-    )
+
+    email_outbox.notify()
 
     return AppointmentResponse(
         appointment_id=new_appointment.appointment_id,
@@ -128,30 +156,248 @@ async def create_appointment(
     )
 
 
-@router.get("/", response_model=List[AppointmentResponse])
+@router.post("/bulk", response_model=BulkAppointmentResponse)
+async def create_appointments_bulk(
+    appointments: List[AppointmentCreate],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create several appointments in one transaction; items that fail
+    validation or find no free mechanic are reported in errors
+    """
+    if len(appointments) > BULK_APPOINTMENTS_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_APPOINTMENTS_MAX} appointments per request",
+        )
+
+    car_ids = {appointment.car_id for appointment in appointments}
+    own_cars = set(
+        (
+            await db.execute(
+                select(Car.car_id).where(
+                    Car.car_id.in_(car_ids), Car.user_id == current_user.user_id
+                )
+            )
+        )
+        .scalars()
+        .all()
+    )
+    service_ids = {appointment.service_id for appointment in appointments}
+    services = {
+        service.service_id: service
+        for service in (
+            await db.execute(
+                select(Service.service_id, Service.name, Service.duration).where(
+                    Service.service_id.in_(service_ids)
+                )
+            )
+        ).all()
+    }
+
+    errors = []
+    accepted = []
+    for index, appointment in enumerate(appointments):
+        if appointment.car_id not in own_cars:
+            errors.append(
+                BulkAppointmentError(
+                    index=index,
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="You can only book appointments for your own cars",
+                )
+            )
+        elif appointment.service_id not in services:
+            errors.append(
+                BulkAppointmentError(
+                    index=index,
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Service not found",
+                )
+            )
+        else:
+            accepted.append((index, appointment))
+
+    rows = []
+    batch_key = uuid.uuid4().hex
+    async with availability_index.booking_lock(None):
+        await availability_index.ensure_loaded(db)
+        # Items accepted so far hold their slot under a placeholder id, so
+        # later items of the same request see them.
+        placeholders = []
+        try:
+            for index, appointment in accepted:
+                start = appointment.appointment_date
+                duration = services[appointment.service_id].duration
+                if not availability_index.has_capacity(
+                    start, start + timedelta(minutes=duration)
+                ):
+                    errors.append(
+                        BulkAppointmentError(
+                            index=index,
+                            status_code=status.HTTP_409_CONFLICT,
+                            detail="No mechanic is available at this time",
+                        )
+                    )
+                    continue
+                placeholders.append(-(index + 1))
+                availability_index.book(placeholders[-1], None, start, duration)
+                rows.append(
+                    {
+                        "user_id": current_user.user_id,
+                        "car_id": appointment.car_id,
+                        "service_id": appointment.service_id,
+                        "appointment_date": start,
+                        "status": AppointmentStatus(
+                            (appointment.status or AppointmentStatus.PENDING).value
+                        ),
+                        "batch_key": batch_key,
+                    }
+                )
+
+            created = []
+            if rows:
+                # One executemany INSERT, then the new rows by their batch key.
+                # Ids of a multi-row INSERT ascend in row order.
+                await db.execute(insert(Appointment), rows)
+                created = (
+                    await db.execute(
+                        select(*response_columns(Appointment, AppointmentResponse))
+                        .where(Appointment.batch_key == batch_key)
+                        .order_by(Appointment.appointment_id)
+                    )
+                ).all()
+            if created and current_user.email:
+                enqueue_email(
+                    db,
+                    current_user.email,
+                    *appointment_digest_email(
+                        [
+                            {
+                                "appointment_date": row["appointment_date"],
+                                "service_name": services[row["service_id"]].name,
+                                "status": row["status"].value,
+                            }
+                            for row in rows
+                        ]
+                    ),
+                )
+            await db.commit()
+        finally:
+            for placeholder in placeholders:
+                availability_index.release(placeholder)
+
+        for new in created:
+            availability_index.book(
+                new.appointment_id,
+                None,
+                new.appointment_date,
+                services[new.service_id].duration,
+            )
+
+    if created:
+        email_outbox.notify()
+
+    errors.sort(key=lambda error: error.index)
+    return BulkAppointmentResponse(
+        created=[
+            AppointmentResponse(
+                appointment_id=new.appointment_id,
+                user_id=new.user_id,
+                car_id=new.car_id,
+                service_id=new.service_id,
+                appointment_date=new.appointment_date,
+                status=new.status,
+            )
+            for new in created
+        ],
+        errors=errors,
+    )
+
+
+@router.get("/", response_model=Union[Page[AppointmentDetail], List[AppointmentDetail]])
 async def get_user_appointments(
+    response: Response,
+    pagination: PageParams = Depends(),
+    expand: ExpandParams = Depends(),
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Get all appointments for the current user
+    Get all appointments for the current user, with the related car,
+    service, mechanic or user embedded when named in ``expand``.
     """
-    query = select(Appointment).where(Appointment.user_id == current_user.user_id)
-    result = await db.execute(query)
-    appointments = result.scalars().all()
-
-    return [
-        AppointmentResponse(
-            appointment_id=appt.appointment_id,
-            user_id=appt.user_id,
-            car_id=appt.car_id,
-            service_id=appt.service_id,
-            mechanic_id=appt.mechanic_id,
-            appointment_date=appt.appointment_date,
-            status=appt.status,
+    if expand.names:
+        query = select(Appointment).options(*expand.options())
+    else:
+        query = select(*response_columns(Appointment, AppointmentResponse))
+    query = query.where(Appointment.user_id == current_user.user_id)
+    appointments, next_cursor = await paginate(
+        db,
+        query,
+        pagination,
+        [Appointment.appointment_date, Appointment.appointment_id],
+    )
+
+    items = response_models(AppointmentResponse, appointments)
+    if expand.names:
+        items = expand.embed(items, appointments)
+    return page_response(items, next_cursor, pagination, response)
+
+
+@router.get("/availability", response_model=AvailabilityResponse)
+async def get_availability(
+    service_id: int,
+    day: date = Query(..., alias="date"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get free start times and mechanics for a service on a given day
+    """
+    service_query = select(Service).where(Service.service_id == service_id)
+    service_result = await db.execute(service_query)
+    service = service_result.scalar_one_or_none()
+    if not service:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Service not found"
         )
-        for appt in appointments
-    ]
+
+    await availability_index.ensure_loaded(db)
+
+    return AvailabilityResponse(
+        day=day,
+        service_id=service.service_id,
+        duration=service.duration,
+        slots=availability_index.free_slots(day, service.duration),
+    )
+
+
+@router.post("/auto-assign", response_model=AutoAssignResponse)
+async def auto_assign_mechanics(
+    date_from: datetime,
+    date_to: datetime,
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_mechanic: Mechanic = Depends(get_current_mechanic),
+):
+    """
+    Assign mechanics to all pending appointments in [date_from, date_to),
+    balancing booked service time; dry_run only returns the plan
+    """
+    if current_mechanic.role != MechanicRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can assign mechanics",
+        )
+
+    if date_to <= date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must be after date_from",
+        )
+
+    return await auto_assign(db, date_from, date_to, dry_run=dry_run)
 
 
 @router.put("/{appointment_id}", response_model=AppointmentResponse)
@@ -176,23 +422,60 @@ async def update_appointment(
             status_code=status.HTTP_404_NOT_FOUND, detail="Appointment not found"
         )
 
-    if existing_appointment.status in [
-        AppointmentStatus.COMPLETED,
-        AppointmentStatus.CANCELED,
-    ]:
+    if existing_appointment.status in INACTIVE_STATUSES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot update completed or canceled appointments",
         )
 
     update_data = appointment_update.dict(exclude_unset=True)
+    if update_data.get("status") is not None:
+        update_data["status"] = AppointmentStatus(update_data["status"].value)
 
     for key, value in update_data.items():
         setattr(existing_appointment, key, value)
 
-    db.add(existing_appointment)
-    await db.commit()
-    await db.refresh(existing_appointment)
+    service_query = select(Service).where(
+        Service.service_id == existing_appointment.service_id
+    )
+    service_result = await db.execute(service_query)
+    service = service_result.scalar_one_or_none()
+    if not service:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Service not found"
+        )
+
+    start = existing_appointment.appointment_date
+    end = start + timedelta(minutes=service.duration)
+    mechanic_id = existing_appointment.mechanic_id
+    active = existing_appointment.status not in INACTIVE_STATUSES
+    reschedule = active and bool(
+        {"appointment_date", "service_id", "mechanic_id", "status"} & update_data.keys()
+    )
+
+    async with availability_index.booking_lock(mechanic_id):
+        if reschedule and mechanic_id is not None:
+            await ensure_mechanic_free(
+                db, mechanic_id, start, end, exclude_appointment_id=appointment_id
+            )
+        elif reschedule:
+            await availability_index.ensure_loaded(db)
+            if not availability_index.has_capacity(
+                start, end, exclude_appointment_id=appointment_id
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="No mechanic is available at this time",
+                )
+
+        db.add(existing_appointment)
+        await db.commit()
+        await db.refresh(existing_appointment)
+
+    if active:
+        availability_index.book(appointment_id, mechanic_id, start, service.duration)
+    else:
+        availability_index.release(appointment_id)
 
     return AppointmentResponse(
         appointment_id=existing_appointment.appointment_id,
@@ -232,10 +515,11 @@ async def cancel_appointment(
             detail="Cannot cancel completed appointments",
         )
 
-    existing_appointment.status = AppointmentStatus.CANCELED
+    existing_appointment.status = AppointmentStatus.CANCELLED
 
     db.add(existing_appointment)
     await db.commit()
+    availability_index.release(appointment_id)
 
     return {"detail": "Appointment canceled successfully"}
 
@@ -274,30 +558,42 @@ async def assign_mechanic_to_appointment(
             status_code=status.HTTP_404_NOT_FOUND, detail="Appointment not found"
         )
 
-    if existing_appointment.status in [
-        AppointmentStatus.COMPLETED,
-        AppointmentStatus.CANCELED,
-    ]:
+    if existing_appointment.status in INACTIVE_STATUSES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot assign mechanic to completed or canceled appointments",
         )
 
-    try:
-        existing_appointment.mechanic_id = mechanic_id
-        existing_appointment.status = AppointmentStatus.CONFIRMED
-
-        db.add(existing_appointment)
-        await db.commit()
-        await db.refresh(existing_appointment)
+    service_query = select(Service).where(
+        Service.service_id == existing_appointment.service_id
+    )
+    service_result = await db.execute(service_query)
+    service = service_result.scalar_one()
+    start = existing_appointment.appointment_date
+    end = start + timedelta(minutes=service.duration)
 
-    except Exception as e:
-        await db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error assigning mechanic: {str(e)}",
+    async with availability_index.booking_lock(mechanic_id):
+        await ensure_mechanic_free(
+            db, mechanic_id, start, end, exclude_appointment_id=appointment_id
         )
 
+        try:
+            existing_appointment.mechanic_id = mechanic_id
+            existing_appointment.status = AppointmentStatus.CONFIRMED
+
+            db.add(existing_appointment)
+            await db.commit()
+            await db.refresh(existing_appointment)
+
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error assigning mechanic: {str(e)}",
+            )
+
+    availability_index.book(appointment_id, mechanic_id, start, service.duration)
+
     return {
         "detail": "Mechanic assigned successfully",
         "appointment_id": existing_appointment.appointment_id,
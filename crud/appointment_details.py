@@ -0,0 +1,74 @@
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy.orm import selectinload
+
+from crud.serialization import response_columns, response_models
+from models.appoinment import Appointment
+from models.car import Car
+from models.mechanic import Mechanic
+from models.services import Service
+from models.user import User
+from schemas.appoinment import (
+    AppointmentCar,
+    AppointmentMechanic,
+    AppointmentService,
+    AppointmentUser,
+)
+
+# Related objects an appointment list can embed: the relationship, the
+# related entity and the summary it is returned as.
+EXPANSIONS = {
+    "car": (Appointment.car, Car, AppointmentCar),
+    "service": (Appointment.service, Service, AppointmentService),
+    "mechanic": (Appointment.mechanic, Mechanic, AppointmentMechanic),
+    "user": (Appointment.user, User, AppointmentUser),
+}
+
+
+class ExpandParams:
+    """The ``expand`` query parameter of the appointment lists."""
+
+    def __init__(
+        self,
+        expand: Optional[str] = Query(
+            None,
+            description="Comma-separated related objects to embed: "
+            + ", ".join(EXPANSIONS),
+        ),
+    ):
+        names = [name.strip() for name in (expand or "").split(",") if name.strip()]
+        unknown = [name for name in names if name not in EXPANSIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown expand value(s): {', '.join(unknown)}",
+            )
+        self.names = list(dict.fromkeys(names))
+
+    def options(self) -> list:
+        """
+        Loader options for an ``Appointment`` entity query: each expanded
+        relationship is fetched with one ``SELECT ... IN`` over the whole
+        page, reading only the summary's columns.
+        """
+        return [
+            selectinload(relationship).load_only(*response_columns(entity, summary))
+            for relationship, entity, summary in map(EXPANSIONS.get, self.names)
+        ]
+
+    def embed(self, items: Sequence, appointments: Sequence) -> List[dict]:
+        """
+        ``items`` (models or dicts, one per appointment) as dicts with the
+        expanded summaries added. Objects shared by several appointments,
+        such as a service, are built once.
+        """
+        details = [dict(item) for item in items]
+        for name in self.names:
+            summary = EXPANSIONS[name][2]
+            related = [getattr(appointment, name) for appointment in appointments]
+            unique = list({id(obj): obj for obj in related if obj is not None}.values())
+            built = dict(zip(map(id, unique), response_models(summary, unique)))
+            for detail, obj in zip(details, related):
+                detail[name] = None if obj is None else built[id(obj)]
+        return details
@@ -1,15 +1,12 @@
-import os
-
 import jwt
 from datetime import datetime, timedelta
 from typing import Optional
-from dotenv import load_dotenv
 
+from settings import settings
 
-load_dotenv()
 
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
+SECRET_KEY = settings.get("SECRET_KEY")
+ALGORITHM = settings.get("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 
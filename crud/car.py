@@ -1,14 +1,17 @@
-from typing import List
+from typing import List, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 
 from database import get_async_db
+from crud.car_import import CarImport, request_records
+from crud.pagination import Page, PageParams, page_response, paginate
+from crud.serialization import json_response, response_columns, response_models
 from crud.user import get_current_user
 from models.user import User
-from schemas.car import CarCreate, CarUpdate, CarResponse
+from schemas.car import CarCreate, CarImportReport, CarUpdate, CarResponse
 from models.car import Car
 
 router = APIRouter(prefix="/cars", tags=["cars"])
@@ -69,34 +72,39 @@ async def create_car(
     )
 
 
-@router.get("/", response_model=List[CarResponse])
+@router.post("/bulk", response_model=CarImportReport)
+async def import_cars(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Import cars from a JSON array, NDJSON or CSV body (by Content-Type).
+    CSV and NDJSON are read as they stream in; every row gets a result.
+    """
+    return await CarImport(db, current_user).run(request_records(request))
+
+
+@router.get("/", response_model=Union[Page[CarResponse], List[CarResponse]])
 async def read_cars(
+    response: Response,
+    pagination: PageParams = Depends(),
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get a list of cars, filtered by user role.
     """
+    columns = response_columns(Car, CarResponse)
     if current_user.role.value == "admin":
-        query = select(Car)
+        query = select(*columns)
     else:
-        query = select(Car).where(Car.user_id == current_user.user_id)
+        query = select(*columns).where(Car.user_id == current_user.user_id)
 
-    result = await db.execute(query)
-    cars = result.scalars().all()
-
-    return [
-        CarResponse(
-            car_id=car.car_id,
-            user_id=car.user_id,
-            brand=car.brand,
-            model=car.model,
-            year=car.year,
-            plate_number=car.plate_number,
-            vin=car.vin,
-        )
-        for car in cars
-    ]
+    cars, next_cursor = await paginate(db, query, pagination, [Car.car_id])
+
+    items = response_models(CarResponse, cars)
+    return page_response(items, next_cursor, pagination, response)
 
 
 @router.get("/{car_id}", response_model=CarResponse)
@@ -118,15 +126,7 @@ async def read_car(
             detail="You don't have permission to view this car",
         )
 
-    return CarResponse(
-        car_id=car.car_id,
-        user_id=car.user_id,
-        brand=car.brand,
-        model=car.model,
-        year=car.year,
-        plate_number=car.plate_number,
-        vin=car.vin,
-    )
+    return json_response(CarResponse.model_validate(car))
 
 
 @router.put("/{car_id}", response_model=CarResponse)
@@ -0,0 +1,192 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.car import Car
+from models.user import User, UserRole
+from schemas.car import CarCreate, CarImportReport, CarImportRow
+from settings import settings
+
+# Rows validated, checked against the database and inserted together; each
+# chunk is committed before the next one is read.
+CAR_IMPORT_CHUNK_SIZE = settings.get_int("CAR_IMPORT_CHUNK_SIZE", 1000)
+
+CSV_TYPES = ("text/csv", "application/csv")
+NDJSON_TYPE = "application/x-ndjson"
+
+
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decoded lines of a byte stream, without buffering more than one line."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def csv_records(stream: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    """Rows of a CSV stream with a header line, as dicts keyed by the header."""
+    header = None
+    record = ""
+    async for line in _lines(stream):
+        record = f"{record}\n{line}" if record else line
+        # An odd number of quotes means a quoted field continues on the
+        # next line.
+        if record.count('"') % 2:
+            continue
+        fields, record = next(csv.reader([record]), []), ""
+        if not fields:
+            continue
+        if header is None:
+            header = [field.strip() for field in fields]
+        else:
+            yield dict(zip(header, fields))
+
+
+async def ndjson_records(stream: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    async for line in _lines(stream):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            # Passed on as is, so the row fails validation like any other.
+            yield line
+
+
+async def json_records(request: Request) -> AsyncIterator[dict]:
+    body = await request.json()
+    if not isinstance(body, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Expected a JSON array of cars",
+        )
+    for record in body:
+        yield record
+
+
+def request_records(request: Request) -> AsyncIterator[dict]:
+    """Cars in the request body: a JSON array, NDJSON or CSV by Content-Type."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in CSV_TYPES:
+        return csv_records(request.stream())
+    if content_type == NDJSON_TYPE:
+        return ndjson_records(request.stream())
+    return json_records(request)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+class CarImport:
+    """Validates and inserts cars chunk by chunk, recording a result per row."""
+
+    def __init__(self, db: AsyncSession, current_user: User):
+        self.db = db
+        self.current_user = current_user
+        self.is_admin = current_user.role == UserRole.ADMIN
+        self.rows: List[CarImportRow] = []
+
+    def _fail(self, row: int, detail: str):
+        self.rows.append(CarImportRow(row=row, error=detail))
+
+    async def run(self, records: AsyncIterator[dict]) -> CarImportReport:
+        chunk = []
+        row = 0
+        async for record in records:
+            row += 1
+            try:
+                car = CarCreate.model_validate(record)
+            except ValidationError as error:
+                self._fail(row, _validation_message(error))
+                continue
+            if car.user_id != self.current_user.user_id and not self.is_admin:
+                self._fail(row, "You can only add cars to your own profile")
+                continue
+            chunk.append((row, car))
+            if len(chunk) == CAR_IMPORT_CHUNK_SIZE:
+                await self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            await self._import_chunk(chunk)
+
+        self.rows.sort(key=lambda result: result.row)
+        created = sum(1 for result in self.rows if result.car_id is not None)
+        return CarImportReport(
+            created=created, failed=len(self.rows) - created, rows=self.rows
+        )
+
+    async def _import_chunk(self, chunk: list):
+        db = self.db
+        vins = {car.vin for _, car in chunk}
+        plates = {car.plate_number for _, car in chunk}
+        # Earlier chunks are committed, so this also catches duplicates of
+        # rows further up the same file.
+        existing = (
+            await db.execute(
+                select(Car.vin, Car.plate_number).where(
+                    or_(Car.vin.in_(vins), Car.plate_number.in_(plates))
+                )
+            )
+        ).all()
+        taken_vins = {vin for vin, _ in existing}
+        taken_plates = {plate for _, plate in existing}
+
+        known_users: Optional[set] = None
+        if self.is_admin:
+            user_ids = {car.user_id for _, car in chunk}
+            known_users = set(
+                (
+                    await db.execute(
+                        select(User.user_id).where(User.user_id.in_(user_ids))
+                    )
+                )
+                .scalars()
+                .all()
+            )
+
+        accepted: Dict[int, CarCreate] = {}
+        for row, car in chunk:
+            if car.vin in taken_vins:
+                self._fail(row, "VIN already exists")
+            elif car.plate_number in taken_plates:
+                self._fail(row, "Plate number already exists")
+            elif known_users is not None and car.user_id not in known_users:
+                self._fail(row, "User not found")
+            else:
+                accepted[row] = car
+                taken_vins.add(car.vin)
+                taken_plates.add(car.plate_number)
+
+        if not accepted:
+            return
+        # One executemany INSERT, then the new ids by the unique VIN: MySQL
+        # has no RETURNING for executemany.
+        await db.execute(insert(Car), [car.model_dump() for car in accepted.values()])
+        new_vins = [car.vin for car in accepted.values()]
+        car_ids = dict(
+            (
+                await db.execute(
+                    select(Car.vin, Car.car_id).where(Car.vin.in_(new_vins))
+                )
+            ).all()
+        )
+        await db.commit()
+        for row, car in accepted.items():
+            self.rows.append(CarImportRow(row=row, car_id=car_ids[car.vin]))
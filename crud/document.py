@@ -1,28 +1,57 @@
+import mimetypes
 import os
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from typing import List, Optional, Union
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    File,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import FileResponse, JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from database import get_async_db
+from database import get_async_db, get_session_factory
 from schemas.document import DocumentResponse, DocumentTypeEnum
 from models.document import Document
+from models.document_preview import DocumentPreview, PreviewStatus
 from models.mechanic import Mechanic, MechanicRole
 from crud.mechanic import get_current_mechanic
+from crud.http_cache import not_modified
+from crud.pagination import Page, PageParams, page_response, paginate
+from crud.previews import preview_path, preview_pipeline
+from crud.serialization import response_columns, response_models
+from crud.storage import ContentStore
 
 
+# Directories under it are created on the first upload, not at import.
 UPLOAD_DIRECTORY = "uploads/documents"
-os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
+document_store = ContentStore(UPLOAD_DIRECTORY)
+
+# Cache lifetime of content fetched with ?v=<sha256>; that URL never changes
+# meaning, while the plain URL always revalidates against the ETag.
+DOCUMENT_CACHE_MAX_AGE = 365 * 24 * 3600
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
+class DocumentFileResponse(FileResponse):
+    """FileResponse whose If-Range check uses the content-hash ETag."""
+
+    def _should_use_range(self, http_if_range: str, stat_result) -> bool:
+        return http_if_range == self.headers.get("etag")
+
+
 @router.post("/upload", response_model=DocumentResponse)
 async def upload_document(
     file: UploadFile = File(...),
     document_type: DocumentTypeEnum = DocumentTypeEnum.PASSPORT,
     db: AsyncSession = Depends(get_async_db),
+    session_factory=Depends(get_session_factory),
     current_mechanic: Mechanic = Depends(get_current_mechanic),
 ):
     """Uploads a document for the current mechanic."""
@@ -35,56 +64,64 @@ async def upload_document(
             status_code=400, detail="Invalid file type. Allowed types: PDF, JPG, PNG"
         )
 
-    file_path = os.path.join(UPLOAD_DIRECTORY, file.filename)
-
     try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(await file.read())
+        stored = await document_store.add(db, file)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
 
     new_document = Document(
         mechanic_id=current_mechanic.mechanic_id,
         type=document_type,
-        file_path=file_path,
+        file_path=stored.path,
+        filename=os.path.basename(file.filename),
+        sha256=stored.sha256,
+        size=stored.size,
     )
 
     db.add(new_document)
     await db.commit()
     await db.refresh(new_document)
+    preview_pipeline.schedule(session_factory, stored.path, stored.sha256)
 
     return DocumentResponse(
         document_id=new_document.document_id,
         mechanic_id=new_document.mechanic_id,
         type=new_document.type,
         file_path=new_document.file_path,
+        filename=new_document.filename,
+        sha256=new_document.sha256,
+        size=new_document.size,
     )
 
 
-@router.get("/", response_model=List[DocumentResponse])
+@router.get("/", response_model=Union[Page[DocumentResponse], List[DocumentResponse]])
 async def get_mechanic_documents(
+    response: Response,
+    pagination: PageParams = Depends(),
     db: AsyncSession = Depends(get_async_db),
     current_mechanic: Mechanic = Depends(get_current_mechanic),
 ):
     """Fetches all documents for the current mechanic."""
 
-    query = select(Document).where(Document.mechanic_id == current_mechanic.mechanic_id)
-    result = await db.execute(query)
-    documents = result.scalars().all()
-
-    return [
-        DocumentResponse(
-            document_id=doc.document_id,
-            mechanic_id=doc.mechanic_id,
-            type=doc.type,
-            file_path=doc.file_path,
-        )
-        for doc in documents
-    ]
+    query = select(*response_columns(Document, DocumentResponse)).where(
+        Document.mechanic_id == current_mechanic.mechanic_id
+    )
+    documents, next_cursor = await paginate(
+        db, query, pagination, [Document.document_id]
+    )
+
+    items = response_models(DocumentResponse, documents)
+    return page_response(items, next_cursor, pagination, response)
 
 
-@router.get("/all", response_model=List[DocumentResponse])
+@router.get(
+    "/all", response_model=Union[Page[DocumentResponse], List[DocumentResponse]]
+)
 async def get_all_documents(
+    response: Response,
+    pagination: PageParams = Depends(),
     db: AsyncSession = Depends(get_async_db),
     current_mechanic: Mechanic = Depends(get_current_mechanic),
 ):
@@ -92,19 +129,113 @@ async def get_all_documents(
     if current_mechanic.role != MechanicRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    query = select(Document)
+    query = select(*response_columns(Document, DocumentResponse))
+    documents, next_cursor = await paginate(
+        db, query, pagination, [Document.document_id]
+    )
+
+    items = response_models(DocumentResponse, documents)
+    return page_response(items, next_cursor, pagination, response)
+
+
+@router.get("/{document_id}/content")
+async def get_document_content(
+    document_id: int,
+    request: Request,
+    v: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_mechanic: Mechanic = Depends(get_current_mechanic),
+):
+    """Downloads a document's file; supports Range and If-None-Match."""
+    query = select(Document).where(Document.document_id == document_id)
+    result = await db.execute(query)
+    document = result.scalar_one_or_none()
+
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    if (
+        document.mechanic_id != current_mechanic.mechanic_id
+        and current_mechanic.role != MechanicRole.ADMIN
+    ):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    headers = {"Cache-Control": "private, no-cache"}
+    if document.sha256:
+        etag = f'"{document.sha256}"'
+        headers["ETag"] = etag
+        if v == document.sha256:
+            headers["Cache-Control"] = (
+                f"private, max-age={DOCUMENT_CACHE_MAX_AGE}, immutable"
+            )
+
+        cached = not_modified(request, etag, headers)
+        if cached is not None:
+            return cached
+
+    if not os.path.isfile(document.file_path):
+        raise HTTPException(status_code=404, detail="Document file not found")
+
+    filename = document.filename or os.path.basename(document.file_path)
+    return DocumentFileResponse(
+        document.file_path,
+        media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        filename=filename,
+        content_disposition_type="inline",
+        headers=headers,
+    )
+
+
+@router.get("/{document_id}/preview")
+async def get_document_preview(
+    document_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    session_factory=Depends(get_session_factory),
+    current_mechanic: Mechanic = Depends(get_current_mechanic),
+):
+    """Returns a JPEG thumbnail of the document, or 202 while it is generated."""
+    query = select(Document).where(Document.document_id == document_id)
     result = await db.execute(query)
-    documents = result.scalars().all()
-
-    return [
-        DocumentResponse(
-            document_id=doc.document_id,
-            mechanic_id=doc.mechanic_id,
-            type=doc.type,
-            file_path=doc.file_path,
+    document = result.scalar_one_or_none()
+
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    if (
+        document.mechanic_id != current_mechanic.mechanic_id
+        and current_mechanic.role != MechanicRole.ADMIN
+    ):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    if not document.sha256:
+        raise HTTPException(status_code=404, detail="No preview available")
+
+    preview = await db.get(DocumentPreview, document.sha256)
+    path = preview_path(document.file_path)
+    if preview is not None and preview.status in (
+        PreviewStatus.FAILED,
+        PreviewStatus.UNSUPPORTED,
+    ):
+        raise HTTPException(status_code=404, detail="No preview available")
+
+    if (
+        preview is None
+        or preview.status != PreviewStatus.READY
+        or not os.path.isfile(path)
+    ):
+        preview_pipeline.schedule(session_factory, document.file_path, document.sha256)
+        return JSONResponse(
+            status_code=202, content={"detail": "Preview is being generated"}
         )
-        for doc in documents
-    ]
+
+    return FileResponse(
+        path,
+        media_type="image/jpeg",
+        headers={
+            "ETag": f'"{document.sha256}-preview"',
+            "Cache-Control": "private, no-cache",
+        },
+    )
 
 
 @router.put("/{document_id}", response_model=DocumentResponse)
@@ -113,6 +244,7 @@ async def update_document(
     file: UploadFile = File(...),
     document_type: DocumentTypeEnum = DocumentTypeEnum.PASSPORT,
     db: AsyncSession = Depends(get_async_db),
+    session_factory=Depends(get_session_factory),
     current_mechanic: Mechanic = Depends(get_current_mechanic),
 ):
     """Updates a document's file and type; authorized mechanics or admins only."""
@@ -137,28 +269,34 @@ async def update_document(
             status_code=400, detail="Invalid file type. Allowed types: PDF, JPG, PNG"
         )
 
-    if os.path.exists(existing_document.file_path):
-        os.remove(existing_document.file_path)
-
-    new_file_path = os.path.join(UPLOAD_DIRECTORY, file.filename)
-
     try:
-        with open(new_file_path, "wb") as buffer:
-            buffer.write(await file.read())
+        stored = await document_store.add(db, file)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
 
+    stale = await document_store.release(db, existing_document)
+
     existing_document.type = document_type
-    existing_document.file_path = new_file_path
+    existing_document.file_path = stored.path
+    existing_document.filename = os.path.basename(file.filename)
+    existing_document.sha256 = stored.sha256
+    existing_document.size = stored.size
 
     await db.commit()
+    await document_store.purge(db, stale)
     await db.refresh(existing_document)
+    preview_pipeline.schedule(session_factory, stored.path, stored.sha256)
 
     return DocumentResponse(
         document_id=existing_document.document_id,
         mechanic_id=existing_document.mechanic_id,
         type=existing_document.type,
         file_path=existing_document.file_path,
+        filename=existing_document.filename,
+        sha256=existing_document.sha256,
+        size=existing_document.size,
     )
 
 
@@ -182,10 +320,9 @@ async def delete_document(
     ):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    if os.path.exists(existing_document.file_path):
-        os.remove(existing_document.file_path)
-
+    stale = await document_store.release(db, existing_document)
     await db.delete(existing_document)
     await db.commit()
+    await document_store.purge(db, stale)
 
     return {"detail": "Document deleted successfully"}
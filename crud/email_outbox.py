@@ -0,0 +1,305 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import List, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.email_outbox import EmailOutbox, EmailStatus
+from settings import settings
+
+
+MAIL_SERVER = settings.get("MAIL_SERVER", "smtp.gmail.com")
+MAIL_PORT = settings.get_int("MAIL_PORT", 587)
+MAIL_STARTTLS = settings.get_bool("MAIL_STARTTLS", True)
+MAIL_SSL_TLS = settings.get_bool("MAIL_SSL_TLS", False)
+MAIL_FROM_NAME = settings.get("MAIL_FROM_NAME", "Car Service")
+
+EMAIL_WORKER_ENABLED = settings.get_bool("EMAIL_WORKER_ENABLED", True)
+# Emails claimed per batch, and how many SMTP connections send it in parallel.
+EMAIL_BATCH_SIZE = settings.get_int("EMAIL_BATCH_SIZE", 50)
+EMAIL_SEND_CONCURRENCY = settings.get_int("EMAIL_SEND_CONCURRENCY", 2)
+EMAIL_MAX_ATTEMPTS = settings.get_int("EMAIL_MAX_ATTEMPTS", 5)
+# Retry delay is EMAIL_RETRY_BASE_SECONDS * 2 ** (attempt - 1), capped.
+EMAIL_RETRY_BASE_SECONDS = settings.get_float("EMAIL_RETRY_BASE_SECONDS", 30)
+EMAIL_RETRY_MAX_SECONDS = settings.get_float("EMAIL_RETRY_MAX_SECONDS", 3600)
+EMAIL_POLL_INTERVAL = settings.get_float("EMAIL_POLL_INTERVAL", 5)
+# A claimed email is handed out again after this long, so emails claimed by a
+# worker that died mid-send are not lost.
+EMAIL_CLAIM_TIMEOUT = settings.get_float("EMAIL_CLAIM_TIMEOUT", 300)
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(db: AsyncSession, recipient: str, subject: str, body: str):
+    """
+    Add an email to the outbox in the caller's transaction; it is only sent
+    once that transaction commits.
+    """
+    db.add(EmailOutbox(recipient=recipient, subject=subject, body=body))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, EMAIL_RETRY_MAX_SECONDS))
+
+
+class SMTPSender:
+    """Sends a batch of messages over a single SMTP connection."""
+
+    def __init__(
+        self,
+        hostname: str = MAIL_SERVER,
+        port: int = MAIL_PORT,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        sender: Optional[str] = None,
+        start_tls: bool = MAIL_STARTTLS,
+        use_tls: bool = MAIL_SSL_TLS,
+        timeout: float = 30,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.start_tls = start_tls
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> "SMTPSender":
+        return cls(
+            username=settings.get("MAIL_USERNAME"),
+            password=settings.get("MAIL_PASSWORD"),
+            sender=settings.get("MAIL_FROM"),
+        )
+
+    def build_message(self, recipient: str, subject: str, body: str) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = formataddr((MAIL_FROM_NAME, self.sender or ""))
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+        return message
+
+    async def send_batch(self, messages: List[EmailMessage]) -> list:
+        """
+        Send ``messages`` in order; returns one entry per message, ``None``
+        on success or the exception it failed with.
+        """
+        # Imported here so processes that never send mail do not load it.
+        import aiosmtplib
+
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            start_tls=self.start_tls,
+            use_tls=self.use_tls,
+            timeout=self.timeout,
+        )
+        try:
+            await smtp.connect()
+            if self.username:
+                await smtp.login(self.username, self.password)
+        except Exception as e:
+            return [e] * len(messages)
+
+        results = []
+        try:
+            for message in messages:
+                if not smtp.is_connected:
+                    results.append(aiosmtplib.SMTPServerDisconnected("Connection lost"))
+                    continue
+                try:
+                    await smtp.send_message(message)
+                    results.append(None)
+                except Exception as e:
+                    results.append(e)
+        finally:
+            if smtp.is_connected:
+                try:
+                    await smtp.quit()
+                except Exception:
+                    smtp.close()
+        return results
+
+
+class EmailOutboxWorker:
+    """
+    Drains the email outbox: claims due emails in batches, sends them over
+    a few reused SMTP connections and records the outcome with exponential
+    backoff for failures.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        sender: Optional[SMTPSender] = None,
+        batch_size: int = EMAIL_BATCH_SIZE,
+        concurrency: int = EMAIL_SEND_CONCURRENCY,
+        max_attempts: int = EMAIL_MAX_ATTEMPTS,
+        poll_interval: float = EMAIL_POLL_INTERVAL,
+    ):
+        self.sender = sender
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        self.queue_depth = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        self.send_seconds = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    def notify(self):
+        """Wake the worker after committing new emails, instead of waiting a poll."""
+        self._wake.set()
+
+    async def _claim(self, db: AsyncSession) -> list:
+        now = datetime.now()
+        due = (EmailOutbox.status == EmailStatus.PENDING) & (
+            EmailOutbox.next_attempt_at <= now
+        )
+        depth = await db.execute(select(func.count()).where(due))
+        self.queue_depth = depth.scalar_one()
+
+        result = await db.execute(
+            select(EmailOutbox)
+            .where(due)
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.email_id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        emails = result.scalars().all()
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = now + timedelta(seconds=EMAIL_CLAIM_TIMEOUT)
+        await db.commit()
+        return [
+            (email.email_id, email.recipient, email.subject, email.body, email.attempts)
+            for email in emails
+        ]
+
+    async def process_batch(self) -> int:
+        """Claim, send and record one batch. Returns the number of emails claimed."""
+        if self.sender is None:
+            self.sender = SMTPSender.from_env()
+
+        async with self.session_factory() as db:
+            claimed = await self._claim(db)
+        if not claimed:
+            return 0
+
+        started = time.perf_counter()
+        chunk_count = max(1, min(self.concurrency, len(claimed)))
+        chunks = [claimed[i::chunk_count] for i in range(chunk_count)]
+        chunk_results = await asyncio.gather(
+            *(
+                self.sender.send_batch(
+                    [
+                        self.sender.build_message(recipient, subject, body)
+                        for _, recipient, subject, body, _ in chunk
+                    ]
+                )
+                for chunk in chunks
+            )
+        )
+        self.send_seconds += time.perf_counter() - started
+
+        now = datetime.now()
+        sent_ids = []
+        failures = []
+        for chunk, results in zip(chunks, chunk_results):
+            for (email_id, recipient, _, _, attempts), error in zip(chunk, results):
+                if error is None:
+                    sent_ids.append(email_id)
+                    continue
+
+                logger.warning(
+                    "Sending email %s to %s failed: %s", email_id, recipient, error
+                )
+                values = {"last_error": str(error)[:500]}
+                if attempts >= self.max_attempts:
+                    self.failed += 1
+                    values["status"] = EmailStatus.FAILED
+                else:
+                    self.retried += 1
+                    values["next_attempt_at"] = now + retry_delay(attempts)
+                failures.append((email_id, values))
+
+        async with self.session_factory() as db:
+            if sent_ids:
+                await db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.email_id.in_(sent_ids))
+                    .values(status=EmailStatus.SENT, sent_at=now, last_error=None)
+                )
+            for email_id, values in failures:
+                await db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.email_id == email_id)
+                    .values(**values)
+                )
+            await db.commit()
+        self.sent += len(sent_ids)
+
+        self.batches += 1
+        self.queue_depth = max(0, self.queue_depth - len(claimed))
+        return len(claimed)
+
+    async def run(self):
+        while True:
+            try:
+                claimed = await self.process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Email outbox batch failed")
+                claimed = 0
+
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    def start(self, session_factory):
+        self.session_factory = session_factory
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "batches": self.batches,
+            "sent_per_second": (
+                round(self.sent / self.send_seconds, 2) if self.send_seconds else 0.0
+            ),
+        }
+
+
+email_outbox = EmailOutboxWorker()
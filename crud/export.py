@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.future import select
+
+from crud.user import get_current_user
+from database import get_session_factory
+from models.appoinment import Appointment, AppointmentStatus as AppointmentStatusModel
+from models.car import Car
+from models.user import User, UserRole
+from schemas.appoinment import AppointmentStatus
+from schemas.user import UserRoleEnum
+
+# Rows fetched per server-side cursor round trip and written per chunk.
+EXPORT_BATCH_SIZE = 1000
+
+USER_COLUMNS = ("user_id", "name", "email", "role")
+CAR_COLUMNS = ("car_id", "user_id", "brand", "model", "year", "plate_number", "vin")
+APPOINTMENT_COLUMNS = (
+    "appointment_id",
+    "user_id",
+    "car_id",
+    "service_id",
+    "mechanic_id",
+    "appointment_date",
+    "status",
+)
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def _select_columns(model, columns):
+    return select(*(getattr(model, column) for column in columns))
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_chunk(rows, columns) -> str:
+    return "".join(
+        json.dumps({column: _plain(getattr(row, column)) for column in columns}) + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows, columns, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows(
+        [_plain(getattr(row, column)) for column in columns] for row in rows
+    )
+    return buffer.getvalue()
+
+
+def stream_export(
+    session_factory, query, columns, export_format: ExportFormat, name: str
+):
+    """
+    Stream the plain column rows of ``query`` through a server-side cursor,
+    one batch at a time, so memory stays flat regardless of the table size.
+    """
+
+    async def body():
+        if export_format == ExportFormat.CSV:
+            yield _csv_chunk([], columns, header=True)
+
+        async with session_factory() as session:
+            result = await session.stream(
+                query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for rows in result.partitions():
+                if export_format == ExportFormat.CSV:
+                    yield _csv_chunk(rows, columns)
+                else:
+                    yield _ndjson_chunk(rows, columns)
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'
+        },
+    )
+
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized"
+        )
+    return current_user
+
+
+@router.get("/appointments")
+async def export_appointments(
+    format: ExportFormat = ExportFormat.NDJSON,
+    date_from: Optional[datetime] = Query(None, description="Inclusive lower bound"),
+    date_to: Optional[datetime] = Query(None, description="Exclusive upper bound"),
+    appointment_status: Optional[AppointmentStatus] = Query(None, alias="status"),
+    session_factory=Depends(get_session_factory),
+    current_user: User = Depends(require_admin),
+):
+    """Streams appointments filtered by date range and status (admin only)."""
+    query = _select_columns(Appointment, APPOINTMENT_COLUMNS).order_by(
+        Appointment.appointment_id
+    )
+
+    if date_from is not None:
+        query = query.where(Appointment.appointment_date >= date_from)
+
+    if date_to is not None:
+        query = query.where(Appointment.appointment_date < date_to)
+
+    if appointment_status is not None:
+        query = query.where(
+            Appointment.status == AppointmentStatusModel(appointment_status.value)
+        )
+
+    return stream_export(
+        session_factory, query, APPOINTMENT_COLUMNS, format, "appointments"
+    )
+
+
+@router.get("/cars")
+async def export_cars(
+    format: ExportFormat = ExportFormat.NDJSON,
+    user_id: Optional[int] = None,
+    session_factory=Depends(get_session_factory),
+    current_user: User = Depends(require_admin),
+):
+    """Streams cars, optionally for a single owner (admin only)."""
+    query = _select_columns(Car, CAR_COLUMNS).order_by(Car.car_id)
+
+    if user_id is not None:
+        query = query.where(Car.user_id == user_id)
+
+    return stream_export(session_factory, query, CAR_COLUMNS, format, "cars")
+
+
+@router.get("/users")
+async def export_users(
+    format: ExportFormat = ExportFormat.NDJSON,
+    role: Optional[UserRoleEnum] = None,
+    session_factory=Depends(get_session_factory),
+    current_user: User = Depends(require_admin),
+):
+    """Streams users without password hashes, optionally by role (admin only)."""
+    query = _select_columns(User, USER_COLUMNS).order_by(User.user_id)
+
+    if role is not None:
+        query = query.where(User.role == UserRole(role.value))
+
+    return stream_export(session_factory, query, USER_COLUMNS, format, "users")
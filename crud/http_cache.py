@@ -0,0 +1,17 @@
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header value against ``etag``."""
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def not_modified(request: Request, etag: str, headers: dict) -> Optional[Response]:
+    """A 304 response when the client already has ``etag``, else None."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+    return None
@@ -0,0 +1,158 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from crud.shared_state import SharedState, shared_state
+from settings import settings
+
+
+IDENTITY_CACHE_TTL = settings.get_float("IDENTITY_CACHE_TTL", 60)
+IDENTITY_CACHE_SIZE = settings.get_int("IDENTITY_CACHE_SIZE", 10000)
+
+
+class IdentityCacheBackend:
+    """
+    Interface for a cache shared between processes (e.g. Redis or memcached).
+
+    Values are dicts of column values, including enums and dates, so the
+    backend has to round-trip arbitrary Python objects (pickle works).
+    """
+
+    async def get(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: dict, ttl: float):
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+
+class SharedStateInvalidation(IdentityCacheBackend):
+    """
+    Shares only invalidations between the worker processes of one host: any
+    invalidation makes every other worker drop its whole local cache.
+    """
+
+    SLOT = "identity_cache"
+
+    def __init__(self, state: SharedState):
+        self.state = state
+
+    async def get(self, key: str) -> Optional[dict]:
+        return None
+
+    async def set(self, key: str, value: dict, ttl: float):
+        pass
+
+    async def delete(self, key: str):
+        self.state.publish(self.SLOT)
+
+
+class IdentityCache:
+    """
+    In-process TTL/LRU cache of authenticated identities keyed by token subject.
+
+    An optional shared backend is consulted on a local miss and receives every
+    write and invalidation, so other workers observe updates and deletions.
+    """
+
+    def __init__(
+        self,
+        max_size: int = IDENTITY_CACHE_SIZE,
+        ttl: float = IDENTITY_CACHE_TTL,
+        backend: Optional[IdentityCacheBackend] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(kind: str, subject) -> str:
+        return f"{kind}:{subject}"
+
+    async def get(self, kind: str, subject) -> Optional[dict]:
+        key = self._key(kind, subject)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.backend is not None:
+            value = await self.backend.get(key)
+            if value is not None:
+                self._store(key, value, now)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def set(self, kind: str, subject, value: dict):
+        key = self._key(kind, subject)
+        self._store(key, value, time.monotonic())
+        if self.backend is not None:
+            await self.backend.set(key, value, self.ttl)
+
+    async def invalidate(self, kind: str, subject):
+        key = self._key(kind, subject)
+        with self._lock:
+            self._entries.pop(key, None)
+            self.invalidations += 1
+        if self.backend is not None:
+            await self.backend.delete(key)
+
+    def _store(self, key: str, value: dict, now: float):
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def identity_snapshot(instance) -> dict:
+    """Column values of a User/Mechanic row without the password hash."""
+    return {
+        column.key: getattr(instance, column.key)
+        for column in instance.__table__.columns
+        if column.key != "password"
+    }
+
+
+identity_cache = IdentityCache(
+    backend=SharedStateInvalidation(shared_state) if shared_state.shared else None
+)
+shared_state.subscribe(SharedStateInvalidation.SLOT, identity_cache.clear)
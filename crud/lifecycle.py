@@ -0,0 +1,49 @@
+import asyncio
+import logging
+import time
+
+from crud.metrics import metrics
+from crud.scheduling import availability_index
+from crud.search import service_search
+from crud.service_catalog import service_catalog
+from settings import settings
+
+
+# Load the service catalog, its search index and the availability index when
+# a worker starts, instead of on its first requests.
+WARM_CACHES = settings.get_bool("WARM_CACHES", True)
+# Longest wait at shutdown for requests still being served.
+SHUTDOWN_DRAIN_SECONDS = settings.get_float("SHUTDOWN_DRAIN_SECONDS", 30)
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_caches(session_factory):
+    started = time.perf_counter()
+    try:
+        async with session_factory() as db:
+            snapshot = await service_catalog.get(db)
+            service_search.index_for(snapshot)
+            await availability_index.ensure_loaded(db)
+    except Exception:
+        # Caches load on demand anyway; a cold start is not fatal.
+        logger.exception("Cache warm-up failed")
+        return
+    logger.info(
+        "Warmed caches (%d services) in %.0fms",
+        len(snapshot.services),
+        (time.perf_counter() - started) * 1000,
+    )
+
+
+async def drain(timeout: float = SHUTDOWN_DRAIN_SECONDS) -> bool:
+    """Wait until no request is in flight; False if ``timeout`` ran out first."""
+    deadline = time.monotonic() + timeout
+    while metrics.in_flight:
+        if time.monotonic() >= deadline:
+            logger.warning(
+                "Shutting down with %d requests in flight", metrics.in_flight
+            )
+            return False
+        await asyncio.sleep(0.05)
+    return True
@@ -1,20 +1,25 @@
-import bcrypt
 import jwt
 from datetime import timedelta
-from typing import List
+from typing import List, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
 
+from crud.appointment_details import ExpandParams
 from crud.auth_config import (
     SECRET_KEY,
     ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     create_access_token,
 )
+from crud.identity_cache import identity_cache, identity_snapshot
+from crud.pagination import Page, PageParams, page_response, paginate
+from crud.scheduling import availability_index
+from crud.serialization import json_response, response_columns, response_models
+from crud.password_hashing import hash_password, needs_rehash, verify_password
 from database import get_async_db
 from models.mechanic import MechanicRole, Mechanic
 from schemas.mechanic import (
@@ -48,6 +53,10 @@ async def get_current_mechanic(
     except jwt.PyJWTError:
         raise credentials_exception
 
+    cached = await identity_cache.get("mechanic", mechanic_id)
+    if cached is not None:
+        return Mechanic(**cached)
+
     query = select(Mechanic).where(Mechanic.mechanic_id == mechanic_id)
     result = await db.execute(query)
     mechanic = result.scalar_one_or_none()
@@ -55,6 +64,8 @@ async def get_current_mechanic(
     if mechanic is None:
         raise credentials_exception
 
+    await identity_cache.set("mechanic", mechanic_id, identity_snapshot(mechanic))
+
     return mechanic
 
 
@@ -73,13 +84,13 @@ async def register_mechanic(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Login already registered"
         )
 
-    hashed_password = bcrypt.hashpw(mechanic.password.encode("utf-8"), bcrypt.gensalt())
+    hashed_password = await hash_password(mechanic.password)
 
     new_mechanic = Mechanic(
         name=mechanic.name,
         birth_date=mechanic.birth_date,
         login=mechanic.login,
-        password=hashed_password.decode("utf-8"),
+        password=hashed_password,
         role=mechanic.role,
         position=mechanic.position,
     )
@@ -87,6 +98,7 @@ async def register_mechanic(
     db.add(new_mechanic)
     await db.commit()
     await db.refresh(new_mechanic)
+    availability_index.add_mechanic(new_mechanic.mechanic_id)
 
     return MechanicResponse(
         mechanic_id=new_mechanic.mechanic_id,
@@ -109,14 +121,16 @@ async def login_mechanic(
     result = await db.execute(query)
     mechanic = result.scalar_one_or_none()
 
-    if not mechanic or not bcrypt.checkpw(
-        password.encode("utf-8"), mechanic.password.encode("utf-8")
-    ):
+    if not mechanic or not await verify_password(password, mechanic.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect login or password",
         )
 
+    if needs_rehash(mechanic.password):
+        mechanic.password = await hash_password(password)
+        await db.commit()
+
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(mechanic.mechanic_id)}, expires_delta=access_token_expires
@@ -135,18 +149,13 @@ async def read_mechanic_me(current_mechanic: Mechanic = Depends(get_current_mech
     """
     Get details of the currently logged-in mechanic.
     """
-    return MechanicResponse(
-        mechanic_id=current_mechanic.mechanic_id,
-        name=current_mechanic.name,
-        birth_date=current_mechanic.birth_date,
-        login=current_mechanic.login,
-        role=current_mechanic.role,
-        position=current_mechanic.position,
-    )
+    return json_response(MechanicResponse.model_validate(current_mechanic))
 
 
-@router.get("/", response_model=List[MechanicResponse])
+@router.get("/", response_model=Union[Page[MechanicResponse], List[MechanicResponse]])
 async def read_mechanics(
+    response: Response,
+    pagination: PageParams = Depends(),
     db: AsyncSession = Depends(get_async_db),
     current_mechanic: Mechanic = Depends(get_current_mechanic),
 ):
@@ -156,21 +165,13 @@ async def read_mechanics(
     if current_mechanic.role != MechanicRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    query = select(Mechanic)
-    result = await db.execute(query)
-    mechanics = result.scalars().all()
-
-    return [
-        MechanicResponse(
-            mechanic_id=mechanic.mechanic_id,
-            name=mechanic.name,
-            birth_date=mechanic.birth_date,
-            login=mechanic.login,
-            role=mechanic.role,
-            position=mechanic.position,
-        )
-        for mechanic in mechanics
-    ]
+    query = select(*response_columns(Mechanic, MechanicResponse))
+    mechanics, next_cursor = await paginate(
+        db, query, pagination, [Mechanic.mechanic_id]
+    )
+
+    items = response_models(MechanicResponse, mechanics)
+    return page_response(items, next_cursor, pagination, response)
 
 
 @router.put("/{mechanic_id}", response_model=MechanicResponse)
@@ -198,6 +199,7 @@ async def update_mechanic(
     )
     await db.execute(query)
     await db.commit()
+    await identity_cache.invalidate("mechanic", mechanic_id)
 
     query = select(Mechanic).where(Mechanic.mechanic_id == mechanic_id)
     result = await db.execute(query)
@@ -231,6 +233,8 @@ async def delete_mechanic(
     query = delete(Mechanic).where(Mechanic.mechanic_id == mechanic_id)
     result = await db.execute(query)
     await db.commit()
+    await identity_cache.invalidate("mechanic", mechanic_id)
+    availability_index.remove_mechanic(mechanic_id)
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Mechanic not found")
@@ -238,27 +242,41 @@ async def delete_mechanic(
     return {"detail": "Mechanic deleted successfully"}
 
 
-@router.get("/appointments", response_model=List[dict])
+@router.get("/appointments", response_model=Union[Page[dict], List[dict]])
 async def get_mechanic_appointments(
+    response: Response,
+    pagination: PageParams = Depends(),
+    expand: ExpandParams = Depends(),
     db: AsyncSession = Depends(get_async_db),
     current_mechanic: Mechanic = Depends(get_current_mechanic),
 ):
     """
-    Get appointments for the currently logged-in mechanic.
+    Get appointments for the currently logged-in mechanic, with the related
+    car, service, mechanic or user embedded when named in ``expand``.
     """
-    query = select(Appointment).where(
-        Appointment.mechanic_id == current_mechanic.mechanic_id
+    columns = [
+        Appointment.appointment_id,
+        Appointment.car_id,
+        Appointment.service_id,
+        Appointment.appointment_date,
+        Appointment.status,
+    ]
+    if expand.names:
+        query = select(Appointment).options(*expand.options())
+    else:
+        query = select(*columns)
+    query = query.where(Appointment.mechanic_id == current_mechanic.mechanic_id)
+    appointments, next_cursor = await paginate(
+        db,
+        query,
+        pagination,
+        [Appointment.appointment_date, Appointment.appointment_id],
     )
-    result = await db.execute(query)
-    appointments = result.scalars().all()
-
-    return [
-        {
-            "appointment_id": appt.appointment_id,
-            "car_id": appt.car_id,
-            "service_type": appt.service_type,
-            "appointment_date": appt.appointment_date,
-            "status": appt.status,
-        }
+
+    items = [
+        {column.key: getattr(appt, column.key) for column in columns}
         for appt in appointments
     ]
+    if expand.names:
+        items = expand.embed(items, appointments)
+    return page_response(items, next_cursor, pagination, response)
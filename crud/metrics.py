@@ -0,0 +1,199 @@
+import bisect
+import math
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.responses import PlainTextResponse
+
+from crud.query_stats import request_observers
+from database import QueryStats
+
+
+# Upper bounds of the request latency buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Label for requests that matched no route, so 404 scans cannot create
+# one series per URL.
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def route_label(scope) -> str:
+    """The matched route's path template, e.g. ``/api/v1/cars/{car_id}``."""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+class Histogram:
+    """Per-label-set bucket counts; cumulated only when rendered."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.series: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            # One count per bucket plus +Inf, then the sum.
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, name: str, label_names: tuple) -> List[str]:
+        lines = []
+        for labels, series in sorted(self.series.items()):
+            total = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                total += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {total}")
+            lines.append(f"{name}_sum{_labels(label_names, labels)} {series[-1]!r}")
+            lines.append(f"{name}_count{_labels(label_names, labels)} {total}")
+        return lines
+
+
+class Metrics:
+    """
+    In-process request metrics in the Prometheus text exposition format.
+
+    Recording only updates dicts keyed by label values. Everything is
+    formatted when /metrics is scraped, together with the stats of the
+    registered components (pool, outbox, caches).
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.latency = Histogram()
+        self.responses: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.db_queries: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.db_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.stats_sources: List[Tuple[str, Callable[[], dict]]] = []
+
+    def register_stats(self, prefix: str, source: Callable[[], dict]):
+        """Export the numeric values of ``source()`` as ``<prefix>_<key>`` gauges."""
+        self.stats_sources.append((prefix, source))
+
+    def record(self, method: str, route: str, status: int, seconds: float):
+        self.latency.observe((method, route), seconds)
+        self.responses[(method, route, status)] += 1
+
+    def record_queries(self, scope, stats: QueryStats, seconds: float):
+        key = (scope["method"], route_label(scope))
+        self.db_queries[key] += stats.queries
+        self.db_seconds[key] += stats.db_time
+
+    def render(self) -> str:
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        route_labels = ("method", "route")
+        family(
+            "http_requests_in_flight",
+            "gauge",
+            "Requests currently being served.",
+            [f"http_requests_in_flight {self.in_flight}"],
+        )
+        family(
+            "http_request_duration_seconds",
+            "histogram",
+            "Request latency by route.",
+            self.latency.render("http_request_duration_seconds", route_labels),
+        )
+        family(
+            "http_responses_total",
+            "counter",
+            "Responses by route and status code.",
+            [
+                f"http_responses_total"
+                f"{_labels(route_labels + ('status',), key)} {count}"
+                for key, count in sorted(self.responses.items())
+            ],
+        )
+        family(
+            "http_request_db_queries_total",
+            "counter",
+            "SQL statements run by route.",
+            [
+                f"http_request_db_queries_total{_labels(route_labels, key)} {count}"
+                for key, count in sorted(self.db_queries.items())
+            ],
+        )
+        family(
+            "http_request_db_seconds_total",
+            "counter",
+            "Time spent in SQL statements by route.",
+            [
+                f"http_request_db_seconds_total{_labels(route_labels, key)} {seconds!r}"
+                for key, seconds in sorted(self.db_seconds.items())
+            ],
+        )
+
+        for prefix, source in self.stats_sources:
+            for key, value in source().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = f"{prefix}_{key}"
+                    family(name, "gauge", f"{prefix} {key}.", [f"{name} {value!r}"])
+        return "\n".join(lines) + "\n"
+
+    def response(self) -> PlainTextResponse:
+        return PlainTextResponse(self.render(), media_type=CONTENT_TYPE)
+
+
+metrics = Metrics()
+request_observers.append(metrics.record_queries)
+
+
+class MetricsMiddleware:
+    """Records latency, status code and in-flight count of every HTTP request."""
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            registry.record(
+                scope["method"],
+                route_label(scope),
+                status_code,
+                time.perf_counter() - started,
+            )
@@ -0,0 +1,161 @@
+import base64
+import bisect
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Generic, List, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.serialization import json_response
+from settings import settings
+
+
+PAGE_SIZE_DEFAULT = settings.get_int("PAGE_SIZE_DEFAULT", 50)
+PAGE_SIZE_MAX = settings.get_int("PAGE_SIZE_MAX", 500)
+# Clients that send neither ``limit`` nor ``cursor`` keep getting a bare list
+# of up to this many rows. Longer results come in the ``Page`` envelope
+# instead, so a truncated list is never mistaken for the whole result.
+PAGINATION_LEGACY_LIMIT = settings.get_int("PAGINATION_LEGACY_LIMIT", 1000)
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint."""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(
+            None, ge=1, description=f"Page size, capped at {PAGE_SIZE_MAX}"
+        ),
+        cursor: Optional[str] = Query(
+            None, description="Opaque cursor from a previous next_cursor"
+        ),
+    ):
+        self.cursor = cursor
+        self.legacy = limit is None and cursor is None
+        if self.legacy:
+            self.limit = PAGINATION_LEGACY_LIMIT
+        else:
+            self.limit = min(limit or PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX)
+
+
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _from_json(value, column):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+    )
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise invalid_cursor
+        return [_from_json(value, column) for value, column in zip(values, columns)]
+    except (ValueError, TypeError):
+        raise invalid_cursor
+
+
+def _after(columns: Sequence, values: Sequence):
+    """
+    Keyset condition ``(c1, c2, ...) > (v1, v2, ...)`` written out as
+    OR/AND terms, which MySQL can serve from a composite index.
+    """
+    terms = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        terms.append(and_(*equal_prefix, column > values[i]))
+    return or_(*terms)
+
+
+async def paginate(
+    db: AsyncSession, query, params: PageParams, order_by: Sequence
+) -> tuple:
+    """
+    Fetch one page of ``query`` ordered by ``order_by`` (sort keys ending with
+    the primary key). Returns the rows and the cursor of the next page: ORM
+    objects for an entity query, Row tuples for a column projection, which
+    must include the ``order_by`` columns.
+    """
+    if params.cursor:
+        query = query.where(_after(order_by, decode_cursor(params.cursor, order_by)))
+
+    query = query.order_by(*order_by).limit(params.limit + 1)
+    result = await db.execute(query)
+    entity = query.column_descriptions[0]
+    if len(query.column_descriptions) == 1 and entity["expr"] is entity["entity"]:
+        rows = result.scalars().all()
+    else:
+        rows = result.all()
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[: params.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in order_by])
+
+    return rows, next_cursor
+
+
+def paginate_sorted(
+    items: Sequence, keys: Sequence, params: PageParams, order_by: Sequence
+) -> tuple:
+    """
+    ``paginate`` over an in-memory list. ``keys`` holds the tuple of
+    ``order_by`` values of each item, in the same ascending order.
+    """
+    start = 0
+    if params.cursor:
+        after = tuple(decode_cursor(params.cursor, order_by))
+        start = bisect.bisect_right(keys, after)
+
+    rows = list(items[start : start + params.limit + 1])
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[: params.limit]
+        next_cursor = encode_cursor(keys[start + params.limit - 1])
+
+    return rows, next_cursor
+
+
+def page_response(
+    items: list, next_cursor: Optional[str], params: PageParams, response: Response
+):
+    """
+    Wrap a page in the ``Page`` envelope. Clients using the legacy list
+    format get the bare list when it holds the whole result, and the
+    envelope with its ``next_cursor`` when it was cut off.
+    ``items`` are sent as built (see crud.serialization.json_response).
+    """
+    if params.legacy and next_cursor is None:
+        return json_response(items, response)
+    return json_response({"items": items, "next_cursor": next_cursor}, response)
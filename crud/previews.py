@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import os
+from typing import TYPE_CHECKING, Dict, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from models.document_preview import DocumentPreview, PreviewStatus
+from settings import settings
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+# Longest side of a generated thumbnail, in pixels.
+PREVIEW_MAX_SIZE = settings.get_int("PREVIEW_MAX_SIZE", 320)
+PREVIEW_WORKERS = settings.get_int("PREVIEW_WORKERS", 2)
+PREVIEW_SUFFIX = ".preview.jpg"
+
+logger = logging.getLogger(__name__)
+
+
+def preview_path(file_path: str) -> str:
+    """Thumbnails are stored next to the original file."""
+    return file_path + PREVIEW_SUFFIX
+
+
+def render_preview(source_path: str, target_path: str, max_size: int) -> tuple:
+    """
+    Write a JPEG thumbnail of an image or of a PDF's first page and return
+    its (width, height). Runs in a worker process.
+
+    Needs Pillow, plus PyMuPDF for PDFs; ImportError means the preview is
+    unsupported in this installation.
+    """
+    from PIL import Image
+
+    with open(source_path, "rb") as source:
+        is_pdf = source.read(5) == b"%PDF-"
+
+    if is_pdf:
+        import fitz
+
+        with fitz.open(source_path) as pdf:
+            page = pdf.load_page(0)
+            zoom = max_size / max(page.rect.width, page.rect.height)
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes(
+                "RGB", (pixmap.width, pixmap.height), pixmap.samples
+            )
+    else:
+        image = Image.open(source_path)
+        # Lets the JPEG decoder downscale while decoding large scans.
+        image.draft("RGB", (max_size, max_size))
+
+    image = image.convert("RGB")
+    image.thumbnail((max_size, max_size))
+    temp_path = target_path + ".part"
+    image.save(temp_path, "JPEG", quality=80)
+    os.replace(temp_path, target_path)
+    return image.size
+
+
+class PreviewPipeline:
+    """
+    Generates document thumbnails in a process pool, off the request path.
+
+    Previews are keyed by content hash: a document whose content did not
+    change, or that shares content with another one, reuses the existing
+    preview. Each hash is generated by at most one task at a time.
+    """
+
+    def __init__(
+        self,
+        workers: int = PREVIEW_WORKERS,
+        max_size: int = PREVIEW_MAX_SIZE,
+        renderer=render_preview,
+    ):
+        self.workers = workers
+        self.max_size = max_size
+        self.renderer = renderer
+        self.generated = 0
+        self.reused = 0
+        self.failed = 0
+        self._executor: Optional["ProcessPoolExecutor"] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def executor(self) -> "ProcessPoolExecutor":
+        if self._executor is None:
+            # The process pool and multiprocessing load with the first preview.
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._executor
+
+    def schedule(self, session_factory, file_path: str, sha256: str) -> asyncio.Task:
+        """Start generating the preview of ``file_path`` unless it is already running."""
+        task = self._tasks.get(sha256)
+        if task is None:
+            task = asyncio.create_task(
+                self._generate(session_factory, file_path, sha256)
+            )
+            self._tasks[sha256] = task
+            task.add_done_callback(lambda done: self._finished(sha256, done))
+        return task
+
+    def _finished(self, sha256: str, task: asyncio.Task):
+        # Nothing else awaits the task, so its errors are reported here.
+        self._tasks.pop(sha256, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Preview of %s failed", sha256, exc_info=task.exception())
+
+    async def wait(self):
+        """Wait for every scheduled preview to finish."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+
+    async def _generate(self, session_factory, file_path: str, sha256: str):
+        try:
+            await self._render(session_factory, file_path, sha256)
+        except Exception as e:
+            # Not a rendering error (those are recorded below): do not leave
+            # the preview pending forever.
+            self.failed += 1
+            await self._mark_failed(session_factory, sha256, e)
+            raise
+
+    async def _mark_failed(self, session_factory, sha256: str, error: Exception):
+        try:
+            async with session_factory() as db:
+                await db.execute(
+                    update(DocumentPreview)
+                    .where(
+                        DocumentPreview.sha256 == sha256,
+                        DocumentPreview.status == PreviewStatus.PENDING,
+                    )
+                    .values(status=PreviewStatus.FAILED, error=str(error)[:500])
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Could not mark the preview of %s as failed", sha256)
+
+    async def _render(self, session_factory, file_path: str, sha256: str):
+        target_path = preview_path(file_path)
+        async with session_factory() as db:
+            preview = await db.get(DocumentPreview, sha256)
+            if preview is not None and preview.status != PreviewStatus.PENDING:
+                # Same content as before: only a lost thumbnail file is redone.
+                if preview.status != PreviewStatus.READY or await asyncio.to_thread(
+                    os.path.exists, target_path
+                ):
+                    self.reused += 1
+                    return
+
+            if preview is None:
+                preview = DocumentPreview(sha256=sha256)
+                db.add(preview)
+            preview.status = PreviewStatus.PENDING
+            preview.error = None
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another worker process got the same content first and is
+                # generating its preview.
+                await db.rollback()
+                self.reused += 1
+                return
+
+            loop = asyncio.get_running_loop()
+            try:
+                width, height = await loop.run_in_executor(
+                    self.executor, self.renderer, file_path, target_path, self.max_size
+                )
+            except ImportError as e:
+                preview.status = PreviewStatus.UNSUPPORTED
+                preview.error = f"Preview support is not installed: {e}"[:500]
+            except Exception as e:
+                self.failed += 1
+                preview.status = PreviewStatus.FAILED
+                preview.error = str(e)[:500]
+            else:
+                self.generated += 1
+                preview.status = PreviewStatus.READY
+                preview.width = width
+                preview.height = height
+            await db.commit()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_progress": len(self._tasks),
+            "generated": self.generated,
+            "reused": self.reused,
+            "failed": self.failed,
+        }
+
+
+preview_pipeline = PreviewPipeline()
@@ -0,0 +1,85 @@
+import logging
+import time
+from typing import Callable, List
+
+from database import QueryStats, current_query_stats
+from settings import settings
+
+
+# Requests slower than this are logged with their query statistics.
+SLOW_REQUEST_MS = settings.get_float("SLOW_REQUEST_MS", 500)
+# A statement run this many times in one request is logged as a likely N+1.
+N_PLUS_ONE_THRESHOLD = settings.get_int("N_PLUS_ONE_THRESHOLD", 10)
+
+logger = logging.getLogger(__name__)
+
+# Called with (scope, stats, seconds) after every request, e.g. by the
+# query budget test plugin.
+request_observers: List[Callable[[dict, QueryStats, float], None]] = []
+
+
+def server_timing(stats: QueryStats, seconds: float) -> str:
+    return (
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries, '
+        f'{stats.rows} rows", app;dur={seconds * 1000:.2f}'
+    )
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL statements, database time and rows fetched by each
+    request. The totals are sent in a Server-Timing header. Slow requests
+    and statements repeated in a loop are logged.
+
+    Statements run while a streamed body is sent (exports) come after the
+    headers, so they are logged but not in Server-Timing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timing = server_timing(stats, time.perf_counter() - started)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            self._report(scope, stats, time.perf_counter() - started)
+
+    def _report(self, scope, stats: QueryStats, seconds: float):
+        statement, repeats = stats.most_repeated()
+        if repeats >= N_PLUS_ONE_THRESHOLD:
+            logger.warning(
+                "%s %s ran the same statement %d times (possible N+1): %s",
+                scope["method"],
+                scope["path"],
+                repeats,
+                " ".join(statement.split())[:200],
+            )
+        if seconds * 1000 >= SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request %s %s: %.1fms, %d queries in %.1fms, %d rows",
+                scope["method"],
+                scope["path"],
+                seconds * 1000,
+                stats.queries,
+                stats.db_time * 1000,
+                stats.rows,
+            )
+        for observer in request_observers:
+            observer(scope, stats, seconds)
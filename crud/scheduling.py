@@ -0,0 +1,499 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from crud.shared_state import SharedState, shared_state
+from models.appoinment import Appointment, AppointmentStatus
+from models.mechanic import Mechanic
+from models.services import Service
+from settings import settings
+
+
+WORKDAY_START_HOUR = settings.get_int("WORKDAY_START_HOUR", 8)
+WORKDAY_END_HOUR = settings.get_int("WORKDAY_END_HOUR", 18)
+SLOT_STEP_MINUTES = settings.get_int("SLOT_STEP_MINUTES", 30)
+# The index is rebuilt from the database after this many seconds, which picks
+# up bookings made outside this host's workers (those on it are shared).
+AVAILABILITY_INDEX_TTL = settings.get_float("AVAILABILITY_INDEX_TTL", 300)
+# Background auto-assignment: seconds between runs (0 disables the job) and
+# how far ahead of now each run looks for pending appointments.
+AUTO_ASSIGN_INTERVAL = settings.get_float("AUTO_ASSIGN_INTERVAL", 0)
+AUTO_ASSIGN_HORIZON_HOURS = settings.get_int("AUTO_ASSIGN_HORIZON_HOURS", 48)
+
+# Appointments in these states no longer occupy a mechanic.
+INACTIVE_STATUSES = (AppointmentStatus.CANCELLED, AppointmentStatus.COMPLETED)
+# Upper bound on a single service's length, used to bound overlap lookups.
+MAX_SERVICE_LENGTH = timedelta(days=1)
+
+AVAILABILITY_SLOT = "availability"
+# SharedState lock keys: the auto-assign job, then one per mechanic, after
+# the one for unassigned bookings.
+AUTO_ASSIGN_JOB_LOCK = 0
+BOOKING_LOCK_BASE = 1
+
+logger = logging.getLogger(__name__)
+
+
+class MechanicCalendar:
+    """Bookings of one mechanic as (start, end, appointment_id), sorted by start."""
+
+    __slots__ = ("intervals", "max_length")
+
+    def __init__(self):
+        self.intervals = []
+        self.max_length = timedelta(0)
+
+    def add(self, start: datetime, end: datetime, appointment_id: int):
+        bisect.insort(self.intervals, (start, end, appointment_id))
+        if end - start > self.max_length:
+            self.max_length = end - start
+
+    def remove(self, start: datetime, end: datetime, appointment_id: int):
+        index = bisect.bisect_left(self.intervals, (start, end, appointment_id))
+        if index < len(self.intervals) and self.intervals[index][2] == appointment_id:
+            del self.intervals[index]
+
+    def overlapping(self, start: datetime, end: datetime) -> list:
+        """Bookings intersecting [start, end), in start order."""
+        index = bisect.bisect_left(self.intervals, (start - self.max_length,))
+        found = []
+        while index < len(self.intervals) and self.intervals[index][0] < end:
+            if self.intervals[index][1] > start:
+                found.append(self.intervals[index])
+            index += 1
+        return found
+
+    def busy_blocks(self, start: datetime, end: datetime) -> list:
+        """Merged (start, end) busy blocks intersecting [start, end)."""
+        blocks = []
+        for block_start, block_end, _ in self.overlapping(start, end):
+            if blocks and block_start <= blocks[-1][1]:
+                if block_end > blocks[-1][1]:
+                    blocks[-1][1] = block_end
+            else:
+                blocks.append([block_start, block_end])
+        return blocks
+
+
+class AvailabilityIndex:
+    """
+    In-memory interval index of mechanic bookings.
+
+    Built from the database on first use and kept current by the appointment
+    handlers, which report every booking change after committing it.
+    Appointments without a mechanic live in a separate calendar: each of them
+    still needs one free mechanic at its time.
+
+    Worker processes on the same host share booking locks and change
+    notifications through ``state``, so a booking made by one of them
+    invalidates the index of the others.
+    """
+
+    def __init__(self, state: Optional[SharedState] = None):
+        self.state = state or SharedState()
+        self.state.subscribe(AVAILABILITY_SLOT, self.invalidate)
+        self.mechanic_ids = set()
+        self.calendars: Dict[int, MechanicCalendar] = defaultdict(MechanicCalendar)
+        self.unassigned = MechanicCalendar()
+        self.bookings = {}
+        self.loaded_at: Optional[float] = None
+        self._load_lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return (
+            self.loaded_at is not None
+            and time.monotonic() - self.loaded_at < AVAILABILITY_INDEX_TTL
+        )
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if not self.loaded:
+                await self.rebuild(db)
+
+    async def rebuild(self, db: AsyncSession):
+        mechanics = await db.execute(select(Mechanic.mechanic_id))
+        since = datetime.combine(date.today(), dt_time()) - MAX_SERVICE_LENGTH
+        bookings = await db.execute(
+            select(
+                Appointment.appointment_id,
+                Appointment.mechanic_id,
+                Appointment.appointment_date,
+                Service.duration,
+            )
+            .join(Service, Service.service_id == Appointment.service_id)
+            .where(
+                Appointment.appointment_date >= since,
+                Appointment.status.not_in(INACTIVE_STATUSES),
+            )
+        )
+
+        self.mechanic_ids = set(mechanics.scalars().all())
+        self.calendars = defaultdict(MechanicCalendar)
+        self.unassigned = MechanicCalendar()
+        self.bookings = {}
+        for appointment_id, mechanic_id, start, duration in bookings.all():
+            self._add(appointment_id, mechanic_id, start, duration)
+        self.loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self.loaded_at = None
+
+    def _calendar(self, mechanic_id: Optional[int]) -> MechanicCalendar:
+        if mechanic_id is None:
+            return self.unassigned
+        return self.calendars[mechanic_id]
+
+    def _add(self, appointment_id, mechanic_id, start, duration):
+        end = start + timedelta(minutes=duration)
+        self._calendar(mechanic_id).add(start, end, appointment_id)
+        self.bookings[appointment_id] = (mechanic_id, start, end)
+
+    def book(
+        self,
+        appointment_id: int,
+        mechanic_id: Optional[int],
+        start: datetime,
+        duration: int,
+    ):
+        """Record a committed booking, replacing any previous one of the appointment."""
+        self.release(appointment_id)
+        if self.loaded_at is None:
+            return
+        self._add(appointment_id, mechanic_id, start, duration)
+
+    def release(self, appointment_id: int):
+        self.state.publish(AVAILABILITY_SLOT)
+        if self.loaded_at is None:
+            return
+        booking = self.bookings.pop(appointment_id, None)
+        if booking is not None:
+            mechanic_id, start, end = booking
+            self._calendar(mechanic_id).remove(start, end, appointment_id)
+
+    def add_mechanic(self, mechanic_id: int):
+        self.state.publish(AVAILABILITY_SLOT)
+        if self.loaded_at is not None:
+            self.mechanic_ids.add(mechanic_id)
+
+    def remove_mechanic(self, mechanic_id: int):
+        self.state.publish(AVAILABILITY_SLOT)
+        if self.loaded_at is not None:
+            self.mechanic_ids.discard(mechanic_id)
+            self.calendars.pop(mechanic_id, None)
+
+    @asynccontextmanager
+    async def booking_lock(self, mechanic_id: Optional[int]):
+        """
+        Serializes check-and-book of one mechanic (or of unassigned bookings)
+        across coroutines and worker processes.
+        """
+        async with self.state.lock(BOOKING_LOCK_BASE + (mechanic_id or 0)):
+            # Bookings another worker made since the last poll.
+            self.state.check(AVAILABILITY_SLOT)
+            yield
+
+    def _unassigned_count(self, start, end, exclude_appointment_id=None) -> int:
+        return sum(
+            1
+            for _, _, appointment_id in self.unassigned.overlapping(start, end)
+            if appointment_id != exclude_appointment_id
+        )
+
+    def free_mechanics(
+        self, start: datetime, end: datetime, exclude_appointment_id=None
+    ) -> List[int]:
+        free = []
+        for mechanic_id in sorted(self.mechanic_ids):
+            calendar = self.calendars.get(mechanic_id)
+            if calendar is None or not any(
+                appointment_id != exclude_appointment_id
+                for _, _, appointment_id in calendar.overlapping(start, end)
+            ):
+                free.append(mechanic_id)
+        return free
+
+    def has_capacity(
+        self, start: datetime, end: datetime, exclude_appointment_id=None
+    ) -> bool:
+        """True when a new unassigned booking still leaves one mechanic each."""
+        free = self.free_mechanics(start, end, exclude_appointment_id)
+        return len(free) > self._unassigned_count(start, end, exclude_appointment_id)
+
+    def free_slots(self, day: date, duration: int) -> list:
+        """
+        Start times on ``day`` (every SLOT_STEP_MINUTES within working hours)
+        at which a ``duration``-minute service fits, with the free mechanics.
+        """
+        day_start = datetime.combine(day, dt_time(WORKDAY_START_HOUR))
+        day_end = datetime.combine(day, dt_time(WORKDAY_END_HOUR))
+        length = timedelta(minutes=duration)
+        step = timedelta(minutes=SLOT_STEP_MINUTES)
+
+        starts = []
+        start = day_start
+        while start + length <= day_end:
+            starts.append(start)
+            start += step
+
+        free_by_slot = [[] for _ in starts]
+        for mechanic_id in sorted(self.mechanic_ids):
+            calendar = self.calendars.get(mechanic_id)
+            blocks = calendar.busy_blocks(day_start, day_end) if calendar else []
+            block = 0
+            for slot, start in enumerate(starts):
+                while block < len(blocks) and blocks[block][1] <= start:
+                    block += 1
+                if block == len(blocks) or blocks[block][0] >= start + length:
+                    free_by_slot[slot].append(mechanic_id)
+
+        slots = []
+        for start, free in zip(starts, free_by_slot):
+            if len(free) > self._unassigned_count(start, start + length):
+                slots.append(
+                    {"start": start, "end": start + length, "mechanic_ids": free}
+                )
+        return slots
+
+
+availability_index = AvailabilityIndex(shared_state)
+
+
+async def ensure_mechanic_free(
+    db: AsyncSession,
+    mechanic_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_appointment_id: Optional[int] = None,
+):
+    """
+    Authoritative double-booking check, run inside the booking transaction.
+
+    The mechanic row is locked first (SELECT ... FOR UPDATE on MySQL), so two
+    workers booking the same mechanic are serialized until one commits.
+    """
+    await db.execute(
+        select(Mechanic.mechanic_id)
+        .where(Mechanic.mechanic_id == mechanic_id)
+        .with_for_update()
+    )
+    query = (
+        select(
+            Appointment.appointment_id, Appointment.appointment_date, Service.duration
+        )
+        .join(Service, Service.service_id == Appointment.service_id)
+        .where(
+            Appointment.mechanic_id == mechanic_id,
+            Appointment.appointment_date < end,
+            Appointment.appointment_date > start - MAX_SERVICE_LENGTH,
+            Appointment.status.not_in(INACTIVE_STATUSES),
+        )
+    )
+    if exclude_appointment_id is not None:
+        query = query.where(Appointment.appointment_id != exclude_appointment_id)
+
+    result = await db.execute(query)
+    for appointment_id, booked_start, duration in result.all():
+        if booked_start + timedelta(minutes=duration) > start:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Mechanic is already booked by appointment {appointment_id}",
+            )
+
+
+def plan_assignments(
+    pending: list,
+    mechanic_ids,
+    calendars: Dict[int, MechanicCalendar],
+    loads: Dict[int, int],
+) -> tuple:
+    """
+    Greedy load-balancing assignment of ``pending`` (appointment_id, start,
+    duration) tuples, earliest start first.
+
+    Each appointment goes to the least-loaded mechanic (booked minutes, from
+    a min-heap) whose calendar is free at that time. ``calendars`` and
+    ``loads`` are updated in place. Returns the (appointment_id, mechanic_id)
+    assignments and the ids of appointments no mechanic could take.
+    """
+    heap = [(loads.get(mechanic_id, 0), mechanic_id) for mechanic_id in mechanic_ids]
+    heapq.heapify(heap)
+
+    assignments = []
+    unassigned = []
+    # Calendars only fill up during a run, so an interval nobody could take
+    # stays untakeable; remembering it avoids rescanning every mechanic.
+    full = set()
+    for appointment_id, start, duration in sorted(
+        pending, key=lambda item: (item[1], -item[2], item[0])
+    ):
+        end = start + timedelta(minutes=duration)
+        if (start, end) in full:
+            unassigned.append(appointment_id)
+            continue
+        busy = []
+        chosen = None
+        while heap:
+            load, mechanic_id = heapq.heappop(heap)
+            if calendars[mechanic_id].overlapping(start, end):
+                busy.append((load, mechanic_id))
+            else:
+                chosen = (load + duration, mechanic_id)
+                break
+
+        if chosen is None:
+            full.add((start, end))
+            unassigned.append(appointment_id)
+        else:
+            load, mechanic_id = chosen
+            calendars[mechanic_id].add(start, end, appointment_id)
+            loads[mechanic_id] = load
+            heapq.heappush(heap, chosen)
+            assignments.append((appointment_id, mechanic_id))
+
+        for item in busy:
+            heapq.heappush(heap, item)
+
+    return assignments, unassigned
+
+
+_auto_assign_lock = asyncio.Lock()
+
+
+async def auto_assign(
+    db: AsyncSession, date_from: datetime, date_to: datetime, dry_run: bool = False
+) -> dict:
+    """
+    Assign mechanics to every unassigned PENDING appointment starting in
+    [date_from, date_to) and confirm them, in one transaction.
+
+    Mechanic rows are locked for the run (SELECT ... FOR UPDATE on MySQL) so
+    manual assignments in other workers wait for it. With ``dry_run`` the
+    plan is computed and returned without writing anything.
+    """
+    async with _auto_assign_lock:
+        mechanic_query = select(Mechanic.mechanic_id)
+        if not dry_run:
+            mechanic_query = mechanic_query.with_for_update()
+        mechanic_result = await db.execute(mechanic_query)
+        mechanic_ids = mechanic_result.scalars().all()
+
+        booked = await db.execute(
+            select(
+                Appointment.appointment_id,
+                Appointment.mechanic_id,
+                Appointment.appointment_date,
+                Service.duration,
+            )
+            .join(Service, Service.service_id == Appointment.service_id)
+            .where(
+                Appointment.mechanic_id.is_not(None),
+                Appointment.appointment_date < date_to,
+                Appointment.appointment_date > date_from - MAX_SERVICE_LENGTH,
+                Appointment.status.not_in(INACTIVE_STATUSES),
+            )
+        )
+        calendars = defaultdict(MechanicCalendar)
+        loads = defaultdict(int)
+        for appointment_id, mechanic_id, start, duration in booked.all():
+            end = start + timedelta(minutes=duration)
+            calendars[mechanic_id].add(start, end, appointment_id)
+            if start >= date_from:
+                loads[mechanic_id] += duration
+
+        pending_result = await db.execute(
+            select(
+                Appointment.appointment_id,
+                Appointment.appointment_date,
+                Service.duration,
+            )
+            .join(Service, Service.service_id == Appointment.service_id)
+            .where(
+                Appointment.mechanic_id.is_(None),
+                Appointment.status == AppointmentStatus.PENDING,
+                Appointment.appointment_date >= date_from,
+                Appointment.appointment_date < date_to,
+            )
+        )
+        pending = {row[0]: (row[1], row[2]) for row in pending_result.all()}
+
+        assignments, unassigned = plan_assignments(
+            [(id_, start, duration) for id_, (start, duration) in pending.items()],
+            mechanic_ids,
+            calendars,
+            loads,
+        )
+
+        if not dry_run and assignments:
+            await db.execute(
+                update(Appointment),
+                [
+                    {
+                        "appointment_id": appointment_id,
+                        "mechanic_id": mechanic_id,
+                        "status": AppointmentStatus.CONFIRMED,
+                    }
+                    for appointment_id, mechanic_id in assignments
+                ],
+            )
+            await db.commit()
+            for appointment_id, mechanic_id in assignments:
+                start, duration = pending[appointment_id]
+                availability_index.book(appointment_id, mechanic_id, start, duration)
+        elif not dry_run:
+            await db.commit()
+
+    return {
+        "dry_run": dry_run,
+        "assigned": [
+            {"appointment_id": appointment_id, "mechanic_id": mechanic_id}
+            for appointment_id, mechanic_id in assignments
+        ],
+        "unassigned": sorted(unassigned),
+        "mechanic_load": {
+            mechanic_id: loads[mechanic_id] for mechanic_id in mechanic_ids
+        },
+    }
+
+
+async def run_auto_assign_job(session_factory, interval: float = None):
+    """
+    Periodically auto-assign pending appointments from now until
+    AUTO_ASSIGN_HORIZON_HOURS ahead. Runs until cancelled.
+    """
+    interval = interval or AUTO_ASSIGN_INTERVAL
+    while True:
+        # One worker per host runs the job; another takes over if it exits.
+        if not shared_state.try_hold(AUTO_ASSIGN_JOB_LOCK):
+            await asyncio.sleep(interval)
+            continue
+        now = datetime.now()
+        try:
+            async with session_factory() as session:
+                result = await auto_assign(
+                    session, now, now + timedelta(hours=AUTO_ASSIGN_HORIZON_HOURS)
+                )
+            logger.info(
+                "Auto-assigned %d appointments, %d left unassigned",
+                len(result["assigned"]),
+                len(result["unassigned"]),
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Auto-assignment run failed")
+        await asyncio.sleep(interval)
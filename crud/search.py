@@ -0,0 +1,200 @@
+import bisect
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Float, column
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.services import Service
+from settings import settings
+
+
+# "auto" uses the MySQL FULLTEXT index on MySQL and the trigram index elsewhere.
+SERVICE_SEARCH_BACKEND = settings.get("SERVICE_SEARCH_BACKEND", "auto")
+# Minimum trigram similarity for a misspelt word to still match (as pg_trgm).
+SEARCH_SIMILARITY_THRESHOLD = settings.get_float("SEARCH_SIMILARITY_THRESHOLD", 0.3)
+# Upper bound of rows asked from the FULLTEXT index for one search.
+FULLTEXT_MAX_RESULTS = settings.get_int("FULLTEXT_MAX_RESULTS", 1000)
+
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+# Sort keys of ranked results, for paginate_sorted: (-score, service_id).
+RANKED_ORDER = [column("score", Float), Service.service_id]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase, accent-free words of ``text``."""
+    if not text:
+        return []
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return [word for word in _NON_WORD.split(text.replace("_", " ")) if word]
+
+
+def trigrams(word: str) -> set:
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    In-memory search over service names and descriptions.
+
+    Words are indexed by trigram, so a query word matches indexed words that
+    share enough trigrams with it (typo tolerance), and the last query word
+    also matches words it is a prefix of (autocomplete). Every query word has
+    to match; a service scores the sum of its best match per query word,
+    with name matches weighing more than description matches.
+    """
+
+    def __init__(self, documents: Iterable[Tuple[int, str, Optional[str]]]):
+        # word -> {service_id: field weight}
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for service_id, name, description in documents:
+            for weight, text in (
+                (DESCRIPTION_WEIGHT, description),
+                (NAME_WEIGHT, name),
+            ):
+                for word in tokenize(text):
+                    self.postings[word][service_id] = weight
+
+        self.words = sorted(self.postings)
+        self.trigram_counts: Dict[str, int] = {}
+        self.by_trigram: Dict[str, List[str]] = defaultdict(list)
+        for word in self.words:
+            grams = trigrams(word)
+            self.trigram_counts[word] = len(grams)
+            for gram in grams:
+                self.by_trigram[gram].append(word)
+
+    def _candidates(self, term: str, prefix: bool) -> Dict[str, float]:
+        """Indexed words matching ``term``, with their similarity to it."""
+        found = {}
+        if term in self.postings:
+            found[term] = 1.0
+
+        if prefix:
+            start = bisect.bisect_left(self.words, term)
+            for word in self.words[start:]:
+                if not word.startswith(term):
+                    break
+                if word != term:
+                    found[word] = 0.5 + 0.5 * len(term) / len(word)
+
+        if len(term) >= 3:
+            grams = trigrams(term)
+            shared = defaultdict(int)
+            for gram in grams:
+                for word in self.by_trigram.get(gram, ()):
+                    shared[word] += 1
+            for word, count in shared.items():
+                similarity = count / (len(grams) + self.trigram_counts[word] - count)
+                if similarity >= SEARCH_SIMILARITY_THRESHOLD:
+                    found[word] = max(found.get(word, 0.0), similarity)
+        return found
+
+    def search(self, query: str, prefix: bool = False) -> List[Tuple[int, float]]:
+        """``(service_id, score)`` of matching services, best first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores = None
+        for position, term in enumerate(terms):
+            last = position == len(terms) - 1
+            term_scores: Dict[int, float] = {}
+            for word, similarity in self._candidates(term, prefix and last).items():
+                for service_id, weight in self.postings[word].items():
+                    score = similarity * weight
+                    if score > term_scores.get(service_id, 0.0):
+                        term_scores[service_id] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    service_id: score + term_scores[service_id]
+                    for service_id, score in scores.items()
+                    if service_id in term_scores
+                }
+            if not scores:
+                return []
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def fulltext_query(query: str, prefix: bool = False) -> str:
+    """MySQL boolean-mode query requiring every word of ``query``."""
+    terms = tokenize(query)
+    return " ".join(
+        f"+{term}*" if prefix and i == len(terms) - 1 else f"+{term}"
+        for i, term in enumerate(terms)
+    )
+
+
+async def fulltext_search(
+    db: AsyncSession, query: str, prefix: bool = False
+) -> List[Tuple[int, float]]:
+    """``TrigramIndex.search`` served by the FULLTEXT index on MySQL."""
+    against = fulltext_query(query, prefix)
+    if not against:
+        return []
+
+    relevance = match(Service.name, Service.description, against=against)
+    relevance = relevance.in_boolean_mode()
+    result = await db.execute(
+        select(Service.service_id, relevance)
+        .where(relevance > 0)
+        .order_by(relevance.desc(), Service.service_id)
+        .limit(FULLTEXT_MAX_RESULTS)
+    )
+    return [(service_id, float(score)) for service_id, score in result.all()]
+
+
+class ServiceSearch:
+    """
+    Service search over the catalog snapshot. The trigram index is built on
+    first use after each catalog change. On MySQL, the FULLTEXT index is
+    asked first, and the trigram index only covers queries it finds
+    nothing for, such as misspelt words.
+    """
+
+    def __init__(self, backend: str = SERVICE_SEARCH_BACKEND):
+        self.backend = backend
+        self._digest: Optional[str] = None
+        self._index: Optional[TrigramIndex] = None
+
+    def index_for(self, snapshot) -> TrigramIndex:
+        if self._index is None or self._digest != snapshot.digest:
+            self._index = TrigramIndex(
+                (service.service_id, service.name, service.description)
+                for service in snapshot.services
+            )
+            self._digest = snapshot.digest
+        return self._index
+
+    def uses_fulltext(self, db: AsyncSession) -> bool:
+        if self.backend == "auto":
+            return db.bind.dialect.name == "mysql"
+        return self.backend == "fulltext"
+
+    async def search(
+        self, db: AsyncSession, snapshot, query: str, prefix: bool = False
+    ) -> List[Tuple[int, float]]:
+        if self.uses_fulltext(db):
+            hits = await fulltext_search(db, query, prefix)
+            if hits:
+                return hits
+        return self.index_for(snapshot).search(query, prefix)
+
+
+service_search = ServiceSearch()
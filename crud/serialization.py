@@ -0,0 +1,82 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import List, Optional, Sequence, Type, TypeVar
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row, inspect
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        # Field values as stored; response schemas use no aliases, excluded
+        # fields or custom serializers, so this matches model_dump().
+        return value.__dict__
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """JSON for plain values, response models, enums, dates and Decimals."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson response that also encodes response models directly. It is the
+    app's default response class, and handlers return it through
+    ``json_response`` to skip FastAPI's response_model pass.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def response_models(model: Type[M], objects: Sequence) -> List[M]:
+    """
+    Build ``model`` for each ORM object or row in one validation pass
+    (``from_attributes``) instead of copying fields one by one.
+    """
+    adapter = _list_adapter(model)
+    if objects and isinstance(objects[0], Row):
+        # Attribute access on a Row is slower than on an ORM object; plain
+        # dicts are the cheapest input to validate.
+        fields = objects[0]._fields
+        return adapter.validate_python(dict(zip(fields, row)) for row in objects)
+    return adapter.validate_python(objects, from_attributes=True)
+
+
+def response_columns(entity, model: Type[BaseModel]) -> list:
+    """
+    The columns of ``entity`` that ``model`` reads. Selecting them instead of
+    the entity yields plain Row tuples: no identity map, no instance state,
+    and no unused columns (such as password hashes) fetched.
+    """
+    mapped = inspect(entity).column_attrs
+    return [getattr(entity, name) for name in model.model_fields if name in mapped]
+
+
+def json_response(
+    content, response: Optional[Response] = None, status_code: int = 200
+) -> FastJSONResponse:
+    """
+    Response for already-built models. FastAPI passes a returned response
+    through untouched, so the models are not dumped, validated against
+    ``response_model`` and re-encoded once more; ``response_model`` then
+    only documents the route. Headers set on the handler's injected
+    ``response`` are carried over, as FastAPI would do.
+    """
+    result = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
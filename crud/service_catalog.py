@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Callable, List, Mapping, NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from crud.serialization import response_columns, response_models
+from crud.shared_state import SharedState, shared_state
+from models.services import Service
+from schemas.services import ServiceResponse
+
+
+class CatalogSnapshot(NamedTuple):
+    """The whole service catalog at one version; never modified once built."""
+
+    version: int
+    services: tuple
+    keys: tuple
+    by_id: Mapping[int, ServiceResponse]
+    digest: str
+
+
+class CatalogBroker:
+    """
+    Interface for delivering catalog invalidations to every worker process
+    (e.g. Redis pub/sub). Subscribers are called with the publisher's id.
+    """
+
+    def subscribe(self, callback: Callable[[str], None]):
+        raise NotImplementedError
+
+    async def publish(self, origin: str):
+        raise NotImplementedError
+
+
+class LocalCatalogBroker(CatalogBroker):
+    """In-process broker, standing in for a shared one within a single process."""
+
+    def __init__(self):
+        self.subscribers: List[Callable[[str], None]] = []
+
+    def subscribe(self, callback: Callable[[str], None]):
+        self.subscribers.append(callback)
+
+    async def publish(self, origin: str):
+        for callback in list(self.subscribers):
+            callback(origin)
+
+
+class SharedStateCatalogBroker(CatalogBroker):
+    """Broker between the worker processes of one host, through SharedState."""
+
+    SLOT = "service_catalog"
+
+    def __init__(self, state: SharedState):
+        self.state = state
+
+    def subscribe(self, callback: Callable[[str], None]):
+        self.state.subscribe(self.SLOT, lambda: callback(self.SLOT))
+
+    async def publish(self, origin: str):
+        self.state.publish(self.SLOT)
+
+
+class ServiceCatalog:
+    """
+    Read-through cache of the service catalog.
+
+    Readers get the current immutable snapshot without touching the database.
+    Writers bump the version after committing, which makes the next reader
+    load a fresh snapshot and swap it in; other processes are told through
+    the broker to do the same.
+    """
+
+    def __init__(self, broker: Optional[CatalogBroker] = None):
+        self.broker = broker or LocalCatalogBroker()
+        self.version = 0
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.hits = 0
+        self.reloads = 0
+        self._id = f"{id(self):x}"
+        self._lock = asyncio.Lock()
+        self.broker.subscribe(self._on_invalidate)
+
+    def _on_invalidate(self, origin: str):
+        if origin != self._id:
+            self.version += 1
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            self.hits += 1
+            return snapshot
+
+        async with self._lock:
+            if self.snapshot is None or self.snapshot.version != self.version:
+                self.snapshot = await self._load(db, self.version)
+                self.reloads += 1
+            return self.snapshot
+
+    async def _load(self, db: AsyncSession, version: int) -> CatalogSnapshot:
+        query = select(*response_columns(Service, ServiceResponse))
+        result = await db.execute(query.order_by(Service.service_id))
+        services = tuple(response_models(ServiceResponse, result.all()))
+        raw = json.dumps([service.model_dump(mode="json") for service in services])
+        return CatalogSnapshot(
+            version=version,
+            services=services,
+            keys=tuple((service.service_id,) for service in services),
+            by_id=MappingProxyType(
+                {service.service_id: service for service in services}
+            ),
+            digest=hashlib.sha1(raw.encode("utf-8")).hexdigest(),
+        )
+
+    async def invalidate(self):
+        """Call after committing a catalog change."""
+        self.version += 1
+        await self.broker.publish(self._id)
+
+    def clear(self):
+        """Drop the local snapshot without notifying other processes."""
+        self.snapshot = None
+
+    def etag(self, snapshot: CatalogSnapshot, variant: str = "") -> str:
+        """ETag of a response built from ``snapshot`` for the given query."""
+        if not variant:
+            return f'"{snapshot.digest}"'
+        suffix = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:12]
+        return f'"{snapshot.digest}-{suffix}"'
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.reloads
+        return {
+            "version": self.version,
+            "services": len(self.snapshot.services) if self.snapshot else 0,
+            "hits": self.hits,
+            "reloads": self.reloads,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+service_catalog = ServiceCatalog(
+    SharedStateCatalogBroker(shared_state) if shared_state.shared else None
+)
@@ -1,15 +1,25 @@
-from typing import List
+from typing import List, Union
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
 
 from database import get_async_db
 from models.services import Service
-from schemas.services import ServiceCreate, ServiceResponse, ServiceUpdate
+from schemas.services import (
+    ServiceCreate,
+    ServiceResponse,
+    ServiceSuggestion,
+    ServiceUpdate,
+)
 from models.user import User, UserRole
+from crud.http_cache import not_modified
+from crud.pagination import Page, PageParams, page_response, paginate_sorted
+from crud.search import RANKED_ORDER, service_search
+from crud.serialization import json_response
+from crud.service_catalog import service_catalog
 from crud.user import get_current_user
 
 router = APIRouter(prefix="/services", tags=["services"])
@@ -48,6 +58,7 @@ async def create_service(
     db.add(new_service)
     await db.commit()
     await db.refresh(new_service)
+    await service_catalog.invalidate()
 
     return ServiceResponse(
         service_id=new_service.service_id,
@@ -58,44 +69,113 @@ async def create_service(
     )
 
 
-@router.get("/", response_model=List[ServiceResponse])
-async def read_services(db: AsyncSession = Depends(get_async_db)):
+@router.get("/", response_model=Union[Page[ServiceResponse], List[ServiceResponse]])
+async def read_services(
+    request: Request,
+    response: Response,
+    pagination: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
 
     """Fetches a list of all available services."""
 
-    query = select(Service)
-    result = await db.execute(query)
-    services = result.scalars().all()
+    catalog = await service_catalog.get(db)
+    etag = service_catalog.etag(catalog, request.url.query)
+    cached = not_modified(request, etag, {})
+    if cached is not None:
+        return cached
 
-    return [
-        ServiceResponse(
-            service_id=service.service_id,
-            name=service.name,
-            description=service.description,
-            price=service.price,
-            duration=service.duration,
+    items, next_cursor = paginate_sorted(
+        catalog.services, catalog.keys, pagination, [Service.service_id]
+    )
+    response.headers["ETag"] = etag
+    return page_response(items, next_cursor, pagination, response)
+
+
+@router.get(
+    "/search", response_model=Union[Page[ServiceResponse], List[ServiceResponse]]
+)
+async def search_services(
+    request: Request,
+    response: Response,
+    name: str = None,
+    min_price: Decimal = None,
+    max_price: Decimal = None,
+    pagination: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+
+    """
+    Searches for services by name and/or price range. ``name`` is matched
+    against service names and descriptions, tolerating typos, and results
+    are ranked by relevance.
+    """
+
+    catalog = await service_catalog.get(db)
+    etag = service_catalog.etag(catalog, request.url.query)
+    cached = not_modified(request, etag, {})
+    if cached is not None:
+        return cached
+
+    def in_price_range(service):
+        return (min_price is None or service.price >= min_price) and (
+            max_price is None or service.price <= max_price
         )
-        for service in services
+
+    if name:
+        hits = await service_search.search(db, catalog, name)
+        matches = [
+            (catalog.by_id[service_id], (-score, service_id))
+            for service_id, score in hits
+            if service_id in catalog.by_id and in_price_range(catalog.by_id[service_id])
+        ]
+        order_by = RANKED_ORDER
+    else:
+        matches = [
+            (service, key)
+            for service, key in zip(catalog.services, catalog.keys)
+            if in_price_range(service)
+        ]
+        order_by = [Service.service_id]
+
+    items, next_cursor = paginate_sorted(
+        [service for service, _ in matches],
+        [key for _, key in matches],
+        pagination,
+        order_by,
+    )
+    response.headers["ETag"] = etag
+    return page_response(items, next_cursor, pagination, response)
+
+
+@router.get("/autocomplete", response_model=List[ServiceSuggestion])
+async def autocomplete_services(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+):
+
+    """Suggests services for a partly typed name, the last word as a prefix."""
+
+    catalog = await service_catalog.get(db)
+    hits = await service_search.search(db, catalog, q, prefix=True)
+    return [
+        ServiceSuggestion(service_id=service_id, name=catalog.by_id[service_id].name)
+        for service_id, _ in hits[:limit]
+        if service_id in catalog.by_id
     ]
 
 
 @router.get("/{service_id}", response_model=ServiceResponse)
 async def read_service(service_id: int, db: AsyncSession = Depends(get_async_db)):
 
-    query = select(Service).where(Service.service_id == service_id)
-    result = await db.execute(query)
-    service = result.scalar_one_or_none()
+    catalog = await service_catalog.get(db)
+    service = catalog.by_id.get(service_id)
 
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
 
-    return ServiceResponse(
-        service_id=service.service_id,
-        name=service.name,
-        description=service.description,
-        price=service.price,
-        duration=service.duration,
-    )
+    return json_response(service)
 
 
 @router.put("/{service_id}", response_model=ServiceResponse)
@@ -135,6 +215,7 @@ async def update_service(
     )
     await db.execute(query)
     await db.commit()
+    await service_catalog.invalidate()
 
     query = select(Service).where(Service.service_id == service_id)
     result = await db.execute(query)
@@ -171,41 +252,7 @@ async def delete_service(
     query = delete(Service).where(Service.service_id == service_id)
     result = await db.execute(query)
     await db.commit()
+    await service_catalog.invalidate()
 
     return {"detail": "Service deleted successfully"}
 
-
-@router.get("/search", response_model=List[ServiceResponse])
-async def search_services(
-    name: str = None,
-    min_price: Decimal = None,
-    max_price: Decimal = None,
-    db: AsyncSession = Depends(get_async_db),
-):
-
-    """Searches for services by name and/or price range."""
-
-    query = select(Service)
-
-    if name:
-        query = query.where(Service.name.ilike(f"%{name}%"))
-
-    if min_price is not None:
-        query = query.where(Service.price >= min_price)
-
-    if max_price is not None:
-        query = query.where(Service.price <= max_price)
-
-    result = await db.execute(query)
-    services = result.scalars().all()
-
-    return [
-        ServiceResponse(
-            service_id=service.service_id,
-            name=service.name,
-            description=service.description,
-            price=service.price,
-            duration=service.duration,
-        )
-        for service in services
-    ]
@@ -0,0 +1,178 @@
+import asyncio
+import fcntl
+import logging
+import mmap
+import os
+import struct
+from collections import defaultdict
+from contextlib import asynccontextmanager, suppress
+from typing import Callable, Dict, List, Optional
+
+from settings import settings
+
+
+# File shared by the worker processes of one host; set by serve.py. Without
+# it every process only sees its own changes.
+SHARED_STATE_PATH = settings.get("SHARED_STATE_PATH")
+# How often a worker checks for changes published by the other workers.
+SHARED_STATE_POLL_INTERVAL = settings.get_float("SHARED_STATE_POLL_INTERVAL", 0.5)
+
+# One 8-byte change counter per slot, at the start of the file.
+SLOTS = ("service_catalog", "identity_cache", "availability")
+COUNTER = struct.Struct("<Q")
+SIZE = COUNTER.size * len(SLOTS)
+# Locks are byte ranges past the counters; a lock never touches file data.
+LOCK_OFFSET = 1 << 20
+
+logger = logging.getLogger(__name__)
+
+
+def create_state_file(path: str):
+    """Create (or reset) the file ``path`` for SharedState; done by the launcher."""
+    with open(path, "wb") as f:
+        f.write(b"\0" * SIZE)
+
+
+class SharedState:
+    """
+    Change counters and locks shared by the worker processes of one host,
+    through a memory-mapped file and POSIX record locks.
+
+    A component publishes a slot after changing data that other workers
+    cache; each worker polls the counters and calls the slot's subscribers
+    when another process moved it. Without a file, counters are private to
+    the process and locks only exclude other coroutines.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._fd = None
+        if path is not None:
+            self._fd = os.open(path, os.O_RDWR)
+            self._buffer = mmap.mmap(self._fd, SIZE)
+        else:
+            self._buffer = bytearray(SIZE)
+        self._seen = [0] * len(SLOTS)
+        self._subscribers: Dict[str, List[Callable[[], None]]] = defaultdict(list)
+        self._locks = defaultdict(asyncio.Lock)
+        self.foreign_changes = 0
+
+    @property
+    def shared(self) -> bool:
+        return self._fd is not None
+
+    def _slot_lock(self, index: int, operation: int):
+        if self._fd is not None:
+            fcntl.lockf(self._fd, operation, COUNTER.size, index * COUNTER.size)
+
+    def subscribe(self, slot: str, callback: Callable[[], None]):
+        """Call ``callback`` whenever another process publishes ``slot``."""
+        SLOTS.index(slot)
+        self._subscribers[slot].append(callback)
+
+    def publish(self, slot: str):
+        index = SLOTS.index(slot)
+        offset = index * COUNTER.size
+        self._slot_lock(index, fcntl.LOCK_EX)
+        try:
+            (value,) = COUNTER.unpack_from(self._buffer, offset)
+            COUNTER.pack_into(self._buffer, offset, value + 1)
+        finally:
+            self._slot_lock(index, fcntl.LOCK_UN)
+        foreign = value != self._seen[index]
+        self._seen[index] = value + 1
+        if foreign:
+            self._notify(slot)
+
+    def check(self, slot: str) -> bool:
+        """Run the subscribers of ``slot`` if another process published it."""
+        index = SLOTS.index(slot)
+        (value,) = COUNTER.unpack_from(self._buffer, index * COUNTER.size)
+        if value == self._seen[index]:
+            return False
+        self._seen[index] = value
+        self._notify(slot)
+        return True
+
+    def _notify(self, slot: str):
+        self.foreign_changes += 1
+        for callback in self._subscribers[slot]:
+            callback()
+
+    async def watch(self, interval: float = SHARED_STATE_POLL_INTERVAL):
+        """Check every slot each ``interval`` seconds. Runs until cancelled."""
+        while True:
+            for slot in SLOTS:
+                self.check(slot)
+            await asyncio.sleep(interval)
+
+    @asynccontextmanager
+    async def lock(self, key: int):
+        """
+        Exclusive lock on ``key`` across coroutines and worker processes.
+        Contended process locks are waited for in a thread.
+        """
+        async with self._locks[key]:
+            if self._fd is None:
+                yield
+                return
+            offset = LOCK_OFFSET + key
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, offset)
+            except OSError:
+                await self._wait_for_lock(offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, offset)
+
+    async def _wait_for_lock(self, offset: int):
+        """
+        Block in a thread until the process lock at ``offset`` is ours. The
+        thread cannot be interrupted: if the caller is cancelled, it still
+        takes the lock, so wait for it and give the lock back before letting
+        the cancellation through. Until then the key's in-process lock stays
+        held, as a lock taken by this process would not block its own
+        coroutines.
+        """
+        waiter = asyncio.ensure_future(
+            asyncio.to_thread(fcntl.lockf, self._fd, fcntl.LOCK_EX, 1, offset)
+        )
+        try:
+            await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            while not waiter.done():
+                with suppress(asyncio.CancelledError):
+                    await asyncio.shield(waiter)
+            if waiter.exception() is None:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, offset)
+            raise
+
+    def try_hold(self, key: int) -> bool:
+        """
+        Take the lock on ``key`` for the rest of the process's life, if free.
+        The OS releases it when the process exits, so another worker can
+        take over; used to run singleton jobs in one worker only.
+        """
+        if self._fd is None:
+            return True
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, LOCK_OFFSET + key)
+        except OSError:
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "shared": self.shared,
+            "foreign_changes": self.foreign_changes,
+            **{
+                f"{slot}_version": COUNTER.unpack_from(
+                    self._buffer, index * COUNTER.size
+                )[0]
+                for index, slot in enumerate(SLOTS)
+            },
+        }
+
+
+shared_state = SharedState(SHARED_STATE_PATH)
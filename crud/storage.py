@@ -0,0 +1,240 @@
+import asyncio
+import glob
+import hashlib
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from typing import List, NamedTuple
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.document_blob import DocumentBlob
+from settings import settings
+
+
+# Bytes read from the upload, hashed and written per step.
+UPLOAD_CHUNK_SIZE = settings.get_int("UPLOAD_CHUNK_SIZE", 1024 * 1024)
+MAX_UPLOAD_SIZE = settings.get_int("MAX_UPLOAD_SIZE", 50 * 1024 * 1024)
+# Allowance for multipart boundaries and form fields around the file itself.
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class StoredFile(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File is larger than {MAX_UPLOAD_SIZE} bytes",
+    )
+
+
+def _write_chunk(out, digest, chunk: bytes):
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _finish(out):
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload(file: UploadFile, directory: str, filename: str) -> StoredFile:
+    """
+    Stream ``file`` into ``directory/filename`` chunk by chunk.
+
+    The data goes to a temporary file in the same directory, with hashing and
+    disk writes run in worker threads, and is renamed into place only once
+    complete, so readers never see a partial file. Raises 413 as soon as the
+    upload exceeds MAX_UPLOAD_SIZE.
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+        raise _too_large()
+
+    fd, temp_path = await asyncio.to_thread(
+        tempfile.mkstemp, dir=directory, prefix=".upload-", suffix=".part"
+    )
+    out = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_SIZE:
+                raise _too_large()
+            await asyncio.to_thread(_write_chunk, out, digest, chunk)
+
+        await asyncio.to_thread(_finish, out)
+        path = os.path.join(directory, filename)
+        await asyncio.to_thread(os.replace, temp_path, path)
+    except BaseException:
+        out.close()
+        await asyncio.to_thread(_remove, temp_path)
+        raise
+
+    return StoredFile(path=path, size=size, sha256=digest.hexdigest())
+
+
+def _remove_with_sidecars(path: str):
+    """Remove a stored file and the files derived from it (``<path>.*``)."""
+    for sidecar in glob.glob(glob.escape(path) + ".*"):
+        _remove(sidecar)
+    _remove(path)
+
+
+def _place(source: str, destination: str):
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    os.replace(source, destination)
+
+
+def _reference(db: AsyncSession, sha256: str, size: int):
+    """INSERT of a blob row with one reference, or +1 if it already exists."""
+    values = {
+        "sha256": sha256,
+        "size": size,
+        "ref_count": 1,
+        "created_at": datetime.now(),
+    }
+    if db.bind.dialect.name == "mysql":
+        statement = mysql_insert(DocumentBlob).values(values)
+        return statement.on_duplicate_key_update(ref_count=DocumentBlob.ref_count + 1)
+    statement = sqlite_insert(DocumentBlob).values(values)
+    return statement.on_conflict_do_update(
+        index_elements=[DocumentBlob.sha256],
+        set_={"ref_count": DocumentBlob.ref_count + 1},
+    )
+
+
+class ContentStore:
+    """
+    Content-addressed file store. Each distinct content is kept once, at
+    ``root/ab/cd/<sha256>``, with the number of documents using it counted in
+    a DocumentBlob row. Files derived from it (previews) sit next to it as
+    ``<sha256>.*`` and are removed together with it.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    async def add(self, db: AsyncSession, file: UploadFile) -> StoredFile:
+        """
+        Store an upload, or reuse identical stored content, and take a
+        reference to it in the caller's transaction.
+
+        The reference is taken with a single insert-or-increment, so two
+        first uploads of the same content both succeed instead of racing to
+        insert the blob row.
+        """
+        incoming = os.path.join(self.root, ".incoming")
+        await asyncio.to_thread(os.makedirs, incoming, exist_ok=True)
+        upload = await save_upload(file, incoming, uuid.uuid4().hex)
+
+        path = self.path_for(upload.sha256)
+        try:
+            await db.execute(_reference(db, upload.sha256, upload.size))
+            # The row is now locked until commit, so no purge of this content
+            # runs between the check and the placement.
+            if await asyncio.to_thread(os.path.exists, path):
+                await asyncio.to_thread(_remove, upload.path)
+            else:
+                await asyncio.to_thread(_place, upload.path, path)
+        except BaseException:
+            await asyncio.to_thread(_remove, upload.path)
+            raise
+
+        return StoredFile(path=path, size=upload.size, sha256=upload.sha256)
+
+    async def release(self, db: AsyncSession, document) -> List[str]:
+        """
+        Drop the reference ``document`` holds, in the caller's transaction.
+
+        Nothing is deleted yet: returns the files to pass to ``purge`` once
+        that transaction has committed, so a failed commit leaves the
+        document's file in place. That is the content when this was its last
+        reference, or the document's own file if it predates the store.
+        """
+        blob = None
+        if document.sha256 is not None:
+            blob = await db.get(
+                DocumentBlob,
+                document.sha256,
+                with_for_update=True,
+                populate_existing=True,
+            )
+        if blob is None:
+            return [document.file_path]
+
+        blob.ref_count -= 1
+        return [self.path_for(blob.sha256)] if blob.ref_count <= 0 else []
+
+    async def purge(self, db: AsyncSession, paths: List[str]):
+        """
+        Delete files returned by ``release`` after the caller committed.
+
+        Stored content goes together with its blob row, and only while that
+        row still has no references: an upload of the same content committed
+        in the meantime has taken it back. The row lock is held until the
+        file is gone, so a concurrent upload waits and then stores it anew.
+        """
+        for path in paths:
+            sha256 = os.path.basename(path)
+            if path == self.path_for(sha256):
+                result = await db.execute(
+                    delete(DocumentBlob).where(
+                        DocumentBlob.sha256 == sha256, DocumentBlob.ref_count <= 0
+                    )
+                )
+                if result.rowcount:
+                    await asyncio.to_thread(_remove_with_sidecars, path)
+                await db.commit()
+            else:
+                await asyncio.to_thread(_remove_with_sidecars, path)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects multipart requests whose declared Content-Length is over the
+    upload limit before the body is read and spooled to disk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            content_type = headers.get(b"content-type", b"")
+            content_length = headers.get(b"content-length", b"")
+            if (
+                content_type.startswith(b"multipart/form-data")
+                and content_length.isdigit()
+                and int(content_length) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD
+            ):
+                response = JSONResponse(
+                    {"detail": _too_large().detail},
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
@@ -1,8 +1,7 @@
-import bcrypt
 import jwt
 from datetime import datetime, timedelta
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -14,6 +13,10 @@ from crud.auth_config import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     create_access_token,
 )
+from crud.identity_cache import identity_cache, identity_snapshot
+from crud.pagination import Page, PageParams, page_response, paginate
+from crud.serialization import response_columns
+from crud.password_hashing import hash_password, needs_rehash, verify_password
 from database import get_async_db
 from schemas.user import UserCreate, UserResponse, UserLogin, UserBase
 from models.user import User, UserRole
@@ -40,6 +43,10 @@ async def get_current_user(
     except jwt.PyJWTError:
         raise credentials_exception
 
+    cached = await identity_cache.get("user", user_id)
+    if cached is not None:
+        return User(**cached)
+
     query = select(User).where(User.user_id == user_id)
     result = await db.execute(query)
     user = result.scalar_one_or_none()
@@ -47,6 +54,8 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
 
+    await identity_cache.set("user", user_id, identity_snapshot(user))
+
     return user
 
 
@@ -61,11 +70,11 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_d
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
-    hashed_password = bcrypt.hashpw(user.password.encode("utf-8"), bcrypt.gensalt())
+    hashed_password = await hash_password(user.password)
     new_user = User(
         name=user.name,
         email=user.email,
-        password=hashed_password.decode("utf-8"),
+        password=hashed_password,
         role=user.role,
     )
 
@@ -89,14 +98,16 @@ async def login(user_login: UserLogin, db: AsyncSession = Depends(get_async_db))
     result = await db.execute(query)
     user = result.scalar_one_or_none()
 
-    if not user or not bcrypt.checkpw(
-        user_login.password.encode("utf-8"), user.password.encode("utf-8")
-    ):
+    if not user or not await verify_password(user_login.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
 
+    if needs_rehash(user.password):
+        user.password = await hash_password(user_login.password)
+        await db.commit()
+
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user.user_id)}, expires_delta=access_token_expires
@@ -117,8 +128,10 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
     )
 
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=Union[Page[UserResponse], List[UserResponse]])
 async def read_users(
+    response: Response,
+    pagination: PageParams = Depends(),
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -126,11 +139,10 @@ async def read_users(
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    query = select(User)
-    result = await db.execute(query)
-    users = result.scalars().all()
+    query = select(*response_columns(User, UserResponse))
+    users, next_cursor = await paginate(db, query, pagination, [User.user_id])
 
-    return [
+    items = [
         UserResponse(
             user_id=user.user_id,
             name=user.name,
@@ -140,6 +152,7 @@ async def read_users(
         )
         for user in users
     ]
+    return page_response(items, next_cursor, pagination, response)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -161,6 +174,7 @@ async def update_user(
 
     result = await db.execute(query)
     await db.commit()
+    await identity_cache.invalidate("user", user_id)
 
     query = select(User).where(User.user_id == user_id)
     result = await db.execute(query)
@@ -191,6 +205,7 @@ async def delete_user(
     query = delete(User).where(User.user_id == user_id)
     result = await db.execute(query)
     await db.commit()
+    await identity_cache.invalidate("user", user_id)
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="User not found")
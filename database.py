@@ -1,27 +1,337 @@
-import os
+import time
+import weakref
+from collections import Counter
+from contextvars import ContextVar
+from threading import Lock
+from typing import Optional
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import declarative_base
-from dotenv import load_dotenv
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, StaticPool
 
+from settings import settings
 
-load_dotenv()
 
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-DB_NAME = os.getenv("DB_NAME")
+DB_USER = settings.get("DB_USER")
+DB_PASSWORD = settings.get("DB_PASSWORD")
+DB_HOST = settings.get("DB_HOST")
+DB_PORT = settings.get("DB_PORT")
+DB_NAME = settings.get("DB_NAME")
+DB_PROFILE = settings.get("DB_PROFILE", "dev")
 
-SQLALCHEMY_DATABASE_URL = (
+SQLALCHEMY_DATABASE_URL = settings.get("DATABASE_URL") or (
     f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, future=True, echo=True)
+ENGINE_PROFILES = {
+    "dev": {
+        "echo": True,
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+        "statement_timeout_ms": None,
+    },
+    "test": {
+        "echo": False,
+        "pool_size": 2,
+        "max_overflow": 0,
+        "pool_timeout": 5,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+        "statement_timeout_ms": None,
+    },
+    "prod": {
+        "echo": False,
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_timeout_ms": 5000,
+    },
+}
+
+# Individual profile values can be overridden from the environment,
+# e.g. DB_POOL_SIZE=50 on a bigger instance without defining a new profile.
+ENV_OVERRIDES = {
+    "echo": ("DB_ECHO", lambda v: v.lower() in ("1", "true", "yes")),
+    "pool_size": ("DB_POOL_SIZE", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", int),
+    "pool_timeout": ("DB_POOL_TIMEOUT", float),
+    "pool_recycle": ("DB_POOL_RECYCLE", int),
+    "pool_pre_ping": ("DB_POOL_PRE_PING", lambda v: v.lower() in ("1", "true", "yes")),
+    "statement_timeout_ms": ("DB_STATEMENT_TIMEOUT_MS", int),
+}
+
+# Profile name and pool metrics of every engine created by build_engine().
+_engine_registry = weakref.WeakKeyDictionary()
+
+
+class PoolMetrics:
+    """Checkout counters and wait times for one connection pool."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_count": self.wait_count,
+                "wait_avg_ms": (
+                    self.wait_total / self.wait_count * 1000 if self.wait_count else 0.0
+                ),
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that measures how long checkouts wait for a connection.
+
+    Only checkouts that have to block are counted as waits: nothing checked
+    in and no overflow left to open another connection. Immediate hits and
+    new connections are not contention.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _must_wait(self) -> bool:
+        return (
+            self.checkedin() == 0
+            and self._max_overflow > -1
+            and self.overflow() >= self._max_overflow
+        )
+
+    def connect(self):
+        if not self._must_wait():
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.increment("timeouts")
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class QueryStats:
+    """SQL statements run on behalf of one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.statements = Counter()
+
+    def record(self, statement: str, seconds: float, rows: int):
+        self.queries += 1
+        self.db_time += seconds
+        self.rows += rows
+        self.statements[statement] += 1
+
+    def most_repeated(self) -> tuple:
+        """The statement run most often and how many times, e.g. an N+1 loop."""
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+# Set by QueryStatsMiddleware for the duration of each request.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _rows_fetched(cursor) -> int:
+    """
+    Rows returned by the statement just run on ``cursor``.
+
+    This relies on an adapter detail: SQLAlchemy's aiomysql and aiosqlite
+    cursor adapters read the whole result into ``_rows`` on execute
+    (tests/test_query_stats.py checks both). Cursors without that buffer
+    fall back to the DB-API ``rowcount``, which MySQL drivers set for
+    buffered SELECTs. Server-side (streamed) results are not counted.
+    """
+    if cursor.description is None:
+        return 0
+    rows = getattr(cursor, "_rows", None)
+    if rows is not None:
+        return len(rows)
+    return max(cursor.rowcount, 0)
+
+
+def get_profile_settings(profile: str) -> dict:
+    """
+    Resolve a named engine profile with environment overrides applied.
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(
+            f"Unknown DB profile '{profile}'. "
+            f"Available profiles: {', '.join(ENGINE_PROFILES)}"
+        )
+
+    resolved = dict(ENGINE_PROFILES[profile])
+    for key, (env_name, cast) in ENV_OVERRIDES.items():
+        value = settings.get(env_name)
+        if value not in (None, ""):
+            resolved[key] = cast(value)
+    return resolved
+
+
+def _attach_pool_events(engine: AsyncEngine, metrics: PoolMetrics):
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.increment("connects")
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("checkouts")
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.increment("checkins")
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+
+def _attach_query_events(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and current_query_stats.get() is not None:
+            context.query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_query_stats.get()
+        started = getattr(context, "query_started", None)
+        if stats is not None and started is not None:
+            stats.record(
+                statement, time.perf_counter() - started, _rows_fetched(cursor)
+            )
+
+
+def _attach_statement_timeout(engine: AsyncEngine, timeout_ms: int):
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET SESSION MAX_EXECUTION_TIME={int(timeout_ms)}")
+        cursor.close()
+
+
+def build_engine(
+    profile: Optional[str] = None, url: Optional[str] = None
+) -> AsyncEngine:
+    """
+    Create an async engine configured from a named profile (dev, test, prod).
+    """
+    profile_settings = get_profile_settings(profile or DB_PROFILE)
+    url = url or SQLALCHEMY_DATABASE_URL
+    metrics = PoolMetrics()
+
+    engine_kwargs = {"future": True, "echo": profile_settings["echo"]}
+
+    if url.startswith("sqlite") and (":memory:" in url or url.endswith("://")):
+        # An in-memory SQLite database lives inside a single connection.
+        engine_kwargs["poolclass"] = StaticPool
+    elif profile_settings["pool_size"] == 0:
+        engine_kwargs["poolclass"] = NullPool
+    else:
+        engine_kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=profile_settings["pool_size"],
+            max_overflow=profile_settings["max_overflow"],
+            pool_timeout=profile_settings["pool_timeout"],
+            pool_recycle=profile_settings["pool_recycle"],
+            pool_pre_ping=profile_settings["pool_pre_ping"],
+        )
+
+    engine = create_async_engine(url, **engine_kwargs)
+    if isinstance(engine.sync_engine.pool, InstrumentedQueuePool):
+        engine.sync_engine.pool.metrics = metrics
+    _engine_registry[engine.sync_engine] = {
+        "profile": profile or DB_PROFILE,
+        "metrics": metrics,
+    }
+    _attach_pool_events(engine, metrics)
+    _attach_query_events(engine)
+
+    if profile_settings["statement_timeout_ms"] and url.startswith("mysql"):
+        _attach_statement_timeout(engine, profile_settings["statement_timeout_ms"])
+
+    return engine
+
+
+def get_pool_stats(target_engine: Optional[AsyncEngine] = None) -> dict:
+    """
+    Current pool occupancy plus the cumulative checkout/wait counters.
+    """
+    target_engine = target_engine or get_engine()
+    pool = target_engine.sync_engine.pool
+    registered = _engine_registry.get(target_engine.sync_engine, {})
+    stats = {
+        "profile": registered.get("profile"),
+        "pool_class": type(pool).__name__,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if "metrics" in registered:
+        stats.update(registered["metrics"].snapshot())
+    return stats
+
+
+# The application engine is built on first use rather than at import, so
+# importing the app (tests, tooling, workers before they fork) does not load
+# the database driver or resolve the DSN.
+_engine: Optional[AsyncEngine] = None
 
 SessionLocal = sessionmaker(
-    bind=engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
@@ -29,6 +339,42 @@ SessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+def get_engine() -> AsyncEngine:
+    """The application engine, built and bound to SessionLocal on first use."""
+    global _engine
+    if _engine is None:
+        _engine = build_engine()
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+async def start_engine():
+    """
+    Per-worker startup: forget pooled connections inherited from a parent
+    process, then open the first connection so a bad DSN fails the worker.
+    """
+    engine = get_engine()
+    await engine.dispose(close=False)
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
+
+
+async def stop_engine():
+    """Per-worker shutdown: close every pooled connection."""
+    if _engine is not None:
+        await _engine.dispose()
+
+
 async def get_async_db():
+    get_engine()
     async with SessionLocal() as session:
         yield session
+
+
+def get_session_factory():
+    """
+    Session factory for work that outlives the request-scoped session,
+    such as streaming response bodies and background jobs.
+    """
+    get_engine()
+    return SessionLocal
@@ -1,4 +1,6 @@
-import uvicorn
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -8,6 +10,43 @@ from crud.services import router as service_router
 from crud.mechanic import router as mechanic_router
 from crud.document import router as document_router
 from crud.car import router as car_router
+from crud.export import router as export_router
+from crud.email_outbox import EMAIL_WORKER_ENABLED, email_outbox
+from crud.identity_cache import identity_cache
+from crud.lifecycle import WARM_CACHES, drain, warm_caches
+from crud.metrics import MetricsMiddleware, metrics
+from crud.password_hashing import password_hasher
+from crud.previews import preview_pipeline
+from crud.query_stats import QueryStatsMiddleware
+from crud.serialization import FastJSONResponse
+from crud.service_catalog import service_catalog
+from crud.shared_state import shared_state
+from crud.storage import UploadSizeLimitMiddleware
+from crud.scheduling import AUTO_ASSIGN_INTERVAL, run_auto_assign_job
+from database import SessionLocal, get_pool_stats, start_engine, stop_engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once in every worker process.
+    await start_engine()
+    if WARM_CACHES:
+        await warm_caches(SessionLocal)
+    jobs = [asyncio.create_task(shared_state.watch())]
+    if EMAIL_WORKER_ENABLED:
+        email_outbox.start(SessionLocal)
+    if AUTO_ASSIGN_INTERVAL > 0:
+        jobs.append(asyncio.create_task(run_auto_assign_job(SessionLocal)))
+    yield
+    await drain()
+    await email_outbox.stop()
+    preview_pipeline.shutdown()
+    for job in jobs:
+        job.cancel()
+        with suppress(asyncio.CancelledError):
+            await job
+    await stop_engine()
+
 
 app = FastAPI(
     title="Car Service API",
@@ -15,8 +54,11 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
+app.add_middleware(UploadSizeLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -24,6 +66,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(user_router, prefix="/api/v1")
@@ -32,6 +76,15 @@ app.include_router(service_router, prefix="/api/v1")
 app.include_router(mechanic_router, prefix="/api/v1")
 app.include_router(document_router, prefix="/api/v1")
 app.include_router(car_router, prefix="/api/v1")
+app.include_router(export_router, prefix="/api/v1")
+
+metrics.register_stats("db_pool", get_pool_stats)
+metrics.register_stats("identity_cache", identity_cache.stats)
+metrics.register_stats("password_hasher", password_hasher.stats)
+metrics.register_stats("email_outbox", email_outbox.stats)
+metrics.register_stats("previews", preview_pipeline.stats)
+metrics.register_stats("service_catalog", service_catalog.stats)
+metrics.register_stats("shared_state", shared_state.stats)
 
 
 @app.get("/")
@@ -39,5 +92,26 @@ async def root():
     return {"message": "Welcome to Car Service API"}
 
 
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "db_pool": get_pool_stats(),
+        "identity_cache": identity_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "email_outbox": email_outbox.stats(),
+        "previews": preview_pipeline.stats(),
+        "service_catalog": service_catalog.stats(),
+        "shared_state": shared_state.stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return metrics.response()
+
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
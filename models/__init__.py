@@ -4,6 +4,19 @@ from models.appoinment import Appointment
 from models.document import Document
 from models.mechanic import Mechanic
 from models.services import Service
+from models.email_outbox import EmailOutbox
+from models.document_blob import DocumentBlob
+from models.document_preview import DocumentPreview
 
 
-__all__ = ["User", "Car", "Appointment", "Document", "Mechanic", "Service"]
+__all__ = [
+    "User",
+    "Car",
+    "Appointment",
+    "Document",
+    "Mechanic",
+    "Service",
+    "EmailOutbox",
+    "DocumentBlob",
+    "DocumentPreview",
+]
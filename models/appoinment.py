@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, Index, String
 from sqlalchemy.orm import relationship
 from database import Base
 import enum
@@ -13,6 +13,20 @@ class AppointmentStatus(enum.Enum):
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # User's and mechanic's appointment lists (keyset on date, id) and
+        # the mechanic double-booking check.
+        Index(
+            "ix_appointments_user_id_appointment_date", "user_id", "appointment_date"
+        ),
+        Index(
+            "ix_appointments_mechanic_id_appointment_date",
+            "mechanic_id",
+            "appointment_date",
+        ),
+        # Date-window scans: availability, auto-assign and export.
+        Index("ix_appointments_appointment_date_status", "appointment_date", "status"),
+    )
 
     appointment_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
@@ -21,6 +35,9 @@ class Appointment(Base):
     mechanic_id = Column(Integer, ForeignKey("mechanics.mechanic_id"), nullable=True)
     appointment_date = Column(DateTime, nullable=False)
     status = Column(Enum(AppointmentStatus), default=AppointmentStatus.PENDING)
+    # Set on rows created by one bulk request, to read their ids back after
+    # an executemany INSERT (MySQL has no RETURNING for it).
+    batch_key = Column(String(32), nullable=True, index=True)
 
     user = relationship("User", back_populates="appointments")
     car = relationship("Car", back_populates="appointments")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String
+from sqlalchemy import Column, Index, Integer, ForeignKey, String
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -6,6 +6,7 @@ from database import Base
 
 class Car(Base):
     __tablename__ = "cars"
+    __table_args__ = (Index("ix_cars_user_id_car_id", "user_id", "car_id"),)
 
     car_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum
+from sqlalchemy import BigInteger, Column, Index, Integer, String, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from database import Base
 import enum
@@ -13,10 +13,16 @@ class DocumentType(enum.Enum):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_mechanic_id_document_id", "mechanic_id", "document_id"),
+    )
 
     document_id = Column(Integer, primary_key=True, index=True)
     mechanic_id = Column(Integer, ForeignKey("mechanics.mechanic_id"), nullable=False)
     type = Column(Enum(DocumentType), nullable=False)
     file_path = Column(String(255), nullable=False)
+    filename = Column(String(255), nullable=True)
+    sha256 = Column(String(64), nullable=True)
+    size = Column(BigInteger, nullable=True)
 
     mechanic = relationship("Mechanic", back_populates="documents")
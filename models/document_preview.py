@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Enum, Integer, String
+from database import Base
+import enum
+
+
+class PreviewStatus(enum.Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+    UNSUPPORTED = "unsupported"
+
+
+class DocumentPreview(Base):
+    """Thumbnail of a stored file content, keyed like DocumentBlob by its hash."""
+
+    __tablename__ = "document_previews"
+
+    sha256 = Column(String(64), primary_key=True)
+    status = Column(Enum(PreviewStatus), nullable=False, default=PreviewStatus.PENDING)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    error = Column(String(500), nullable=True)
+    updated_at = Column(
+        DateTime, nullable=False, default=datetime.now, onupdate=datetime.now
+    )
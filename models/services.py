@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Numeric
+from sqlalchemy import Column, Index, String, Integer, Numeric
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -6,6 +6,14 @@ from database import Base
 
 class Service(Base):
     __tablename__ = "services"
+    __table_args__ = (
+        Index(
+            "ix_services_name_description_fulltext",
+            "name",
+            "description",
+            mysql_prefix="FULLTEXT",
+        ),
+    )
 
     service_id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
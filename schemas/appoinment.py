@@ -1,7 +1,8 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from decimal import Decimal
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, model_validator, ValidationError
+from typing import Dict, List, Optional
+from pydantic import BaseModel, field_validator, model_validator, ValidationError
 
 
 class AppointmentStatus(str, Enum):
@@ -11,6 +12,16 @@ class AppointmentStatus(str, Enum):
     CANCELED = "cancelled"
 
 
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Appointment dates are stored and indexed as naive UTC; an offset-aware
+    input is converted so it compares with them instead of raising.
+    """
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 class AppointmentBase(BaseModel):
     user_id: int
     car_id: int
@@ -19,6 +30,8 @@ class AppointmentBase(BaseModel):
     appointment_date: datetime
     status: AppointmentStatus = AppointmentStatus.PENDING
 
+    _naive_date = field_validator("appointment_date")(naive_utc)
+
     class Config:
         from_attributes = True
 
@@ -31,6 +44,61 @@ class AppointmentResponse(AppointmentBase):
     appointment_id: int
 
 
+class AppointmentCar(BaseModel):
+    car_id: int
+    brand: str
+    model: str
+    plate_number: str
+
+    class Config:
+        from_attributes = True
+
+
+class AppointmentService(BaseModel):
+    service_id: int
+    name: str
+    price: Decimal
+    duration: int
+
+    class Config:
+        from_attributes = True
+
+
+class AppointmentMechanic(BaseModel):
+    mechanic_id: int
+    name: str
+    position: str
+
+    class Config:
+        from_attributes = True
+
+
+class AppointmentUser(BaseModel):
+    user_id: int
+    name: str
+
+    class Config:
+        from_attributes = True
+
+
+class AppointmentDetail(AppointmentResponse):
+    car: Optional[AppointmentCar] = None
+    service: Optional[AppointmentService] = None
+    mechanic: Optional[AppointmentMechanic] = None
+    user: Optional[AppointmentUser] = None
+
+
+class BulkAppointmentError(BaseModel):
+    index: int
+    status_code: int
+    detail: str
+
+
+class BulkAppointmentResponse(BaseModel):
+    created: List[AppointmentResponse]
+    errors: List[BulkAppointmentError]
+
+
 class AppointmentUpdate(BaseModel):
     user_id: Optional[int] = None
     car_id: Optional[int] = None
@@ -38,3 +106,30 @@ class AppointmentUpdate(BaseModel):
     mechanic_id: Optional[int] = None
     appointment_date: Optional[datetime] = None
     status: Optional[AppointmentStatus] = None
+
+    _naive_date = field_validator("appointment_date")(naive_utc)
+
+
+class AvailabilitySlot(BaseModel):
+    start: datetime
+    end: datetime
+    mechanic_ids: List[int]
+
+
+class AvailabilityResponse(BaseModel):
+    day: date
+    service_id: int
+    duration: int
+    slots: List[AvailabilitySlot]
+
+
+class AutoAssignment(BaseModel):
+    appointment_id: int
+    mechanic_id: int
+
+
+class AutoAssignResponse(BaseModel):
+    dry_run: bool
+    assigned: List[AutoAssignment]
+    unassigned: List[int]
+    mechanic_load: Dict[int, int]
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -29,3 +29,15 @@ class CarResponse(CarBase):
 
     class Config:
         from_attributes = True
+
+
+class CarImportRow(BaseModel):
+    row: int
+    car_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class CarImportReport(BaseModel):
+    created: int
+    failed: int
+    rows: List[CarImportRow]
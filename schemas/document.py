@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from enum import Enum
+from typing import Optional
 
 
 class DocumentTypeEnum(str, Enum):
@@ -21,6 +22,9 @@ class DocumentCreate(DocumentBase):
 class DocumentResponse(DocumentBase):
     document_id: int
     mechanic_id: int
+    filename: Optional[str] = None
+    sha256: Optional[str] = None
+    size: Optional[int] = None
 
     class Config:
         from_attributes = True
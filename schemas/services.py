@@ -27,3 +27,8 @@ class ServiceResponse(ServiceBase):
 
     class Config:
         from_attributes = True
+
+
+class ServiceSuggestion(BaseModel):
+    service_id: int
+    name: str
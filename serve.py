@@ -0,0 +1,52 @@
+"""
+Production launcher: runs ``main:app`` in several uvicorn worker processes
+sharing one listening socket.
+
+The workers share cache invalidations and booking locks through a state file
+created here (see crud.shared_state). On SIGTERM/SIGINT each worker stops
+accepting connections, lets in-flight requests finish for up to
+``GRACEFUL_TIMEOUT`` seconds and runs the app's shutdown.
+
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import os
+import tempfile
+
+import uvicorn
+
+from crud.shared_state import create_state_file
+from settings import settings
+
+
+WEB_CONCURRENCY = settings.get_int("WEB_CONCURRENCY", os.cpu_count() or 1)
+HOST = settings.get("HOST", "0.0.0.0")
+PORT = settings.get_int("PORT", 8000)
+GRACEFUL_TIMEOUT = settings.get_int("GRACEFUL_TIMEOUT", 30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="car-service-") as tmp:
+        path = os.path.join(tmp, "shared-state")
+        create_state_file(path)
+        # Workers are spawned with a copy of this environment.
+        os.environ["SHARED_STATE_PATH"] = path
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+            proxy_headers=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
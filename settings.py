@@ -0,0 +1,42 @@
+"""
+Process configuration. The ``.env`` file next to this module is parsed once,
+on first import; variables set in the real environment take precedence over
+it and are read at lookup time, so tests and launchers can still override
+them.
+"""
+
+import os
+from typing import Optional
+
+from dotenv import dotenv_values
+
+ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+
+TRUE_VALUES = ("1", "true", "yes")
+
+
+class Settings:
+    """Environment lookups with ``.env`` values as the fallback."""
+
+    def __init__(self, env_file: Optional[str] = ENV_FILE):
+        values = (
+            dotenv_values(env_file) if env_file and os.path.isfile(env_file) else {}
+        )
+        self._file = {
+            name: value for name, value in values.items() if value is not None
+        }
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return os.environ.get(name, self._file.get(name, default))
+
+    def get_int(self, name: str, default: int) -> int:
+        return int(self.get(name, str(default)))
+
+    def get_float(self, name: str, default: float) -> float:
+        return float(self.get(name, str(default)))
+
+    def get_bool(self, name: str, default: bool) -> bool:
+        return self.get(name, str(default)).lower() in TRUE_VALUES
+
+
+settings = Settings()
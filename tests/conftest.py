@@ -2,20 +2,25 @@ from datetime import date
 
 import pytest
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
+from crud.identity_cache import identity_cache
 from crud.mechanic import get_current_mechanic
+from crud.scheduling import availability_index
+from crud.service_catalog import service_catalog
 from main import app
-from database import get_async_db, Base
+from database import get_async_db, get_session_factory, Base, build_engine
 from models.mechanic import MechanicRole, Mechanic
 from models.user import User, UserRole
 from crud.user import get_current_user
 
 
+pytest_plugins = ["tests.query_budget"]
+
 DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = build_engine("test", DATABASE_URL)
 TestingSessionLocal = sessionmaker(
     bind=engine, expire_on_commit=False, class_=AsyncSession
 )
@@ -25,6 +30,9 @@ TestingSessionLocal = sessionmaker(
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    identity_cache.clear()
+    availability_index.invalidate()
+    service_catalog.clear()
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -37,6 +45,7 @@ def override_get_async_db():
             yield session
 
     app.dependency_overrides[get_async_db] = get_db_override
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
 
 
 @pytest.fixture()
@@ -0,0 +1,52 @@
+"""
+Pytest plugin failing tests whose requests run too many SQL statements.
+
+    @pytest.mark.query_budget(3)
+    async def test_list_cars(async_client):
+        ...
+
+fails if any request made by the test runs more than three statements.
+"""
+
+import pytest
+
+from crud.query_stats import request_observers
+
+
+class QueryBudget:
+    def __init__(self, max_queries: int):
+        self.max_queries = max_queries
+        self.violations = []
+
+    def __call__(self, scope, stats, seconds):
+        if stats.queries > self.max_queries:
+            statement, repeats = stats.most_repeated()
+            self.violations.append(
+                f"{scope['method']} {scope['path']} ran {stats.queries} queries "
+                f"(budget {self.max_queries}); most repeated ({repeats}x): "
+                + " ".join(statement.split())[:200]
+            )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries): fail if a request runs more SQL statements",
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    budget = QueryBudget(marker.args[0])
+    request_observers.append(budget)
+    try:
+        result = yield
+    finally:
+        request_observers.remove(budget)
+    if budget.violations:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(budget.violations))
+    return result
@@ -0,0 +1,72 @@
+import asyncio
+from email import message_from_bytes
+
+
+class LocalSMTPServer:
+    """
+    Minimal in-process SMTP server standing in for the real mail server in
+    tests. Stores accepted messages and can be told to reject the next DATA
+    commands with a temporary failure.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.reject_next = 0
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+
+        def reply(line):
+            writer.write(f"{line}\r\n".encode())
+
+        reply("220 localhost ESMTP")
+        recipients = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            verb = line.decode().strip().split(" ")[0].upper()
+            if verb in ("EHLO", "HELO"):
+                reply("250 localhost")
+            elif verb == "MAIL":
+                recipients = []
+                reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(line.decode().strip())
+                reply("250 OK")
+            elif verb == "DATA":
+                if self.reject_next:
+                    self.reject_next -= 1
+                    reply("451 Try again later")
+                else:
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    data = b""
+                    while True:
+                        chunk = await reader.readline()
+                        if chunk in (b".\r\n", b""):
+                            break
+                        data += chunk
+                    self.messages.append(message_from_bytes(data))
+                    reply("250 OK")
+            elif verb in ("RSET", "NOOP"):
+                reply("250 OK")
+            elif verb == "QUIT":
+                reply("221 Bye")
+                await writer.drain()
+                break
+            else:
+                reply("502 Command not implemented")
+            await writer.drain()
+        writer.close()
@@ -0,0 +1,113 @@
+from datetime import date, datetime
+
+import pytest
+
+from models.appoinment import Appointment, AppointmentStatus
+from models.car import Car
+from models.mechanic import Mechanic, MechanicRole
+from models.services import Service
+from models.user import User, UserRole
+from tests.conftest import TestingSessionLocal
+
+CAR = {"car_id": 1, "brand": "Skoda", "model": "Octavia", "plate_number": "AA1234BB"}
+MECHANIC = {"mechanic_id": 1, "name": "Mechanic 1", "position": "Mechanic"}
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def appointments(init_db):
+    async with TestingSessionLocal() as session:
+        session.add(
+            User(
+                user_id=1,
+                name="Owner",
+                email="owner@example.com",
+                password="x",
+                role=UserRole.ADMIN,
+            )
+        )
+        session.add(
+            Car(
+                year=2020,
+                vin="TMBJJ7NE0L0000001",
+                user_id=1,
+                **CAR,
+            )
+        )
+        session.add(Service(service_id=1, name="Oil change", price=40, duration=60))
+        session.add(
+            Mechanic(
+                birth_date=date(1990, 1, 1),
+                login="mechanic1",
+                password="x",
+                role=MechanicRole.MECHANIC,
+                **MECHANIC,
+            )
+        )
+        for hour, mechanic_id in ((9, 1), (11, 1), (13, None)):
+            session.add(
+                Appointment(
+                    user_id=1,
+                    car_id=1,
+                    service_id=1,
+                    mechanic_id=mechanic_id,
+                    appointment_date=datetime(2030, 1, 7, hour),
+                    status=AppointmentStatus.PENDING,
+                )
+            )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(5)
+async def test_expand_embeds_related_objects(async_client):
+    response = await async_client.get(
+        "/api/v1/appointments/", params={"expand": "car,service,mechanic,user"}
+    )
+    assert response.status_code == 200
+    appointments = response.json()
+    assert len(appointments) == 3
+    for appt in appointments:
+        assert appt["car"] == CAR
+        assert appt["service"] == {
+            "service_id": 1,
+            "name": "Oil change",
+            "price": "40.00",
+            "duration": 60,
+        }
+        assert appt["user"] == {"user_id": 1, "name": "Owner"}
+    assert [appt["mechanic"] for appt in appointments] == [MECHANIC, MECHANIC, None]
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(3)
+async def test_mechanic_appointments_expand(
+    async_client, override_get_current_mechanic
+):
+    response = await async_client.get(
+        "/api/v1/mechanics/appointments", params={"expand": "car,service", "limit": 10}
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == 2
+    assert all(item["car"] == CAR for item in items)
+    assert all(item["service"]["duration"] == 60 for item in items)
+    assert "mechanic" not in items[0]
+
+    response = await async_client.get(
+        "/api/v1/mechanics/appointments", params={"limit": 10}
+    )
+    assert [set(item) for item in response.json()["items"]] == [
+        {"appointment_id", "car_id", "service_id", "appointment_date", "status"}
+    ] * 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path", ["/api/v1/appointments/", "/api/v1/mechanics/appointments"]
+)
+async def test_unknown_expand_name_is_rejected(
+    async_client, override_get_current_mechanic, path
+):
+    response = await async_client.get(path, params={"expand": "car,owner"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown expand value(s): owner"
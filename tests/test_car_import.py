@@ -0,0 +1,144 @@
+import json
+
+import pytest
+from sqlalchemy.future import select
+
+import crud.car_import
+from crud.car_import import csv_records
+from crud.user import get_current_user
+from main import app
+from models.car import Car
+from models.user import User, UserRole
+from tests.conftest import TestingSessionLocal
+
+
+def car(n: int, user_id: int = 1, **fields) -> dict:
+    return {
+        "user_id": user_id,
+        "brand": "Ford",
+        "model": "Transit",
+        "year": 2020,
+        "plate_number": f"FL{n:05d}",
+        "vin": f"WF0XXXTTGX{n:07d}",
+        **fields,
+    }
+
+
+def csv_line(fields: dict) -> str:
+    return ",".join(str(value) for value in fields.values())
+
+
+async def byte_chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.fixture(autouse=True, scope="module")
+async def users(init_db):
+    async with TestingSessionLocal() as db:
+        db.add(User(user_id=1, name="Admin", email="a@x.com", password="x"))
+        db.add(
+            User(
+                user_id=2,
+                name="Fleet",
+                email="f@x.com",
+                password="x",
+                role=UserRole.CUSTOMER,
+            )
+        )
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_csv_records_survive_arbitrary_chunking():
+    data = (
+        '\ufeffuser_id,brand,model\r\n1,Ford,"Transit, ""Custom"""\r\n'
+        '2,Skoda,"Multi\nline"\n\n3,Opel,Vivaro'
+    ).encode("utf-8")
+
+    for size in (1, 3, len(data)):
+        records = [record async for record in csv_records(byte_chunks(data, size))]
+        assert records == [
+            {"user_id": "1", "brand": "Ford", "model": 'Transit, "Custom"'},
+            {"user_id": "2", "brand": "Skoda", "model": "Multi\nline"},
+            {"user_id": "3", "brand": "Opel", "model": "Vivaro"},
+        ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(4)
+async def test_json_import_reports_every_row(async_client):
+    response = await async_client.post(
+        "/api/v1/cars/bulk",
+        json=[
+            car(1),
+            car(2, vin=car(1)["vin"]),
+            car(3, year="old"),
+            car(4, user_id=99),
+            car(5, user_id=2),
+        ],
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["created"], report["failed"]) == (2, 3)
+    rows = report["rows"]
+    assert [row["row"] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]["car_id"] and rows[4]["car_id"]
+    assert rows[1]["error"] == "VIN already exists"
+    assert rows[2]["error"].startswith("year:")
+    assert rows[3]["error"] == "User not found"
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(4)
+async def test_import_chunk_is_set_based(async_client):
+    # Duplicate checks, owner check, one executemany INSERT and one SELECT
+    # of the new ids, however many rows the chunk holds.
+    cars = [car(n) for n in range(100, 150)]
+    response = await async_client.post("/api/v1/cars/bulk", json=cars)
+    assert response.json()["created"] == 50
+
+    async with TestingSessionLocal() as db:
+        stored = dict(
+            (
+                await db.execute(select(Car.car_id, Car.vin).where(Car.user_id == 1))
+            ).all()
+        )
+    assert [stored[row["car_id"]] for row in response.json()["rows"]] == [
+        fields["vin"] for fields in cars
+    ]
+
+
+@pytest.mark.asyncio
+async def test_streamed_csv_import_dedupes_across_chunks(async_client, monkeypatch):
+    monkeypatch.setattr(crud.car_import, "CAR_IMPORT_CHUNK_SIZE", 2)
+    app.dependency_overrides[get_current_user] = lambda: User(
+        user_id=2, name="Fleet", role=UserRole.CUSTOMER
+    )
+    header = "user_id,brand,model,year,plate_number,vin"
+    lines = [header] + [csv_line(car(n, user_id=2)) for n in range(10, 15)]
+    # Same plate as row 1, two chunks later; then someone else's car.
+    lines.append(csv_line(car(15, user_id=2, plate_number="FL00010")))
+    lines.append(csv_line(car(16, user_id=1)))
+    body = "\n".join(lines).encode("utf-8")
+
+    response = await async_client.post(
+        "/api/v1/cars/bulk",
+        content=byte_chunks(body, 7),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["created"], report["failed"]) == (5, 2)
+    assert report["rows"][5]["error"] == "Plate number already exists"
+    assert report["rows"][6]["error"] == "You can only add cars to your own profile"
+
+    response = await async_client.post(
+        "/api/v1/cars/bulk",
+        content=f"{json.dumps(car(20, user_id=2))}\nnot json\n".encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert [row["car_id"] is not None for row in response.json()["rows"]] == [
+        True,
+        False,
+    ]
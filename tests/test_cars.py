@@ -7,6 +7,7 @@ def admin_headers():
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(4)
 async def test_create_car(async_client):
     car_data = {
         "user_id": 1,
@@ -25,6 +26,7 @@ async def test_create_car(async_client):
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(1)
 async def test_read_cars(async_client, admin_headers):
 
     response = await async_client.get("/api/v1/cars/", headers=admin_headers)
@@ -36,6 +38,7 @@ async def test_read_cars(async_client, admin_headers):
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(4)
 async def test_read_car(async_client, admin_headers):
 
     car_data = {
@@ -61,6 +64,7 @@ async def test_read_car(async_client, admin_headers):
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(4)
 async def test_update_car(async_client, admin_headers):
 
     car_data = {
@@ -89,6 +93,7 @@ async def test_update_car(async_client, admin_headers):
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(4)
 async def test_delete_car(async_client, admin_headers):
 
     car_data = {
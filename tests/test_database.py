@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from database import build_engine, get_pool_stats, get_profile_settings
+
+
+def test_prod_profile_disables_echo():
+    settings = get_profile_settings("prod")
+    assert settings["echo"] is False
+    assert settings["pool_pre_ping"] is True
+    assert settings["pool_size"] > get_profile_settings("dev")["pool_size"]
+
+
+def test_profile_env_override(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "42")
+    monkeypatch.setenv("DB_ECHO", "false")
+    settings = get_profile_settings("dev")
+    assert settings["pool_size"] == 42
+    assert settings["echo"] is False
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        get_profile_settings("staging")
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_track_checkouts(tmp_path):
+    engine = build_engine("prod", f"sqlite+aiosqlite:///{tmp_path}/pool.db")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+    stats = get_pool_stats(engine)
+    await engine.dispose()
+
+    assert stats["profile"] == "prod"
+    assert stats["size"] == 20
+    assert stats["checkouts"] == 1
+    assert stats["checkins"] == 1
+    assert stats["wait_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_count_only_blocked_checkouts(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    engine = build_engine("prod", f"sqlite+aiosqlite:///{tmp_path}/pool.db")
+
+    async def query():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        waiting = asyncio.create_task(query())
+        await asyncio.sleep(0.05)
+    await waiting
+    await query()
+
+    stats = get_pool_stats(engine)
+    await engine.dispose()
+
+    assert stats["checkouts"] == 3
+    assert stats["wait_count"] == 1
+    assert stats["wait_max_ms"] >= 40
+
+
+@pytest.mark.asyncio
+async def test_health_reports_pool(async_client):
+    response = await async_client.get("/health")
+    assert response.status_code == 200
+    assert "checkouts" in response.json()["db_pool"]
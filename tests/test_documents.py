@@ -1,12 +1,29 @@
+import asyncio
+import hashlib
+import importlib.util
+import io
 import os
 from datetime import date, datetime, timedelta
 import pytest
 from pathlib import Path
 
 from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
 from jose import jwt
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from models.document_blob import DocumentBlob
+from models.document_preview import DocumentPreview, PreviewStatus
 from models.mechanic import Mechanic, MechanicRole
 from crud.mechanic import get_current_mechanic
+import crud.document
+import crud.storage
+from crud.previews import PreviewPipeline, preview_path, render_preview
+from crud.storage import ContentStore, save_upload
+from database import Base, build_engine, get_async_db, get_session_factory
+from main import app
+from tests.conftest import TestingSessionLocal, engine
 
 
 load_dotenv()
@@ -21,6 +38,35 @@ Path(UPLOAD_DIRECTORY).mkdir(parents=True, exist_ok=True)
 Path(TEST_FILE_PATH).mkdir(parents=True, exist_ok=True)
 
 
+def fake_render(source_path, target_path, max_size):
+    with open(source_path, "rb") as source, open(target_path, "wb") as target:
+        target.write(b"thumb:" + source.read())
+    return max_size, max_size
+
+
+@pytest.fixture(autouse=True)
+def document_store(tmp_path, monkeypatch):
+    store = ContentStore(str(tmp_path / "store"))
+    monkeypatch.setattr(crud.document, "document_store", store)
+    return store
+
+
+@pytest.fixture(scope="module")
+def preview_pool():
+    pipeline = PreviewPipeline(workers=1)
+    yield pipeline
+    pipeline.shutdown()
+
+
+@pytest.fixture(autouse=True)
+async def previews(preview_pool, monkeypatch):
+    preview_pool.renderer = fake_render
+    preview_pool.generated = preview_pool.reused = preview_pool.failed = 0
+    monkeypatch.setattr(crud.document, "preview_pipeline", preview_pool)
+    yield preview_pool
+    await preview_pool.wait()
+
+
 @pytest.fixture(scope="module", autouse=True)
 def create_test_files():
     with open(f"{TEST_FILE_PATH}/test.pdf", "wb") as f:
@@ -78,8 +124,11 @@ async def test_upload_document(async_client, mechanic_headers):
         )
     assert response.status_code == 200
     data = response.json()
-    assert data["file_path"].endswith("test.pdf")
+    assert data["filename"] == "test.pdf"
     assert data["type"] == "PASSPORT"
+    assert data["sha256"] == hashlib.sha256(b"PDF file content").hexdigest()
+    assert data["file_path"].endswith(data["sha256"])
+    assert data["size"] == len(b"PDF file content")
 
 
 @pytest.mark.asyncio
@@ -111,3 +160,356 @@ async def test_get_all_documents(async_client, admin_headers):
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(crud.storage, "UPLOAD_CHUNK_SIZE", 4)
+    content = b"0123456789" * 10
+    upload = UploadFile(io.BytesIO(content), filename="scan.pdf")
+
+    stored = await save_upload(upload, str(tmp_path), "scan.pdf")
+
+    assert stored.size == len(content)
+    assert stored.sha256 == hashlib.sha256(content).hexdigest()
+    assert os.listdir(tmp_path) == ["scan.pdf"]
+    assert (tmp_path / "scan.pdf").read_bytes() == content
+
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_oversized_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(crud.storage, "MAX_UPLOAD_SIZE", 10)
+    upload = UploadFile(io.BytesIO(b"x" * 100), filename="big.pdf")
+
+    with pytest.raises(HTTPException) as error:
+        await save_upload(upload, str(tmp_path), "big.pdf")
+
+    assert error.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_rejected_by_content_length(
+    async_client, mechanic_headers, monkeypatch
+):
+    monkeypatch.setattr(crud.storage, "MAX_UPLOAD_SIZE", 10)
+    monkeypatch.setattr(crud.storage, "MULTIPART_OVERHEAD", 0)
+
+    response = await async_client.post(
+        "api/v1/documents/upload",
+        headers=mechanic_headers,
+        files={"file": ("big.pdf", b"x" * 100, "application/pdf")},
+    )
+    assert response.status_code == 413
+
+
+async def upload(async_client, headers, name, content):
+    response = await async_client.post(
+        "api/v1/documents/upload",
+        headers=headers,
+        files={"file": (name, content, "application/pdf")},
+    )
+    assert response.status_code == 200
+    # Previews use the test database's single shared connection; let them
+    # finish so their commits do not land inside the next request.
+    await crud.document.preview_pipeline.wait()
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_file(
+    async_client, mechanic_headers, document_store
+):
+    first = await upload(async_client, mechanic_headers, "contract.pdf", b"same")
+    second = await upload(async_client, mechanic_headers, "copy.pdf", b"same")
+
+    assert first["file_path"] == second["file_path"]
+    assert second["filename"] == "copy.pdf"
+    assert os.path.exists(first["file_path"])
+    assert os.listdir(os.path.join(document_store.root, ".incoming")) == []
+
+    response = await async_client.delete(
+        f"api/v1/documents/{first['document_id']}", headers=mechanic_headers
+    )
+    assert response.status_code == 200
+    assert os.path.exists(second["file_path"])
+
+    response = await async_client.delete(
+        f"api/v1/documents/{second['document_id']}", headers=mechanic_headers
+    )
+    assert response.status_code == 200
+    assert not os.path.exists(second["file_path"])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_uploads_share_one_blob(
+    async_client, mechanic_headers, previews, tmp_path, monkeypatch
+):
+    # Concurrent requests need their own connections, which the shared
+    # in-memory test database cannot give them.
+    engine = build_engine("test", f"sqlite+aiosqlite:///{tmp_path}/race.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+
+    async def get_db_override():
+        async with session_factory() as session:
+            yield session
+
+    monkeypatch.setitem(app.dependency_overrides, get_async_db, get_db_override)
+    monkeypatch.setitem(
+        app.dependency_overrides, get_session_factory, lambda: session_factory
+    )
+
+    barrier = asyncio.Barrier(2)
+    real_save_upload = crud.storage.save_upload
+
+    async def save_together(*args):
+        stored = await real_save_upload(*args)
+        # Both requests take their reference only once both files are saved.
+        await barrier.wait()
+        return stored
+
+    monkeypatch.setattr(crud.storage, "save_upload", save_together)
+    try:
+        first, second = await asyncio.gather(
+            upload(async_client, mechanic_headers, "a.pdf", b"race"),
+            upload(async_client, mechanic_headers, "b.pdf", b"race"),
+        )
+
+        assert first["file_path"] == second["file_path"]
+        async with session_factory() as db:
+            blob = await db.get(DocumentBlob, first["sha256"])
+        assert blob.ref_count == 2
+
+        for document in (first, second):
+            assert os.path.exists(document["file_path"])
+            response = await async_client.delete(
+                f"api/v1/documents/{document['document_id']}",
+                headers=mechanic_headers,
+            )
+            assert response.status_code == 200
+        assert not os.path.exists(first["file_path"])
+    finally:
+        await previews.wait()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_update_releases_previous_content(async_client, mechanic_headers):
+    kept = await upload(async_client, mechanic_headers, "kept.pdf", b"kept")
+    document = await upload(async_client, mechanic_headers, "old.pdf", b"old")
+
+    response = await async_client.put(
+        f"api/v1/documents/{document['document_id']}",
+        headers=mechanic_headers,
+        files={"file": ("new.pdf", b"kept", "application/pdf")},
+    )
+    assert response.status_code == 200
+    assert response.json()["file_path"] == kept["file_path"]
+    assert not os.path.exists(document["file_path"])
+    assert os.path.exists(kept["file_path"])
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_keeps_released_content(
+    async_client, mechanic_headers, monkeypatch
+):
+    document = await upload(async_client, mechanic_headers, "lease.pdf", b"lease")
+
+    async def failing_commit(self):
+        raise OperationalError("COMMIT", {}, Exception("database is gone"))
+
+    with monkeypatch.context() as patch:
+        patch.setattr(AsyncSession, "commit", failing_commit)
+        with pytest.raises(OperationalError):
+            await async_client.delete(
+                f"api/v1/documents/{document['document_id']}",
+                headers=mechanic_headers,
+            )
+    assert os.path.exists(document["file_path"])
+
+    response = await async_client.delete(
+        f"api/v1/documents/{document['document_id']}", headers=mechanic_headers
+    )
+    assert response.status_code == 200
+    assert not os.path.exists(document["file_path"])
+
+
+@pytest.mark.asyncio
+async def test_download_content_with_etag_and_range(async_client, mechanic_headers):
+    document = await upload(async_client, mechanic_headers, "scan.pdf", b"0123456789")
+    url = f"api/v1/documents/{document['document_id']}/content"
+    etag = f'"{document["sha256"]}"'
+
+    response = await async_client.get(url, headers=mechanic_headers)
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    assert response.headers["etag"] == etag
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    response = await async_client.get(
+        url, headers={**mechanic_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = await async_client.get(
+        url, headers={**mechanic_headers, "Range": "bytes=2-5", "If-Range": etag}
+    )
+    assert response.status_code == 206
+    assert response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+
+    response = await async_client.get(
+        url, headers={**mechanic_headers, "Range": "bytes=2-5", "If-Range": '"old"'}
+    )
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+
+    response = await async_client.get(
+        url, params={"v": document["sha256"]}, headers=mechanic_headers
+    )
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.asyncio
+async def test_download_missing_document(async_client, mechanic_headers):
+    response = await async_client.get(
+        "api/v1/documents/999999/content", headers=mechanic_headers
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_previews_follow_content_hash(async_client, mechanic_headers, previews):
+    first = await upload(async_client, mechanic_headers, "photo.png", b"png-1")
+    await previews.wait()
+    second = await upload(async_client, mechanic_headers, "again.png", b"png-1")
+    await previews.wait()
+    assert previews.generated == 1
+    assert previews.reused == 1
+
+    response = await async_client.get(
+        f"api/v1/documents/{first['document_id']}/preview", headers=mechanic_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.content == b"thumb:png-1"
+
+    response = await async_client.put(
+        f"api/v1/documents/{first['document_id']}",
+        headers=mechanic_headers,
+        files={"file": ("photo.png", b"png-2", "image/png")},
+    )
+    assert response.status_code == 200
+    await previews.wait()
+    assert previews.generated == 2
+
+    response = await async_client.get(
+        f"api/v1/documents/{first['document_id']}/preview", headers=mechanic_headers
+    )
+    assert response.content == b"thumb:png-2"
+
+    response = await async_client.delete(
+        f"api/v1/documents/{second['document_id']}", headers=mechanic_headers
+    )
+    assert response.status_code == 200
+    assert not os.path.exists(preview_path(second["file_path"]))
+
+
+@pytest.mark.asyncio
+async def test_lost_preview_is_regenerated(async_client, mechanic_headers, previews):
+    document = await upload(async_client, mechanic_headers, "scan.jpg", b"jpg")
+    await previews.wait()
+    os.remove(preview_path(document["file_path"]))
+
+    url = f"api/v1/documents/{document['document_id']}/preview"
+    response = await async_client.get(url, headers=mechanic_headers)
+    assert response.status_code == 202
+
+    await previews.wait()
+    response = await async_client.get(url, headers=mechanic_headers)
+    assert response.status_code == 200
+
+
+class LateRowSession(AsyncSession):
+    """Another worker inserts the preview row right after this one looked."""
+
+    async def get(self, entity, ident, **kwargs):
+        async with TestingSessionLocal() as other:
+            other.add(DocumentPreview(sha256=ident, status=PreviewStatus.PENDING))
+            await other.commit()
+        return None
+
+
+class FailingFinalCommit(AsyncSession):
+    """The database goes away while the thumbnail is rendered."""
+
+    async def commit(self):
+        if self.info.setdefault("commits", 0):
+            raise OperationalError("COMMIT", {}, Exception("database is gone"))
+        self.info["commits"] += 1
+        await super().commit()
+
+
+@pytest.mark.asyncio
+async def test_preview_row_taken_by_another_worker(previews, tmp_path):
+    source = tmp_path / "scan.png"
+    source.write_bytes(b"png")
+    factory = sessionmaker(bind=engine, class_=LateRowSession, expire_on_commit=False)
+
+    await previews.schedule(factory, str(source), "a" * 64)
+    assert (previews.generated, previews.reused) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_unexpected_preview_error_is_logged_and_recorded(
+    previews, tmp_path, caplog
+):
+    source = tmp_path / "scan.png"
+    source.write_bytes(b"png")
+    factory = sessionmaker(
+        bind=engine, class_=FailingFinalCommit, expire_on_commit=False
+    )
+
+    previews.schedule(factory, str(source), "b" * 64)
+    await previews.wait()
+
+    assert previews.failed == 1
+    assert "Preview of bbbb" in caplog.text
+    async with TestingSessionLocal() as db:
+        preview = await db.get(DocumentPreview, "b" * 64)
+    assert preview.status == PreviewStatus.FAILED
+    assert "database is gone" in preview.error
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("PIL") is not None, reason="Pillow is installed"
+)
+@pytest.mark.asyncio
+async def test_preview_unsupported_without_pillow(
+    async_client, mechanic_headers, previews
+):
+    previews.renderer = render_preview
+    document = await upload(async_client, mechanic_headers, "scan.png", b"no-pil")
+    await previews.wait()
+
+    response = await async_client.get(
+        f"api/v1/documents/{document['document_id']}/preview", headers=mechanic_headers
+    )
+    assert response.status_code == 404
+
+
+def test_render_preview_downscales_image(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    source = tmp_path / "scan.png"
+    Image.new("RGB", (1200, 800), "white").save(source)
+
+    size = render_preview(str(source), str(tmp_path / "scan.jpg"), 300)
+
+    assert size == (300, 200)
+    assert Image.open(tmp_path / "scan.jpg").format == "JPEG"
@@ -0,0 +1,172 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.future import select
+
+from crud.email_outbox import EmailOutboxWorker, SMTPSender
+from crud.user import get_current_user
+from main import app
+from models.car import Car
+from models.email_outbox import EmailOutbox, EmailStatus
+from models.mechanic import Mechanic, MechanicRole
+from models.services import Service
+from models.user import User, UserRole
+from tests.conftest import TestingSessionLocal
+from tests.smtp_server import LocalSMTPServer
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def customer(init_db):
+    async with TestingSessionLocal() as session:
+        session.add(
+            User(
+                user_id=1,
+                name="Customer",
+                email="customer@example.com",
+                password="x",
+                role=UserRole.ADMIN,
+            )
+        )
+        session.add(
+            Car(
+                car_id=1,
+                user_id=1,
+                brand="Skoda",
+                model="Fabia",
+                year=2019,
+                plate_number="AA0001BB",
+                vin="TMBJJ7NE0L0000002",
+            )
+        )
+        session.add(Service(service_id=1, name="Tyre change", price=25, duration=30))
+        session.add(
+            Mechanic(
+                mechanic_id=1,
+                name="Mechanic",
+                birth_date=date(1990, 1, 1),
+                login="mechanic",
+                password="x",
+                role=MechanicRole.MECHANIC,
+                position="Mechanic",
+            )
+        )
+        await session.commit()
+
+
+@pytest.fixture()
+async def smtp_server():
+    server = LocalSMTPServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture()
+def worker(smtp_server):
+    sender = SMTPSender(
+        hostname="127.0.0.1",
+        port=smtp_server.port,
+        sender="service@example.com",
+        start_tls=False,
+        timeout=5,
+    )
+    return EmailOutboxWorker(
+        session_factory=TestingSessionLocal,
+        sender=sender,
+        concurrency=1,
+        max_attempts=2,
+    )
+
+
+@pytest.fixture()
+def customer_email(override_get_current_user):
+    app.dependency_overrides[get_current_user] = lambda: User(
+        user_id=1, name="Customer", email="customer@example.com", role=UserRole.ADMIN
+    )
+
+
+async def outbox_rows():
+    async with TestingSessionLocal() as session:
+        result = await session.execute(
+            select(EmailOutbox).order_by(EmailOutbox.email_id)
+        )
+        return result.scalars().all()
+
+
+async def make_due(email_ids):
+    async with TestingSessionLocal() as session:
+        for email_id in email_ids:
+            email = await session.get(EmailOutbox, email_id)
+            email.next_attempt_at = datetime.now() - timedelta(seconds=1)
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_appointment_email_goes_through_outbox(
+    async_client, customer_email, worker, smtp_server
+):
+    response = await async_client.post(
+        "/api/v1/appointments/",
+        json={
+            "user_id": 1,
+            "car_id": 1,
+            "service_id": 1,
+            "appointment_date": datetime(2030, 2, 4, 10).isoformat(),
+        },
+    )
+    assert response.status_code == 200
+    assert smtp_server.messages == []
+
+    [email] = await outbox_rows()
+    assert email.recipient == "customer@example.com"
+    assert email.status == EmailStatus.PENDING
+
+    assert await worker.process_batch() == 1
+    assert smtp_server.messages[0]["To"] == "customer@example.com"
+    assert "Appointment Details" in smtp_server.messages[0].get_payload()
+
+    [email] = await outbox_rows()
+    assert email.status == EmailStatus.SENT
+    assert worker.stats()["sent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_reuses_one_connection(worker, smtp_server):
+    async with TestingSessionLocal() as session:
+        for i in range(5):
+            session.add(
+                EmailOutbox(recipient=f"user{i}@example.com", subject="Hi", body="x")
+            )
+        await session.commit()
+
+    assert await worker.process_batch() == 5
+    assert len(smtp_server.messages) == 5
+    assert smtp_server.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_retried_then_given_up(worker, smtp_server):
+    async with TestingSessionLocal() as session:
+        email = EmailOutbox(recipient="retry@example.com", subject="Hi", body="x")
+        session.add(email)
+        await session.commit()
+        email_id = email.email_id
+
+    smtp_server.reject_next = 2
+    assert await worker.process_batch() == 1
+    email = (await outbox_rows())[-1]
+    assert email.status == EmailStatus.PENDING
+    assert email.attempts == 1
+    assert email.next_attempt_at > datetime.now()
+    assert "451" in email.last_error
+
+    # Not due yet: nothing is claimed until the backoff has passed.
+    assert await worker.process_batch() == 0
+
+    await make_due([email_id])
+    assert await worker.process_batch() == 1
+    email = (await outbox_rows())[-1]
+    assert email.status == EmailStatus.FAILED
+    assert worker.stats()["retried"] == 1
+    assert worker.stats()["failed"] == 1
+    assert smtp_server.messages == []
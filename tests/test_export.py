@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from models.appoinment import Appointment, AppointmentStatus
+from models.car import Car
+from models.services import Service
+from models.user import User, UserRole
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def export_rows(init_db):
+    async with TestingSessionLocal() as session:
+        session.add(
+            User(
+                user_id=1,
+                name="Export Admin",
+                email="export@example.com",
+                password="hash",
+                role=UserRole.ADMIN,
+            )
+        )
+        session.add(
+            Car(
+                car_id=1,
+                user_id=1,
+                brand="Skoda",
+                model="Octavia",
+                year=2020,
+                plate_number="AA1234BB",
+                vin="TMBJJ7NE0L0000001",
+            )
+        )
+        session.add(Service(service_id=1, name="Diagnostics", price=20, duration=30))
+        for day, appointment_status in [
+            (1, AppointmentStatus.PENDING),
+            (2, AppointmentStatus.COMPLETED),
+            (3, AppointmentStatus.PENDING),
+        ]:
+            session.add(
+                Appointment(
+                    user_id=1,
+                    car_id=1,
+                    service_id=1,
+                    appointment_date=datetime(2025, 3, day, 10, 0),
+                    status=appointment_status,
+                )
+            )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_export_appointments_ndjson_with_filters(async_client):
+    response = await async_client.get(
+        "/api/v1/export/appointments",
+        params={"status": "pending", "date_from": "2025-03-02T00:00:00"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 1
+    assert rows[0]["status"] == "pending"
+    assert rows[0]["appointment_date"] == "2025-03-03T10:00:00"
+
+
+@pytest.mark.asyncio
+async def test_export_cars_csv(async_client):
+    response = await async_client.get("/api/v1/export/cars", params={"format": "csv"})
+    assert response.status_code == 200
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows[0]["vin"] == "TMBJJ7NE0L0000001"
+
+
+@pytest.mark.asyncio
+async def test_export_users_omits_password(async_client):
+    response = await async_client.get("/api/v1/export/users")
+    assert response.status_code == 200
+
+    row = json.loads(response.text.splitlines()[0])
+    assert row == {
+        "user_id": 1,
+        "name": "Export Admin",
+        "email": "export@example.com",
+        "role": "ADMIN",
+    }
@@ -0,0 +1,84 @@
+import pytest
+
+from crud.auth_config import create_access_token
+from crud.identity_cache import IdentityCache, IdentityCacheBackend, identity_cache
+from crud.user import get_current_user
+from models.user import User, UserRole
+from tests.conftest import TestingSessionLocal
+
+
+class DictBackend(IdentityCacheBackend):
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_and_miss_counters():
+    cache = IdentityCache(max_size=10, ttl=60)
+    assert await cache.get("user", "1") is None
+    await cache.set("user", "1", {"user_id": 1})
+    assert await cache.get("user", "1") == {"user_id": 1}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_expires_and_evicts():
+    cache = IdentityCache(max_size=2, ttl=0)
+    await cache.set("user", "1", {"user_id": 1})
+    assert await cache.get("user", "1") is None
+
+    cache = IdentityCache(max_size=2, ttl=60)
+    for user_id in range(3):
+        await cache.set("user", user_id, {"user_id": user_id})
+    assert await cache.get("user", 0) is None
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_invalidation():
+    backend = DictBackend()
+    writer = IdentityCache(backend=backend)
+    reader = IdentityCache(backend=backend)
+
+    await writer.set("mechanic", "7", {"mechanic_id": 7})
+    assert await reader.get("mechanic", "7") == {"mechanic_id": 7}
+
+    await writer.invalidate("mechanic", "7")
+    assert "mechanic:7" not in backend.data
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_skips_db_on_hit():
+    async with TestingSessionLocal() as session:
+        user = User(
+            name="Cached", email="cached@example.com", password="x", role=UserRole.ADMIN
+        )
+        session.add(user)
+        await session.commit()
+        user_id = user.user_id
+
+    token = create_access_token({"sub": str(user_id)})
+    identity_cache.clear()
+
+    async with TestingSessionLocal() as session:
+        first = await get_current_user(token=token, db=session)
+    second = await get_current_user(token=token, db=None)
+
+    assert first.user_id == second.user_id == user_id
+    assert second.role == UserRole.ADMIN
+    assert second.password is None
+
+    await identity_cache.invalidate("user", str(user_id))
+    assert await identity_cache.get("user", str(user_id)) is None
@@ -43,6 +43,7 @@ async def test_get_current_mechanic(async_client, override_get_current_mechanic)
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(1)
 async def test_read_mechanics(async_client, override_get_current_mechanic):
     response = await async_client.get("/api/v1/mechanics/")
     assert response.status_code == 200
@@ -108,6 +109,7 @@ async def test_delete_mechanic(async_client, override_get_current_mechanic):
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(1)
 async def test_get_mechanic_appointments(async_client, override_get_current_mechanic):
     response = await async_client.get("/api/v1/mechanics/appointments")
     assert response.status_code == 200
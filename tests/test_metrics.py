@@ -0,0 +1,57 @@
+import re
+
+import pytest
+
+from crud.metrics import Histogram, metrics
+
+
+def sample(text: str, name: str, **labels) -> float:
+    """Value of the sample ``name`` whose labels include ``labels``."""
+    for line in text.splitlines():
+        match = re.fullmatch(r"(\w+)(?:\{(.*)\})? (\S+)", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ""))
+        if all(found.get(key) == value for key, value in labels.items()):
+            return float(match.group(3))
+    raise AssertionError(f"No sample {name} {labels}")
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(("GET", "/x"), value)
+
+    text = "\n".join(histogram.render("latency", ("method", "route")))
+    assert sample(text, "latency_bucket", le="0.1") == 2
+    assert sample(text, "latency_bucket", le="1.0") == 3
+    assert sample(text, "latency_bucket", le="+Inf") == 4
+    assert sample(text, "latency_count") == 4
+    assert sample(text, "latency_sum") == pytest.approx(3.65)
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(async_client):
+    response = await async_client.get("/api/v1/cars/999")
+    assert response.status_code == 404
+    await async_client.get("/api/v1/no-such-route/1")
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    route = {"method": "GET", "route": "/api/v1/cars/{car_id}"}
+    assert sample(text, "http_responses_total", status="404", **route) >= 1
+    assert sample(text, "http_request_duration_seconds_count", **route) >= 1
+    assert sample(text, "http_request_db_queries_total", **route) >= 1
+    assert sample(text, "http_responses_total", route="unmatched") >= 1
+    assert "/api/v1/no-such-route/1" not in text
+
+    # The scrape itself is in flight while it renders.
+    assert sample(text, "http_requests_in_flight") == 1
+    assert sample(text, "identity_cache_hit_ratio") >= 0
+    assert sample(text, "service_catalog_hit_ratio") >= 0
+    assert sample(text, "email_outbox_queue_depth") >= 0
+    assert sample(text, "db_pool_checkouts") >= 0
+    assert metrics.in_flight == 0
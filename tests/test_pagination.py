@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import pytest
+
+import crud.pagination
+from crud.pagination import decode_cursor, encode_cursor
+from models.appoinment import Appointment
+
+
+@pytest.fixture()
+async def services(async_client):
+    # The database lives for the whole module, so later tests reuse the rows.
+    for i in range(5):
+        await async_client.post(
+            "/api/v1/services/",
+            json={"name": f"Paged Service {i}", "price": 10 + i, "duration": 30},
+        )
+
+
+def test_cursor_round_trip():
+    columns = [Appointment.appointment_date, Appointment.appointment_id]
+    values = [datetime(2025, 1, 2, 9, 30), 17]
+    assert decode_cursor(encode_cursor(values), columns) == values
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_all_rows(async_client, services):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await async_client.get("/api/v1/services/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["service_id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+
+@pytest.mark.asyncio
+async def test_limit_is_capped(async_client, services, monkeypatch):
+    monkeypatch.setattr(crud.pagination, "PAGE_SIZE_MAX", 3)
+    response = await async_client.get("/api/v1/services/", params={"limit": 100})
+    assert len(response.json()["items"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_legacy_list_over_the_cap_switches_to_envelope(
+    async_client, services, monkeypatch
+):
+    count = len((await async_client.get("/api/v1/services/")).json())
+    monkeypatch.setattr(crud.pagination, "PAGINATION_LEGACY_LIMIT", count)
+    response = await async_client.get("/api/v1/services/")
+    assert isinstance(response.json(), list)
+    assert len(response.json()) == count
+
+    monkeypatch.setattr(crud.pagination, "PAGINATION_LEGACY_LIMIT", 2)
+    response = await async_client.get("/api/v1/services/")
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page["items"]) == 2
+    assert page["next_cursor"]
+
+    response = await async_client.get(
+        "/api/v1/services/", params={"cursor": page["next_cursor"]}
+    )
+    assert response.json()["items"][0]["name"] == "Paged Service 2"
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(async_client):
+    response = await async_client.get(
+        "/api/v1/services/", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.future import select
+
+from crud.password_hashing import PasswordHasher, password_hasher
+from models.user import User
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify():
+    hasher = PasswordHasher(rounds=4, workers=1)
+    hashed = await hasher.hash("secret-password")
+
+    assert await hasher.verify("secret-password", hashed)
+    assert not await hasher.verify("wrong-password", hashed)
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(rounds=5).needs_rehash(hashed)
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queue_limit_rejects_with_503():
+    hasher = PasswordHasher(rounds=10, workers=1, queue_limit=1)
+    in_flight = asyncio.create_task(hasher.hash("first"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.hash("second")
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+    await in_flight
+    assert hasher.stats()["rejected"] == 1
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_on_cost_change(async_client, monkeypatch):
+    user_data = {
+        "name": "Rehash User",
+        "email": "rehash@example.com",
+        "password": "rehash-password",
+        "role": "CUSTOMER",
+    }
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    response = await async_client.post("/api/v1/users/register", json=user_data)
+    assert response.status_code == 200
+
+    monkeypatch.setattr(password_hasher, "rounds", 5)
+    response = await async_client.post(
+        "/api/v1/users/login",
+        json={"email": user_data["email"], "password": user_data["password"]},
+    )
+    assert response.status_code == 200
+
+    async with TestingSessionLocal() as session:
+        result = await session.execute(
+            select(User.password).where(User.email == user_data["email"])
+        )
+        assert result.scalar_one().startswith("$2b$05$")
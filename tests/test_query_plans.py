@@ -0,0 +1,188 @@
+import re
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event
+
+from crud.scheduling import availability_index
+from crud.user import get_current_user
+from main import app
+from models.appoinment import Appointment, AppointmentStatus
+from models.car import Car
+from models.document import Document, DocumentType
+from models.mechanic import Mechanic, MechanicRole
+from models.services import Service
+from models.user import User, UserRole
+from tests.conftest import TestingSessionLocal, engine
+
+# Tables large enough in production that reading all of them is a regression.
+HOT_TABLES = {"appointments", "cars", "documents"}
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def workshop(init_db):
+    async with TestingSessionLocal() as session:
+        session.add_all(
+            [
+                User(user_id=1, name="Admin", email="a@x.com", password="x"),
+                User(
+                    user_id=2,
+                    name="Customer",
+                    email="c@x.com",
+                    password="x",
+                    role=UserRole.CUSTOMER,
+                ),
+                Service(service_id=1, name="Oil change", price=40, duration=60),
+                Mechanic(
+                    mechanic_id=1,
+                    name="Mechanic",
+                    birth_date=date(1990, 1, 1),
+                    login="mechanic",
+                    password="x",
+                    role=MechanicRole.ADMIN,
+                    position="Mechanic",
+                ),
+            ]
+        )
+        for car_id, user_id in ((1, 1), (2, 2)):
+            session.add(
+                Car(
+                    car_id=car_id,
+                    user_id=user_id,
+                    brand="Skoda",
+                    model="Octavia",
+                    year=2020,
+                    plate_number=f"AA{car_id}BB",
+                    vin=f"TMBJJ7NE0L000000{car_id}",
+                )
+            )
+        for hour in (9, 11, 13):
+            session.add(
+                Appointment(
+                    user_id=2,
+                    car_id=2,
+                    service_id=1,
+                    mechanic_id=1 if hour == 9 else None,
+                    appointment_date=datetime(2030, 1, 7, hour),
+                    status=AppointmentStatus.PENDING,
+                )
+            )
+        session.add(
+            Document(
+                mechanic_id=1,
+                type=DocumentType.PASSPORT,
+                file_path="/nonexistent/passport.pdf",
+            )
+        )
+        await session.commit()
+
+
+@contextmanager
+def capture_selects():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+async def full_scans(statement, parameters) -> set:
+    """Hot tables read in full by ``statement``, according to EXPLAIN."""
+    async with engine.connect() as conn:
+        if conn.dialect.name == "mysql":
+            result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+            return {
+                row["table"]
+                for row in result.mappings()
+                if row["type"] in ("ALL", "index") and row["table"] in HOT_TABLES
+            }
+
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        )
+        scanned = set()
+        for row in result.all():
+            # SQLite reports "SCAN <table>" for a full table or index scan
+            # and "SEARCH <table> USING ..." for an index lookup.
+            match = re.match(r"SCAN (\w+)", row[-1])
+            if match and match.group(1) in HOT_TABLES:
+                scanned.add(match.group(1))
+        return scanned
+
+
+async def assert_no_full_scans(async_client, method, url, **kwargs):
+    with capture_selects() as statements:
+        response = await async_client.request(method, url, **kwargs)
+    assert response.status_code < 400, response.text
+    assert statements
+
+    for statement, parameters in statements:
+        scanned = await full_scans(statement, parameters)
+        assert not scanned, f"{method} {url} scans {scanned}:\n{statement}"
+
+
+@pytest.fixture()
+def as_customer():
+    app.dependency_overrides[get_current_user] = lambda: User(
+        user_id=2, name="Customer", role=UserRole.CUSTOMER
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/v1/appointments/?limit=10",
+        "/api/v1/cars/?limit=10",
+    ],
+)
+async def test_customer_reads_use_indexes(async_client, as_customer, url):
+    await assert_no_full_scans(async_client, "GET", url)
+
+
+@pytest.mark.asyncio
+async def test_export_date_window_uses_indexes(async_client):
+    await assert_no_full_scans(
+        async_client,
+        "GET",
+        "/api/v1/export/appointments",
+        params={"date_from": "2030-01-07T00:00:00", "date_to": "2030-01-08T00:00:00"},
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "method, url",
+    [
+        ("GET", "/api/v1/mechanics/appointments?limit=10"),
+        ("GET", "/api/v1/documents/?limit=10"),
+        ("PUT", "/api/v1/appointments/2/assign-mechanic?mechanic_id=1"),
+        (
+            "POST",
+            "/api/v1/appointments/auto-assign?date_from=2030-01-07T00:00:00"
+            "&date_to=2030-01-08T00:00:00&dry_run=true",
+        ),
+    ],
+)
+async def test_mechanic_endpoints_use_indexes(
+    async_client, override_get_current_mechanic, method, url
+):
+    await assert_no_full_scans(async_client, method, url)
+
+
+@pytest.mark.asyncio
+async def test_availability_uses_indexes(async_client):
+    availability_index.invalidate()
+    await assert_no_full_scans(
+        async_client,
+        "GET",
+        "/api/v1/appointments/availability",
+        params={"service_id": 1, "date": "2030-01-07"},
+    )
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import re
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.dialects.mysql.aiomysql import AsyncAdapt_aiomysql_connection
+from sqlalchemy.future import select
+from sqlalchemy.util import greenlet_spawn
+from starlette.responses import JSONResponse
+
+import crud.query_stats
+from crud.query_stats import QueryStatsMiddleware, request_observers
+from database import _rows_fetched
+from models.user import User
+from tests.conftest import TestingSessionLocal
+from tests.query_budget import QueryBudget
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries, (\d+) rows", app;dur=[\d.]+'
+)
+
+
+def repeated_query_app(times: int):
+    """ASGI app running the same SELECT ``times`` times, like an N+1 loop."""
+
+    async def app(scope, receive, send):
+        async with TestingSessionLocal() as db:
+            for _ in range(times):
+                await db.execute(select(User).where(User.user_id == 1))
+        await JSONResponse({"ok": True})(scope, receive, send)
+
+    return QueryStatsMiddleware(app)
+
+
+async def get(app, path="/loop"):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://testserver"
+    ) as client:
+        return await client.get(path)
+
+
+@pytest.fixture(autouse=True, scope="module")
+async def users(init_db):
+    async with TestingSessionLocal() as db:
+        db.add(User(user_id=1, name="Owner", email="o@x.com", password="x"))
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_server_timing_counts_queries_and_rows():
+    response = await get(repeated_query_app(3))
+    assert response.status_code == 200
+    match = SERVER_TIMING.fullmatch(response.headers["Server-Timing"])
+    assert match is not None
+    assert match.groups() == ("3", "3")
+
+
+@pytest.mark.asyncio
+async def test_logs_repeated_statements_and_slow_requests(monkeypatch, caplog):
+    monkeypatch.setattr(crud.query_stats, "N_PLUS_ONE_THRESHOLD", 5)
+    caplog.set_level(logging.WARNING, logger="crud.query_stats")
+
+    await get(repeated_query_app(4))
+    assert "possible N+1" not in caplog.text
+
+    await get(repeated_query_app(5))
+    assert "GET /loop ran the same statement 5 times (possible N+1)" in caplog.text
+
+    monkeypatch.setattr(crud.query_stats, "SLOW_REQUEST_MS", 0)
+    await get(repeated_query_app(1))
+    assert "Slow request GET /loop" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_query_budget_reports_requests_over_budget():
+    budget = QueryBudget(2)
+    request_observers.append(budget)
+    try:
+        await get(repeated_query_app(2), "/within")
+        await get(repeated_query_app(3), "/over")
+    finally:
+        request_observers.remove(budget)
+
+    assert len(budget.violations) == 1
+    assert budget.violations[0].startswith("GET /over ran 3 queries (budget 2)")
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(1)
+async def test_app_requests_report_server_timing(async_client):
+    response = await async_client.get("/api/v1/users/?limit=5")
+    assert response.status_code == 200
+    match = SERVER_TIMING.fullmatch(response.headers["Server-Timing"])
+    assert match.groups() == ("1", "1")
+
+
+class FakeAiomysqlCursor:
+    """The part of an aiomysql cursor the SQLAlchemy adapter uses."""
+
+    description = (("user_id",),)
+    rowcount = 3
+
+    async def __aenter__(self):
+        return self
+
+    async def execute(self, operation, parameters):
+        return self.rowcount
+
+    async def fetchall(self):
+        return [(1,), (2,), (3,)]
+
+
+def test_rows_fetched_reads_aiomysql_adapter():
+    connection = SimpleNamespace(cursor=lambda cursor_class: FakeAiomysqlCursor())
+    dbapi = SimpleNamespace(Cursor=object)
+    adapted = AsyncAdapt_aiomysql_connection(dbapi, connection)
+
+    def run():
+        cursor = adapted.cursor()
+        cursor.execute("SELECT user_id FROM users")
+        return _rows_fetched(cursor)
+
+    assert asyncio.run(greenlet_spawn(run)) == 3
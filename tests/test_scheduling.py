@@ -0,0 +1,295 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from crud.scheduling import AvailabilityIndex, MechanicCalendar, plan_assignments
+from crud.user import get_current_user
+from main import app
+from models.appoinment import Appointment, AppointmentStatus
+from models.email_outbox import EmailOutbox
+from models.car import Car
+from models.mechanic import Mechanic, MechanicRole
+from models.services import Service
+from models.user import User, UserRole
+from tests.conftest import TestingSessionLocal
+
+DAY = date(2030, 1, 7)
+
+
+def at(hour, minute=0):
+    return datetime(DAY.year, DAY.month, DAY.day, hour, minute)
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def workshop(init_db):
+    async with TestingSessionLocal() as session:
+        session.add(
+            User(
+                user_id=1,
+                name="Owner",
+                email="owner@example.com",
+                password="x",
+                role=UserRole.ADMIN,
+            )
+        )
+        session.add(
+            Car(
+                car_id=1,
+                user_id=1,
+                brand="Skoda",
+                model="Octavia",
+                year=2020,
+                plate_number="AA1234BB",
+                vin="TMBJJ7NE0L0000001",
+            )
+        )
+        session.add(Service(service_id=1, name="Oil change", price=40, duration=60))
+        for mechanic_id in (1, 2):
+            session.add(
+                Mechanic(
+                    mechanic_id=mechanic_id,
+                    name=f"Mechanic {mechanic_id}",
+                    birth_date=date(1990, 1, 1),
+                    login=f"mechanic{mechanic_id}",
+                    password="x",
+                    role=MechanicRole.MECHANIC,
+                    position="Mechanic",
+                )
+            )
+        await session.commit()
+
+
+def test_free_slots_skip_busy_intervals():
+    index = AvailabilityIndex()
+    index.loaded_at = 0
+    index.mechanic_ids = {1, 2}
+    index.book(10, 1, at(9), 90)
+    index.book(11, 2, at(9, 30), 30)
+
+    slots = {slot["start"]: slot["mechanic_ids"] for slot in index.free_slots(DAY, 60)}
+    assert slots[at(8)] == [1, 2]
+    assert at(9) not in slots
+    assert slots[at(10)] == [2]
+    assert slots[at(10, 30)] == [1, 2]
+
+    index.release(10)
+    assert index.free_mechanics(at(9), at(10)) == [1]
+
+
+def test_plan_assignments_balances_load():
+    calendars = {1: MechanicCalendar(), 2: MechanicCalendar()}
+    calendars[1].add(at(9), at(11), 100)
+    loads = {1: 120, 2: 0}
+    pending = [(1, at(9), 60), (2, at(12), 60), (3, at(12), 60), (4, at(9, 30), 30)]
+
+    assignments, unassigned = plan_assignments(pending, [1, 2], calendars, loads)
+
+    assert dict(assignments) == {1: 2, 2: 2, 3: 1}
+    assert unassigned == [4]
+    assert loads == {1: 180, 2: 120}
+
+
+@pytest.mark.asyncio
+async def test_booking_consumes_capacity(async_client):
+    payload = {"user_id": 1, "car_id": 1, "service_id": 1}
+
+    for start in (at(10), at(10, 30)):
+        response = await async_client.post(
+            "/api/v1/appointments/",
+            json={**payload, "appointment_date": start.isoformat()},
+        )
+        assert response.status_code == 200
+
+    response = await async_client.post(
+        "/api/v1/appointments/",
+        json={**payload, "appointment_date": at(10, 15).isoformat()},
+    )
+    assert response.status_code == 409
+
+    response = await async_client.get(
+        "/api/v1/appointments/availability",
+        params={"service_id": 1, "date": DAY.isoformat()},
+    )
+    assert response.status_code == 200
+    starts = {slot["start"] for slot in response.json()["slots"]}
+    assert at(9, 30).isoformat() in starts
+    assert at(10).isoformat() not in starts
+    assert at(10, 30).isoformat() not in starts
+    assert at(11).isoformat() in starts
+
+
+@pytest.mark.asyncio
+async def test_offset_aware_dates_are_booked_as_utc(async_client):
+    payload = {"user_id": 1, "car_id": 1, "service_id": 1}
+    day = DAY + timedelta(days=4)
+    noon = datetime(day.year, day.month, day.day, 12)
+
+    response = await async_client.post(
+        "/api/v1/appointments/",
+        json={**payload, "appointment_date": f"{noon.isoformat()}Z"},
+    )
+    assert response.status_code == 200
+    assert response.json()["appointment_date"] == noon.isoformat()
+
+    # The same instant in another zone, then a third booking with both
+    # mechanics taken.
+    for expected in (200, 409):
+        response = await async_client.post(
+            "/api/v1/appointments/",
+            json={**payload, "appointment_date": f"{day.isoformat()}T14:00:00+02:00"},
+        )
+        assert response.status_code == expected
+
+
+@pytest.mark.asyncio
+async def test_assign_rejects_double_booking(
+    async_client, override_get_current_mechanic
+):
+    response = await async_client.get("/api/v1/appointments/")
+    first, second = [appt["appointment_id"] for appt in response.json()][:2]
+
+    response = await async_client.put(
+        f"/api/v1/appointments/{first}/assign-mechanic", params={"mechanic_id": 1}
+    )
+    assert response.status_code == 200
+
+    response = await async_client.put(
+        f"/api/v1/appointments/{second}/assign-mechanic", params={"mechanic_id": 1}
+    )
+    assert response.status_code == 409
+
+    response = await async_client.put(
+        f"/api/v1/appointments/{second}/assign-mechanic", params={"mechanic_id": 2}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_auto_assign_dry_run_then_commit(
+    async_client, override_get_current_mechanic
+):
+    day = DAY + timedelta(days=1)
+    starts = [datetime(day.year, day.month, day.day, 9)] * 3 + [
+        datetime(day.year, day.month, day.day, 11)
+    ]
+    async with TestingSessionLocal() as session:
+        for start in starts:
+            session.add(
+                Appointment(
+                    user_id=1,
+                    car_id=1,
+                    service_id=1,
+                    appointment_date=start,
+                    status=AppointmentStatus.PENDING,
+                )
+            )
+        await session.commit()
+
+    window = {
+        "date_from": datetime(day.year, day.month, day.day).isoformat(),
+        "date_to": datetime(day.year, day.month, day.day, 23).isoformat(),
+    }
+    response = await async_client.post(
+        "/api/v1/appointments/auto-assign", params={**window, "dry_run": True}
+    )
+    assert response.status_code == 200
+    plan = response.json()
+    assert len(plan["assigned"]) == 3
+    assert len(plan["unassigned"]) == 1
+    assert plan["mechanic_load"] == {"1": 120, "2": 60}
+
+    response = await async_client.post(
+        "/api/v1/appointments/auto-assign", params=window
+    )
+    assert response.json()["assigned"] == plan["assigned"]
+
+    response = await async_client.post(
+        "/api/v1/appointments/auto-assign", params=window
+    )
+    assert response.json()["assigned"] == []
+    assert response.json()["unassigned"] == plan["unassigned"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(7)
+async def test_bulk_booking_reports_item_errors(async_client):
+    app.dependency_overrides[get_current_user] = lambda: User(
+        user_id=1, name="Owner", email="owner@example.com", role=UserRole.ADMIN
+    )
+    start = datetime.combine(DAY + timedelta(days=3), datetime.min.time())
+    nine = (start + timedelta(hours=9)).isoformat()
+    payload = {"user_id": 1, "car_id": 1, "service_id": 1, "appointment_date": nine}
+    async with TestingSessionLocal() as session:
+        emails_before = await session.scalar(select(func.count(EmailOutbox.email_id)))
+
+    response = await async_client.post(
+        "/api/v1/appointments/bulk",
+        json=[
+            payload,
+            {**payload, "car_id": 99},
+            payload,
+            {**payload, "service_id": 99},
+            # Both mechanics are taken by the first and third items.
+            payload,
+        ],
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [appt["appointment_date"] for appt in body["created"]] == [nine, nine]
+    assert len({appt["appointment_id"] for appt in body["created"]}) == 2
+    assert [(error["index"], error["status_code"]) for error in body["errors"]] == [
+        (1, 403),
+        (3, 404),
+        (4, 409),
+    ]
+
+    async with TestingSessionLocal() as session:
+        emails = await session.execute(
+            select(EmailOutbox.subject).offset(emails_before)
+        )
+    assert emails.scalars().all() == ["Appointment Confirmation (2 bookings)"]
+
+    response = await async_client.post(
+        "/api/v1/appointments/", json={**payload, "appointment_date": nine}
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(7)
+async def test_bulk_booking_is_set_based(async_client):
+    # The same statements as for two items: one executemany INSERT and one
+    # SELECT of the new rows, whatever the batch size.
+    app.dependency_overrides[get_current_user] = lambda: User(
+        user_id=1, name="Owner", email="owner@example.com", role=UserRole.ADMIN
+    )
+    day = DAY + timedelta(days=5)
+    starts = [
+        datetime(day.year, day.month, day.day, hour)
+        for hour in range(8, 18)
+        for _ in range(2)
+    ]
+    response = await async_client.post(
+        "/api/v1/appointments/bulk",
+        json=[
+            {
+                "user_id": 1,
+                "car_id": 1,
+                "service_id": 1,
+                "appointment_date": start.isoformat(),
+            }
+            for start in starts
+        ],
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["errors"] == []
+    created = body["created"]
+    assert [appt["appointment_date"] for appt in created] == [
+        start.isoformat() for start in starts
+    ]
+    ids = [appt["appointment_id"] for appt in created]
+    assert ids == sorted(set(ids))
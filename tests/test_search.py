@@ -0,0 +1,113 @@
+import pytest
+
+from crud.search import TrigramIndex, fulltext_query, tokenize
+
+
+@pytest.fixture()
+def admin_headers():
+    return {"Authorization": "Bearer test_admin_token"}
+
+
+@pytest.fixture()
+def index():
+    return TrigramIndex(
+        [
+            (1, "Brake Pad Replacement", "Front and rear pads"),
+            (2, "Brake Fluid Flush", None),
+            (3, "Oil Change", "Includes a brake check"),
+            (4, "Transmission Service", "Gearbox oil replacement"),
+        ]
+    )
+
+
+def test_tokenize_normalizes_case_accents_and_punctuation():
+    assert tokenize("Révision-COMPLÈTE, 10k") == ["revision", "complete", "10k"]
+
+
+def test_ranks_name_matches_above_description_matches(index):
+    hits = index.search("brake")
+    assert [service_id for service_id, _ in hits] == [1, 2, 3]
+    assert hits[0][1] > hits[2][1]
+
+
+def test_tolerates_typos(index):
+    assert [service_id for service_id, _ in index.search("brke pad")] == [1]
+    assert [service_id for service_id, _ in index.search("transmision")] == [4]
+    assert index.search("windscreen") == []
+
+
+def test_prefix_matches_last_word_only(index):
+    assert index.search("oil ch") == []
+    assert [service_id for service_id, _ in index.search("oil ch", prefix=True)] == [3]
+    assert index.search("br flush", prefix=True) == []
+
+
+def test_fulltext_query_requires_every_word():
+    assert fulltext_query("Brake  pad!") == "+brake +pad"
+    assert fulltext_query("brake pa", prefix=True) == "+brake +pa*"
+    assert fulltext_query("+-*") == ""
+
+
+async def create_service(async_client, admin_headers, name, description, price):
+    response = await async_client.post(
+        "/api/v1/services/",
+        json={
+            "name": name,
+            "description": description,
+            "price": price,
+            "duration": 30,
+        },
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    return response.json()["service_id"]
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_ranks_and_filters(async_client, admin_headers):
+    exhaust = await create_service(
+        async_client, admin_headers, "Exhaust Repair", "Muffler welding", 120
+    )
+    muffler = await create_service(
+        async_client, admin_headers, "Muffler Replacement", "New exhaust muffler", 200
+    )
+
+    response = await async_client.get(
+        "/api/v1/services/search", params={"name": "exhuast"}
+    )
+    assert response.status_code == 200
+    assert [s["service_id"] for s in response.json()] == [exhaust, muffler]
+
+    response = await async_client.get(
+        "/api/v1/services/search", params={"name": "exhaust", "min_price": 150}
+    )
+    assert [s["service_id"] for s in response.json()] == [muffler]
+
+    first = await async_client.get(
+        "/api/v1/services/search", params={"name": "muffler", "limit": 1}
+    )
+    assert [s["service_id"] for s in first.json()["items"]] == [muffler]
+    second = await async_client.get(
+        "/api/v1/services/search",
+        params={"name": "muffler", "limit": 1, "cursor": first.json()["next_cursor"]},
+    )
+    assert [s["service_id"] for s in second.json()["items"]] == [exhaust]
+    assert second.json()["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_autocomplete(async_client, admin_headers):
+    service_id = await create_service(
+        async_client, admin_headers, "Suspension Check", "Shocks and struts", 80
+    )
+
+    response = await async_client.get(
+        "/api/v1/services/autocomplete", params={"q": "susp"}
+    )
+    assert response.status_code == 200
+    assert response.json() == [{"service_id": service_id, "name": "Suspension Check"}]
+
+    response = await async_client.get(
+        "/api/v1/services/autocomplete", params={"q": "suspension ch", "limit": 1}
+    )
+    assert response.json()[0]["service_id"] == service_id
@@ -0,0 +1,90 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from crud.serialization import dumps, response_models
+from models.appoinment import Appointment, AppointmentStatus
+from models.mechanic import Mechanic, MechanicRole
+from schemas.appoinment import AppointmentResponse
+from schemas.mechanic import MechanicResponse
+from schemas.services import ServiceResponse
+from tests.conftest import TestingSessionLocal, engine
+
+
+def test_fast_path_matches_model_dump():
+    appointment = Appointment(
+        appointment_id=1,
+        user_id=2,
+        car_id=3,
+        service_id=4,
+        mechanic_id=None,
+        appointment_date=datetime(2030, 1, 7, 9, 30),
+        status=AppointmentStatus.CANCELLED,
+    )
+    mechanic = Mechanic(
+        mechanic_id=5,
+        name="Ann",
+        birth_date=date(1990, 2, 3),
+        login="ann",
+        password="hash",
+        role=MechanicRole.ADMIN,
+        position="Lead",
+    )
+    items = [
+        *response_models(AppointmentResponse, [appointment]),
+        *response_models(MechanicResponse, [mechanic]),
+        ServiceResponse(
+            service_id=6, name="Oil", description=None, price="49.90", duration=30
+        ),
+    ]
+
+    expected = [item.model_dump(mode="json") for item in items]
+    assert json.loads(dumps({"items": items})) == {"items": expected}
+    assert "password" not in expected[1]
+    assert expected[2]["price"] == str(Decimal("49.90"))
+
+
+@pytest.mark.asyncio
+async def test_list_response_keeps_handler_headers(async_client):
+    response = await async_client.get("/api/v1/services/?limit=1")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "ETag" in response.headers
+    assert set(response.json()) == {"items", "next_cursor"}
+
+
+@pytest.mark.asyncio
+async def test_list_selects_only_response_columns(
+    async_client, override_get_current_mechanic
+):
+    async with TestingSessionLocal() as db:
+        db.add(
+            Mechanic(
+                mechanic_id=1,
+                name="Ann",
+                birth_date=date(1990, 2, 3),
+                login="ann",
+                password="bcrypt-hash",
+                role=MechanicRole.ADMIN,
+                position="Lead",
+            )
+        )
+        await db.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await async_client.get("/api/v1/mechanics/?limit=10")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.json()["items"][0]["login"] == "ann"
+    assert [s for s in statements if "FROM mechanics" in s]
+    assert not [s for s in statements if "password" in s]
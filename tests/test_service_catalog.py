@@ -0,0 +1,123 @@
+import pytest
+
+from crud.service_catalog import LocalCatalogBroker, ServiceCatalog, service_catalog
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture()
+def admin_headers():
+    return {"Authorization": "Bearer test_admin_token"}
+
+
+async def create_service(async_client, admin_headers, name, price):
+    response = await async_client.post(
+        "/api/v1/services/",
+        json={"name": name, "description": name, "price": price, "duration": 30},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_repeated_reads_are_served_from_snapshot(async_client, admin_headers):
+    await create_service(async_client, admin_headers, "Tyre Swap", 20)
+
+    response = await async_client.get("/api/v1/services/")
+    assert response.status_code == 200
+    reloads = service_catalog.stats()["reloads"]
+
+    for _ in range(3):
+        response = await async_client.get("/api/v1/services/")
+        assert response.status_code == 200
+    service_id = response.json()[0]["service_id"]
+    response = await async_client.get(f"/api/v1/services/{service_id}")
+    assert response.status_code == 200
+
+    assert service_catalog.stats()["reloads"] == reloads
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_snapshot(async_client, admin_headers):
+    await async_client.get("/api/v1/services/")
+    created = await create_service(async_client, admin_headers, "Wheel Alignment", 70)
+
+    names = [s["name"] for s in (await async_client.get("/api/v1/services/")).json()]
+    assert "Wheel Alignment" in names
+
+    service_id = created["service_id"]
+    response = await async_client.put(
+        f"/api/v1/services/{service_id}",
+        json={"price": 75},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    response = await async_client.get(f"/api/v1/services/{service_id}")
+    assert response.json()["price"] == "75.00"
+
+    response = await async_client.delete(
+        f"/api/v1/services/{service_id}", headers=admin_headers
+    )
+    assert response.status_code == 200
+    response = await async_client.get(f"/api/v1/services/{service_id}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_list_etag_and_not_modified(async_client, admin_headers):
+    await create_service(async_client, admin_headers, "Battery Check", 15)
+
+    response = await async_client.get("/api/v1/services/")
+    etag = response.headers["ETag"]
+    response = await async_client.get(
+        "/api/v1/services/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    paged = await async_client.get("/api/v1/services/?limit=1")
+    assert paged.headers["ETag"] != etag
+
+    await create_service(async_client, admin_headers, "Coolant Flush", 40)
+    response = await async_client.get(
+        "/api/v1/services/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_search_filters_snapshot(async_client, admin_headers):
+    await create_service(async_client, admin_headers, "Engine Diagnostics", 90)
+    await create_service(async_client, admin_headers, "Engine Wash", 25)
+
+    response = await async_client.get(
+        "/api/v1/services/search", params={"name": "engine", "min_price": 50}
+    )
+    assert response.status_code == 200
+    assert [s["name"] for s in response.json()] == ["Engine Diagnostics"]
+
+    response = await async_client.get(
+        "/api/v1/services/search", params={"name": "engine", "limit": 1}
+    )
+    assert len(response.json()["items"]) == 1
+    assert response.json()["next_cursor"] is not None
+
+
+@pytest.mark.asyncio
+async def test_broker_invalidates_other_catalogs(async_client, admin_headers):
+    broker = LocalCatalogBroker()
+    writer = ServiceCatalog(broker)
+    reader = ServiceCatalog(broker)
+
+    async with TestingSessionLocal() as db:
+        await reader.get(db)
+        await reader.get(db)
+        assert reader.stats()["reloads"] == 1
+
+        await create_service(async_client, admin_headers, "AC Recharge", 60)
+        await writer.invalidate()
+
+        snapshot = await reader.get(db)
+        assert reader.stats()["reloads"] == 2
+        assert "AC Recharge" in [s.name for s in snapshot.services]
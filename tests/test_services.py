@@ -27,6 +27,7 @@ async def test_create_service(async_client, admin_headers):
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(1)
 async def test_read_services(async_client):
     response = await async_client.get("/api/v1/services/")
     assert response.status_code == 200
@@ -57,6 +58,7 @@ async def test_read_service(async_client, admin_headers):
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(4)
 async def test_update_service(async_client, admin_headers):
     service_data = {
         "name": "Tire Rotation",
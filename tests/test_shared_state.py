@@ -0,0 +1,130 @@
+import asyncio
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+from crud.identity_cache import IdentityCache, SharedStateInvalidation
+from crud.lifecycle import drain
+from crud.metrics import metrics
+from crud.scheduling import AVAILABILITY_SLOT, AvailabilityIndex
+from crud.service_catalog import ServiceCatalog, SharedStateCatalogBroker
+from crud.shared_state import SharedState, create_state_file
+
+
+@pytest.fixture()
+def state_file(tmp_path):
+    path = str(tmp_path / "shared-state")
+    create_state_file(path)
+    return path
+
+
+def test_publish_reaches_other_processes_only(state_file):
+    first, second = SharedState(state_file), SharedState(state_file)
+    seen = []
+    first.subscribe("service_catalog", lambda: seen.append("first"))
+    second.subscribe("service_catalog", lambda: seen.append("second"))
+
+    first.publish("service_catalog")
+    assert not first.check("service_catalog")
+    assert second.check("service_catalog")
+    assert not second.check("service_catalog")
+    assert seen == ["second"]
+
+    # Publishing over a change not yet polled still reports that change.
+    second.publish("service_catalog")
+    first.publish("service_catalog")
+    assert seen == ["second", "first"]
+    assert first.stats()["service_catalog_version"] == 3
+
+
+@pytest.mark.asyncio
+async def test_caches_follow_other_workers(state_file):
+    first, second = SharedState(state_file), SharedState(state_file)
+
+    writer = ServiceCatalog(SharedStateCatalogBroker(first))
+    reader = ServiceCatalog(SharedStateCatalogBroker(second))
+    await writer.invalidate()
+    second.check("service_catalog")
+    assert (writer.version, reader.version) == (1, 1)
+
+    cache = IdentityCache()
+    second.subscribe(SharedStateInvalidation.SLOT, cache.clear)
+    await cache.set("user", 1, {"user_id": 1})
+    await IdentityCache(backend=SharedStateInvalidation(first)).invalidate("user", 1)
+    second.check(SharedStateInvalidation.SLOT)
+    assert await cache.get("user", 1) is None
+
+    index = AvailabilityIndex(second)
+    index.loaded_at = 0
+    AvailabilityIndex(first).book(1, None, datetime(2030, 1, 7, 9), 60)
+    async with index.booking_lock(None):
+        assert index.loaded_at is None
+    assert second.stats()[f"{AVAILABILITY_SLOT}_version"] == 1
+
+
+def hold_in_child(state_file, key):
+    """A process holding ``key`` until its stdin is closed."""
+    child = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from crud.shared_state import SharedState; "
+            f"state = SharedState({state_file!r}); "
+            f"print(state.try_hold({key}), flush=True); sys.stdin.read()",
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert child.stdout.readline().strip() == "True"
+    return child
+
+
+def test_try_hold_excludes_other_processes(state_file):
+    child = hold_in_child(state_file, 7)
+    try:
+        state = SharedState(state_file)
+        assert not state.try_hold(7)
+        assert state.try_hold(8)
+    finally:
+        child.communicate("")
+    assert state.try_hold(7)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_lock_wait_releases_the_lock(state_file):
+    holder = hold_in_child(state_file, 7)
+    state = SharedState(state_file)
+    entered = []
+
+    async def book():
+        async with state.lock(7):
+            entered.append(True)
+
+    waiting = asyncio.create_task(book())
+    try:
+        await asyncio.sleep(0.1)
+        waiting.cancel()
+        await asyncio.sleep(0.1)
+        assert not waiting.done()
+    finally:
+        # The holder exits, the waiting thread gets the lock and gives it back.
+        holder.communicate("")
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert not entered
+
+    other = hold_in_child(state_file, 7)
+    other.communicate("")
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_requests():
+    metrics.in_flight += 1
+    try:
+        assert not await drain(timeout=0.1)
+    finally:
+        metrics.in_flight -= 1
+    assert await drain(timeout=0.1)
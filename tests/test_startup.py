@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once a worker serves, sends mail or renders previews.
+DEFERRED_MODULES = (
+    "aiomysql",
+    "pymysql",
+    "aiosmtplib",
+    "uvicorn",
+    "PIL",
+    "fitz",
+    "multiprocessing",
+    "concurrent.futures.process",
+)
+
+
+def modules_after_import(cwd) -> list:
+    """Names in ``sys.modules`` once a fresh interpreter has imported ``main``."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import json, sys; import main; print(json.dumps(sorted(sys.modules)))",
+        ],
+        cwd=cwd,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_import_defers_drivers_and_side_effects(tmp_path):
+    loaded = modules_after_import(tmp_path)
+
+    assert [module for module in DEFERRED_MODULES if module in loaded] == []
+    assert os.listdir(tmp_path) == []
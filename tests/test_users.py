@@ -46,6 +46,7 @@ async def test_login_user(async_client):
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(1)
 async def test_read_users(async_client, admin_headers):
     response = await async_client.get("/api/v1/users/", headers=admin_headers)
     assert response.status_code == 200
@@ -55,6 +56,7 @@ async def test_read_users(async_client, admin_headers):
 
 
 @pytest.mark.asyncio
+@pytest.mark.query_budget(2)
 async def test_update_user(async_client, admin_headers):
     user_data = {
         "name": "Updated User",